@@ -0,0 +1,222 @@
+import numpy as np
+
+from board import Board
+
+class BatchBoard:
+    """
+    Many games played side by side. The boards are stored as one (numberOfGames, numberOfPositions) integer
+    array and every call to self.step() plays one move in every unfinished game at once, using the same rules
+    as Board.move (opponent's goal is skipped, landing in a position that had stones continues the move,
+    landing in your own goal gives another move). Games finish when either player's side is empty.
+
+    Parameters
+    ----------
+
+    numberOfGames: int
+        Number of boards to play on
+
+    piecesPerHole: int, optional
+        Number of starting pieces in each of the positions on the board, default 4
+
+    rowLength: int, optional
+        Number of positions in each row, default 6
+
+    """
+
+    def __init__(self, numberOfGames, piecesPerHole=4, rowLength=6):
+        self.numberOfGames = numberOfGames
+        self.piecesPerHole = piecesPerHole
+        self.rowLength = rowLength
+
+        self.player1Goal = 0
+        self.player2Goal = rowLength + 1
+        self.numberOfPositions = rowLength * 2 + 2
+        positions = np.arange(self.numberOfPositions)
+
+        #owner of each position, 1 or 2 for sides of board and 0 for goals
+        self.owner = np.where(positions < self.player2Goal, 1, 2)
+        self.owner[[self.player1Goal, self.player2Goal]] = 0
+
+        #sideMasks[player] marks positions on player's side, opponentGoalMasks[player] marks the goal player skips (index 0 unused)
+        self.sideMasks = np.stack([np.zeros(self.numberOfPositions, dtype=bool), self.owner == 1, self.owner == 2])
+        self.opponentGoalMasks = np.stack([np.zeros(self.numberOfPositions, dtype=bool), positions == self.player2Goal, positions == self.player1Goal])
+
+        #sowCycles[player] is every position except the one player skips, in sowing order. cycleIndex[player][position] is its place in that order
+        self.cycleLength = self.numberOfPositions - 1
+        self.sowCycles = np.zeros((3, self.cycleLength), dtype=np.intp)
+        self.cycleIndex = np.full((3, self.numberOfPositions), -1)
+        for player in (1, 2):
+            self.sowCycles[player] = positions[~self.opponentGoalMasks[player]]
+            self.cycleIndex[player, self.sowCycles[player]] = np.arange(self.cycleLength)
+
+        #a full lap adds one stone to every position but the skipped goal. remainderRows[player, position, remainder] is the row added
+        #for the stones left over after full laps when moving from position, and lastPositions[player, position, remainder] is where the last
+        #stone of those lands. Precomputing these keeps modulo arithmetic and scattering into cycle order out of self.step()
+        self.lapRows = (~self.opponentGoalMasks).astype(np.int32)
+        self.remainderRows = np.zeros((3, self.numberOfPositions, self.cycleLength, self.numberOfPositions), dtype=np.int8)
+        self.lastPositions = np.zeros((3, self.numberOfPositions, self.cycleLength), dtype=np.intp)
+        for player in (1, 2):
+            cycle = self.sowCycles[player]
+            for position in cycle:
+                start = self.cycleIndex[player, position]
+                for remainder in range(self.cycleLength):
+                    sown = cycle[(start + 1 + np.arange(remainder)) % self.cycleLength]
+                    self.remainderRows[player, position, remainder, sown] = 1
+                    self.lastPositions[player, position, remainder] = cycle[(start + remainder) % self.cycleLength]
+
+        self.pits = np.full((numberOfGames, self.numberOfPositions), piecesPerHole, dtype=np.int32)
+        self.pits[:, [self.player1Goal, self.player2Goal]] = 0
+        self.playerToMove = np.ones(numberOfGames, dtype=np.int8)
+        self.movesPlayed = np.zeros(numberOfGames, dtype=np.int32)
+        self.finished = self._terminal()
+
+    def __repr__(self):
+        return "BatchBoard({} games, {} finished)".format(self.numberOfGames, int(self.finished.sum()))
+
+    def legalMoveMask(self):
+        """
+        Returns (numberOfGames, numberOfPositions) bool array marking the positions the player to move in each
+        game can move from. Rows of finished games are all False.
+
+        """
+
+        legal = np.zeros(self.pits.shape, dtype=bool)
+        games = np.flatnonzero(~self.finished)
+        legal[games] = (self.pits[games] > 0) & self.sideMasks[self.playerToMove[games]]
+        return legal
+
+    def randomMoves(self, rng):
+        """
+        Picks a random legal move in every game. Finished games get position 0, which self.step() ignores.
+
+        Parameters
+        ----------
+
+        rng: numpy.random.Generator
+            Source of randomness
+
+        Returns
+        -------
+
+        moves: numpy array
+            Position to move from for each game
+
+        """
+
+        moves = np.zeros(self.numberOfGames, dtype=np.intp)
+        games = np.flatnonzero(~self.finished) #only unfinished games are looked at, as games end the batch gets cheaper
+        legal = (self.pits[games] > 0) & self.sideMasks[self.playerToMove[games]]
+        weights = rng.random(legal.shape) * legal #largest random weight among legal positions is a uniform choice
+        moves[games] = np.argmax(weights, axis=1)
+        return moves
+
+    def step(self, moves):
+        """
+        Plays moves[game] for the player to move in every unfinished game, including relay follow ups.
+
+        Parameters
+        ----------
+
+        moves: array like
+            Position to move from for each game. Ignored for finished games.
+
+        Returns
+        -------
+
+        extraTurn: numpy array
+            Bool for each game, True if the last stone landed in the mover's goal so they move again
+
+        Raises
+        ------
+
+        Board.InvalidMove
+            If a move in an unfinished game isn't on the moving player's side or has no stones to move
+
+        """
+
+        moves = np.asarray(moves)
+        movingGames = np.flatnonzero(~self.finished)
+        games = movingGames
+        positions = moves[games]
+        players = self.playerToMove[games]
+
+        invalid = (self.owner[positions] != players) | (self.pits[games, positions] == 0)
+        if invalid.any():
+            game = int(games[np.argmax(invalid)])
+            raise Board.InvalidMove(int(moves[game]), "not a position with stones on player {}'s side in game {}".format(int(self.playerToMove[game]), game))
+
+        extraTurn = np.zeros(self.numberOfGames, dtype=bool)
+        while games.size:
+            #pick up stones from every position being moved from
+            stones = self.pits[games, positions]
+            self.pits[games, positions] = 0
+            laps, remainder = np.divmod(stones, self.cycleLength)
+
+            #every position but the skipped goal gets a stone per full lap, then the next remainder positions get one more
+            self.pits[games] += laps[:, None] * self.lapRows[players] + self.remainderRows[players, positions, remainder]
+
+            #work out where last stone landed and whether the move continues from there
+            lastPositions = self.lastPositions[players, positions, remainder]
+            inGoal = self.owner[lastPositions] == 0
+            extraTurn[games[inGoal]] = True
+            relay = ~inGoal & (self.pits[games, lastPositions] >= 2)
+
+            games = games[relay]
+            positions = lastPositions[relay]
+            players = players[relay]
+
+        self.movesPlayed[movingGames] += 1
+        switch = movingGames[~extraTurn[movingGames]]
+        self.playerToMove[switch] = 3 - self.playerToMove[switch]
+        self.finished[movingGames] = self._terminal(movingGames)
+        return extraTurn
+
+    def playRandomGames(self, rng, maxMoves=10000):
+        """
+        Plays random moves in every game until all of them are finished or maxMoves steps have been played.
+
+        Parameters
+        ----------
+
+        rng: numpy.random.Generator
+            Source of randomness
+
+        maxMoves: int, optional
+            Most steps to play, default 10000
+
+        Returns
+        -------
+
+        scores: numpy array
+            Final score difference for player 1 in each game, see self.scores()
+
+        """
+
+        for x in range(maxMoves):
+            if self.finished.all():
+                break
+            self.step(self.randomMoves(rng))
+        return self.scores()
+
+    def scores(self):
+        """
+        Returns the final score difference (player 1 minus player 2) for each game, where each player's score
+        is their goal plus the stones still on their side.
+
+        """
+
+        player1Score = self.pits[:, :self.player2Goal].sum(axis=1)
+        player2Score = self.pits[:, self.player2Goal:].sum(axis=1)
+        return player1Score - player2Score
+
+    def _terminal(self, games=slice(None)):
+        """
+        Returns bool array marking which of games (all of them by default) have a player with no stones left on 
+        their side.
+
+        """
+
+        pits = self.pits[games]
+        player1Empty = ~(pits[:, self.player1Goal + 1:self.player2Goal] > 0).any(axis=1)
+        player2Empty = ~(pits[:, self.player2Goal + 1:] > 0).any(axis=1)
+        return player1Empty | player2Empty
@@ -0,0 +1,222 @@
+"""
+Benchmarks for the hot paths of the game engine. Every benchmark times a function with timeit, keeping the best
+of a few repeats, and reports operations per second. Results are JSON so runs can be saved and compared: a
+benchmark whose operations per second dropped by more than the threshold compared to a baseline run is flagged
+as a regression.
+
+    python benchmarks.py --output results.json
+    python benchmarks.py --baseline results.json --threshold 0.1
+
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import timeit
+from array import array
+
+from board import Board
+from boardState import BoardState
+from extraClasses import LimitedList
+from ruleVariants import ruleVariant
+
+def _longRelayPosition(rowLength=8, seed=7, tries=2000):
+    """
+    Returns (pits, position) of the longest relay chain found among random positions, always the same for a seed.
+
+    """
+
+    rng = random.Random(seed)
+    state = BoardState(0, rowLength)
+    best = None
+    for x in range(tries):
+        pits = [0] + [rng.randint(0, 12) for position in range(rowLength)] + [0] + [rng.randint(0, 12) for position in range(rowLength)]
+        position = rng.randint(1, rowLength)
+        if pits[position] == 0:
+            continue
+        state.pits[:] = array("i", pits)
+        state.rehash()
+        state.move(position, 1)
+        if best is None or state.sows > best[0]:
+            best = (state.sows, pits, position)
+    return best[1], best[2]
+
+def _boardFrom(pits, rowLength):
+    """
+    Returns a Board with the stones in pits.
+
+    """
+
+    board = Board(0, rowLength)
+    board.state.pits[:] = array("i", pits)
+    board.state.rehash()
+    return board
+
+def _randomGame(piecesPerHole, rowLength, rng):
+    """
+    Plays one game of random moves through Board.move.
+
+    """
+
+    board = Board(piecesPerHole, rowLength)
+    player = 1
+    while not board.is_terminal():
+        moves = board.legal_moves(player)
+        if not board.move(moves[int(rng.random() * len(moves))], player):
+            player = 3 - player
+
+def benchmarkCases(rowLengths=(4, 6, 8), piecesPerHoles=(3, 4, 6)):
+    """
+    Returns dict of benchmark name to (function, number of calls to time). Every function does one operation.
+
+    """
+
+    cases = {}
+
+    #Board.move from the opening position, on a copy so every call starts from the same board
+    opening = Board()
+    cases["board.move.opening"] = (lambda: opening.copy().move(3, 1), 2000)
+
+    #a long relay chain
+    relayPits, relayPosition = _longRelayPosition()
+    relayBoard = _boardFrom(relayPits, len(relayPits) // 2 - 1)
+    cases["board.move.relayChain"] = (lambda: relayBoard.copy().move(relayPosition, 1), 2000)
+
+    #a position with enough stones to lap the board many times
+    lapBoard = Board(500, 6)
+    cases["board.move.highStoneLaps"] = (lambda: lapBoard.copy().move(3, 1), 2000)
+
+    #specialized rule variant move functions on plain arrays, from the opening
+    for variantName in ("relay", "oware"):
+        variant = ruleVariant(variantName, 6)
+        openingPits = variant.startingPits(4)
+        cases["variant.{}.move.opening".format(variantName)] = ((lambda move=variant.moveFunctions[1], openingPits=openingPits: move(array("i", openingPits), 3)), 20000)
+
+    #LimitedList access
+    limitedList = LimitedList(14)
+    limitedList[tuple(range(14))] = 4
+    cases["limitedList.getitem.int"] = (lambda: limitedList[5], 100000)
+    cases["limitedList.getitem.slice"] = (lambda: limitedList[1:7], 100000)
+    cases["limitedList.getitem.tuple"] = (lambda: limitedList[1, 3, 5, 8, 10, 12], 100000)
+    cases["limitedList.next"] = (lambda: limitedList.next(), 100000)
+    cases["limitedList.current"] = (lambda: limitedList.current(), 100000)
+    typedList = LimitedList(14, "i")
+    cases["limitedList.typed.getitem.slice"] = (lambda: typedList[1:7], 100000)
+    cases["limitedList.typed.getitem.tuple"] = (lambda: typedList[1, 3, 5, 8, 10, 12], 100000)
+    cases["board.player1Side"] = (lambda: opening.player1Side(), 100000)
+
+    #whole games of random moves
+    for rowLength in rowLengths:
+        for piecesPerHole in piecesPerHoles:
+            rng = random.Random(rowLength * 100 + piecesPerHole)
+            cases["randomGame.rowLength{}.pieces{}".format(rowLength, piecesPerHole)] = ((lambda piecesPerHole=piecesPerHole, rowLength=rowLength, rng=rng: _randomGame(piecesPerHole, rowLength, rng)), 20)
+
+    return cases
+
+def runBenchmarks(repeat=5, names=None, onResult=None):
+    """
+    Runs the benchmarks.
+
+    Parameters
+    ----------
+
+    repeat: int, optional
+        Times each benchmark is repeated, the fastest repeat is kept, default 5
+
+    names: iterable of str, optional
+        Only run benchmarks whose name starts with one of these, default runs every benchmark
+
+    onResult: callable, optional
+        Called with (name, result dict) as each benchmark finishes
+
+    Returns
+    -------
+
+    results: dict
+        JSON ready results, with python version and platform under "environment" and a dict per benchmark
+        (secondsPerOperation, operationsPerSecond) under "benchmarks"
+
+    """
+
+    results = {"environment": {"python": platform.python_version(), "implementation": platform.python_implementation(), "platform": platform.platform()}, "benchmarks": {}}
+    for name, (function, number) in benchmarkCases().items():
+        if names is not None and not any(name.startswith(prefix) for prefix in names):
+            continue
+        best = min(timeit.repeat(function, number=number, repeat=repeat)) / number
+        results["benchmarks"][name] = {"secondsPerOperation": best, "operationsPerSecond": 1 / best if best > 0 else 0.0}
+        if onResult is not None:
+            onResult(name, results["benchmarks"][name])
+    return results
+
+def compareToBaseline(results, baseline, threshold=0.1):
+    """
+    Compares results against a baseline run.
+
+    Parameters
+    ----------
+
+    results: dict
+        From runBenchmarks
+
+    baseline: dict
+        Earlier results from runBenchmarks, ie loaded from JSON
+
+    threshold: float, optional
+        Fraction operations per second can drop by before it counts as a regression, default 0.1
+
+    Returns
+    -------
+
+    comparison: dict
+        Maps every benchmark in both runs to {"baseline", "current", "change", "regression"}, where change is the
+        fractional change in operations per second (positive is faster)
+
+    """
+
+    comparison = {}
+    for name, result in results["benchmarks"].items():
+        if name not in baseline.get("benchmarks", {}):
+            continue
+        before = baseline["benchmarks"][name]["operationsPerSecond"]
+        after = result["operationsPerSecond"]
+        change = (after - before) / before if before else 0.0
+        comparison[name] = {"baseline": before, "current": after, "change": change, "regression": change < -threshold}
+    return comparison
+
+def main(argv=None):
+    """
+    Command line entry point, returns exit code 1 if any benchmark regressed against the baseline.
+
+    """
+
+    parser = argparse.ArgumentParser(description="Benchmark the Mancala engine hot paths.")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="fractional slowdown counted as a regression (default 0.1)")
+    parser.add_argument("--repeat", type=int, default=5, help="repeats per benchmark, fastest is kept (default 5)")
+    parser.add_argument("--only", nargs="*", help="only run benchmarks starting with these names")
+    arguments = parser.parse_args(argv)
+
+    results = runBenchmarks(arguments.repeat, arguments.only, onResult=lambda name, result: print("{:<40} {:>14.1f} ops/s".format(name, result["operationsPerSecond"]), file=sys.stderr))
+
+    if arguments.baseline:
+        with open(arguments.baseline) as baselineFile:
+            comparison = compareToBaseline(results, json.load(baselineFile), arguments.threshold)
+        results["comparison"] = comparison
+
+    output = json.dumps(results, indent=2)
+    if arguments.output:
+        with open(arguments.output, "w") as outputFile:
+            outputFile.write(output + "\n")
+    else:
+        print(output)
+
+    regressions = [name for name, change in results.get("comparison", {}).items() if change["regression"]]
+    for name in regressions:
+        print("REGRESSION {}: {:+.1%}".format(name, results["comparison"][name]["change"]), file=sys.stderr)
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
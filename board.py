@@ -1,4 +1,6 @@
+import instrumentation
 from extraClasses import LimitedList
+from boardState import BoardState, EXTRA_TURN
 
 class Board:
     """
@@ -29,14 +31,13 @@ class Board:
         self.player1Positions = [i for i in range(self.player1Goal+1, self.player2Goal)]
         self.player2Positions = [i for i in range(self.player2Goal+1, self.numberOfPositions)]
 
-        #code to generate board list 
-        self.board = LimitedList(self.numberOfPositions) #create list to represent the board 
-        
-        self.board[self.player1Goal, self.player2Goal] = 0 #set both goals to empty 
-        for index in self.player1Positions: #look through all indices in board between the first and second goal, set all of them to the correct number of initial pieces
-            self.board[index] = self.piecesPerHole
-        for index in self.player2Positions: #do the same, however between second goal and end of board 
-            self.board[index] = self.piecesPerHole 
+        #compact state that moves are played on, see BoardState
+        self.state = BoardState(self.piecesPerHole, self.rowLength)
+
+        #code to generate board list, this shares its memory with self.state so it is always up to date, and writes to it go through the state so its hash and occupied positions are too
+        self.board = LimitedList(self.numberOfPositions, backing=self.state.pits, onSet=self.state.setStones) #create list to represent the board 
+
+        self.undoLog = [] #moves recorded by self.move(record=True), undone by self.unmake()
     
     def __repr__(self):
         return repr(self.board) #when handling printing this class, simply handle same as printing list that represents board
@@ -53,7 +54,7 @@ class Board:
 
         """
 
-        return (self.board[:self.player2Goal])
+        return (self.board[:self.player2Goal].tolist())
     
     def player2Side(self):
         """
@@ -67,9 +68,124 @@ class Board:
 
         """
 
-        return(self.board[self.player2Goal:])
+        return(self.board[self.player2Goal:].tolist())
+
+    def player1SideView(self):
+        """
+        Returns player 1's side of the board and their goal without copying it.
+
+        Returns
+        -------
+
+        player1View: memoryview
+            Read only view of the stones in player 1's positions and goal, it changes as moves are played
+
+        """
+
+        return self.board[:self.player2Goal]
+
+    def player2SideView(self):
+        """
+        Returns player 2's side of the board and their goal without copying it.
+
+        Returns
+        -------
+
+        player2View: memoryview
+            Read only view of the stones in player 2's positions and goal, it changes as moves are played
+
+        """
+
+        return self.board[self.player2Goal:]
+
+    def copy(self):
+        """
+        Returns a copy of the board. Only the compact state is copied, position tables are shared. 
+
+        Returns
+        -------
+
+        boardCopy: Board
+            New board in the same position
+
+        """
+
+        new = Board.__new__(Board)
+        new.__dict__.update(self.__dict__) #shares the position tables, which are never changed
+        new.state = self.state.copy()
+        new.undoLog = list(self.undoLog)
+        new.board = LimitedList(self.numberOfPositions, backing=new.state.pits, onSet=new.state.setStones)
+        new.board.seek_position(self.board.iterationLocation())
+        return new
+
+    def legal_moves(self, player):
+        """
+        Returns every position player can move from, ie positions on their side that have stones in them. 
+
+        Parameters
+        ----------
+
+        player: int, 1 or 2
+            Player to find moves for
+
+        Returns
+        -------
+
+        moves: tuple
+            Positions that can be passed to self.move() for player, in order
+
+        """
+
+        return self.state.legalMoves(player)
+
+    def is_terminal(self):
+        """
+        Returns True if the game is over, which is when either player has no stones left on their side of the board. 
+
+        """
+
+        return self.state.isTerminal()
+
+    def final_score(self):
+        """
+        Scores a finished game. Each player gets the stones in their goal plus any stones left on their side. 
+
+        Returns
+        -------
+
+        player1Score: int
+            Player 1's final score
+
+        player2Score: int
+            Player 2's final score
+
+        """
+
+        return self.state.finalScores()
 
-    def move(self, position, playerMoving, followUpMove=False):
+    def positionHash(self, playerToMove=None):
+        """
+        Returns the hash of the board (see boardState.ZobristKeys), kept up to date as stones move. 
+
+        Parameters
+        ----------
+
+        playerToMove: int, 1 or 2, optional
+            If given, the player to move is combined into the hash, giving a key for TranspositionTable
+
+        Returns
+        -------
+
+        positionHash: int
+            64 bit hash of the board
+
+        """
+
+        if playerToMove is None:
+            return self.state.hash
+        return self.state.hashKey(playerToMove)
+
+    def move(self, position, playerMoving, followUpMove=False, record=False):
         """
         Function that moves from a specific position on the board. This will deposit 1 "stone" from position moving from 
         into each following position (each position after will decline the number of stones by 1, the number of stones is 
@@ -88,7 +204,10 @@ class Board:
             Signals which player is moving. 1 signifies player 1, 2 signifies player 2.
 
         followUpMove: bool, optional 
-            True if being used recursively, ie player already moved on this move and this is the movement for the position they landed on. False otherwise. If True, this disables player correct position checks.
+            True if this is the movement for a position a player landed in, ie player already moved on this move. False otherwise. If True, this disables player correct position checks. Relay follow ups are handled in a loop by BoardState.move, so this is only needed when continuing a move by hand.
+
+        record: bool, optional
+            If True, the move (including relay follow ups) is recorded in self.undoLog so self.unmake() can undo it. Only the positions sown from and how many stones they held are stored, the board isn't copied.
 
         Returns 
         -------
@@ -97,46 +216,62 @@ class Board:
             True if player can pick new location to move from.
             False is move is finished
 
+        Raises
+        ------
+
+        InvalidMove
+            If the position can't be moved from by playerMoving
+
         """
 
         if position >= 0 and position <= self.numberOfPositions-1: #check to make sure selected position is at least in range of board
+            positionOwner = self.state.owner[position] #1 or 2 for the side of the board position is on, 0 for goals
             if not followUpMove: #disable these checks if not first position in move
                 #check if move is valid for specified player that is moving, if not raise exception
-                if playerMoving == 1 and position not in self.player1Positions: 
+                if playerMoving == 1 and positionOwner != 1: 
                     raise self.InvalidMove(position, "move not valid for player 1") 
-                if playerMoving == 2 and position not in self.player2Positions:
+                if playerMoving == 2 and positionOwner != 2:
                     raise self.InvalidMove(position, "move not valid for player 2")
-            else: #even if recursive use, still check to make sure program isn't trying to move from goal
-                if position not in self.player1Positions and position not in self.player2Positions:
+            else: #even for follow up movement, still check to make sure program isn't trying to move from goal
+                if positionOwner == 0:
                     raise self.InvalidMove(position, "move either off board or one of the goals")
 
-            numberFromPosition = self.board[position] #find the number of stones in position moving from
-            self.board[position] = 0 #empty position moving from 
-
-            self.board.seek_position(position) #start step by step iteration at moving position
-            for x in range(numberFromPosition): #go backwards to each position behind adding 1 stone to each 
-                currentNextPosValue = self.board.next()
-
-                #ignore goal of opponent if looping over goal
-                if playerMoving == 1 and self.board.iterationLocation() != self.player2Goal:
-                    self.board.current(setValue=currentNextPosValue+1)
-                elif playerMoving == 2 and self.board.iterationLocation() != self.player1Goal:
-                    self.board.current(setValue=currentNextPosValue+1)
-                else: #if landing on opponent goal, skip it and add to the following position (this breaks if row length is 0, however you don't have a game then anyway...)
-                    currentNextPosValue = self.board.next()
-                    self.board.current(setValue=currentNextPosValue+1)
-            
-            if self.board.iterationLocation() != self.player1Goal and self.board.iterationLocation() != self.player2Goal and self.board.current() >= 2: #if the position landed in isn't a goal and previously had at least 1 stone in it, then run a move from there
-                self.move(self.board.iterationLocation(), playerMoving, followUpMove=True)
-            elif self.board.iterationLocation() == self.player1Goal or self.board.iterationLocation() == self.player2Goal: #if player ended in goal (assuming correct player goal due to other safeties), return True
-                return True 
-            else: #if not in goal, return false
-                return False
+            observingIndex = self.board.iterationLocation()
+            collector = instrumentation.activeCollector #None unless move statistics are being collected
+            if collector is None:
+                result = self.state.move(position, playerMoving, self.undoLog if record else None) #sows position and any relay follow ups
+            else:
+                result = collector.playMove(self.state, position, playerMoving, self.undoLog if record else None)
+            if record:
+                self.undoLog.append(observingIndex)
+
+            self.board.seek_position(self.state.lastPosition) #move is finished, point looping iterator at last position sown
+            return result == EXTRA_TURN #True if player ended in their goal and moves again
 
 
         else:
             raise self.InvalidMove(position, "position is not on board")
 
+    def unmake(self):
+        """
+        Undoes the last move played with self.move(record=True), putting every position, the hash and the 
+        LimitedList's looping iterator position back exactly as they were. 
+
+        Raises
+        ------
+
+        NothingToUnmake
+            If there are no recorded moves left
+
+        """
+
+        if not self.undoLog:
+            raise self.NothingToUnmake()
+
+        observingIndex = self.undoLog.pop()
+        self.state.unmake(self.undoLog)
+        self.board.seek_position(observingIndex)
+
     #Defining Exceptions 
     class InvalidMove(Exception):
         """
@@ -150,8 +285,13 @@ class Board:
             self.message = message.format(self.movePosition, self.reason)
             super().__init__(self.message)
 
+    class NothingToUnmake(Exception):
+        """
+        Exception raised if Board.unmake is called with no recorded moves. 
+
+        """
+
+        def __init__(self, message="There are no recorded moves to unmake."):
+            self.message = message
+            super().__init__(self.message)
 
-gameBoard = Board()
-print(gameBoard)
-print(gameBoard.player2Side())
-gameBoard.move(3,1)
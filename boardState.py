@@ -0,0 +1,478 @@
+from array import array
+from random import Random
+
+#results of BoardState.move
+MOVE_FINISHED = 0 #last stone landed in an empty position, turn passes to the other player
+EXTRA_TURN = 1 #last stone landed in the moving player's goal, they move again
+
+ZOBRIST_SEED = 0x4D616E63616C61 #fixed so hashes are the same in every process and run
+
+HASH_MASK = (1 << 64) - 1 #hashes are kept to 64 bits
+
+HASH_VERSION = 2 #changes whenever ZobristKeys or hashKey hash boards differently, files keyed by hashes (opening books) store it
+
+class ZobristKeys:
+    """
+    Random 64 bit keys used to hash boards. There is one key for every position and the hash of a board is the
+    sum of stones times key over every position, modulo 2**64. The hash is linear in the stones, so adding or
+    removing n stones from a position is one multiply and add, a full lap of the board is one add of the sum of
+    the keys around the sowing cycle, and nothing grows with the number of stones on the board. Keys come from
+    a fixed seed so they're the same between processes. Use zobristKeys() to get the shared keys for a board
+    size.
+
+    Parameters
+    ----------
+
+    numberOfPositions: int
+        Number of positions on the board (including goals)
+
+    """
+
+    def __init__(self, numberOfPositions):
+        self.numberOfPositions = numberOfPositions
+        self.positionKeys = tuple(Random(ZOBRIST_SEED * 1000003 + position).getrandbits(64) | 1 for position in range(numberOfPositions)) #odd, so stone counts never cancel out of the low bits
+
+        sideGenerator = Random(ZOBRIST_SEED - numberOfPositions)
+        self.sideKeys = (0, sideGenerator.getrandbits(64), sideGenerator.getrandbits(64)) #XORed in for player to move, index 0 is unused
+
+        #cycleKeys[player] is added for every full lap player sows, and for remainder stones sown into doubledCycles[player][start:end]
+        #doubledKeySums[player][end] - doubledKeySums[player][start]
+        tables = boardTables((numberOfPositions - 2) // 2)
+        self.cycleKeys = (0,) + tuple(sum(self.positionKeys[position] for position in tables.sowCycles[player]) & HASH_MASK for player in (1, 2))
+        self.doubledKeySums = (None,) + tuple(self._prefixSums(tables.doubledCycles[player]) for player in (1, 2))
+
+    def _prefixSums(self, positions):
+        """
+        Builds table of the key sums of the first n positions, for every n from 0 to len(positions).
+
+        """
+
+        sums = [0]
+        for position in positions:
+            sums.append((sums[-1] + self.positionKeys[position]) & HASH_MASK)
+        return tuple(sums)
+
+    def hashOf(self, pits):
+        """
+        Hashes a full board from scratch. 
+
+        """
+
+        return sum(key * stones for key, stones in zip(self.positionKeys, pits)) & HASH_MASK
+
+_zobristKeysCache = {}
+
+def zobristKeys(numberOfPositions):
+    """
+    Returns the ZobristKeys shared by every board with numberOfPositions positions.
+
+    """
+
+    keys = _zobristKeysCache.get(numberOfPositions)
+    if keys is None:
+        keys = _zobristKeysCache[numberOfPositions] = ZobristKeys(numberOfPositions)
+    return keys
+
+class BoardTables:
+    """
+    Lookup tables for a board size, shared by every BoardState with the same rowLength (see boardTables()).
+    Nothing in here changes once built. 
+
+    Parameters
+    ----------
+
+    rowLength: int
+        Number of positions in each row
+
+    """
+
+    def __init__(self, rowLength):
+        self.rowLength = rowLength
+        self.player1Goal = 0
+        self.player2Goal = rowLength + 1
+        self.numberOfPositions = rowLength * 2 + 2
+
+        #owner[position] is 1 or 2 for positions on that player's side, 0 for goals
+        self.owner = bytes(0 if position in (self.player1Goal, self.player2Goal) else (1 if position < self.player2Goal else 2) for position in range(self.numberOfPositions))
+
+        #playerPositions[player] lists the positions on player's side and sideMasks[player] has their bits set (index 0 unused)
+        self.playerPositions = (None, tuple(range(self.player1Goal + 1, self.player2Goal)), tuple(range(self.player2Goal + 1, self.numberOfPositions)))
+        self.sideMasks = (0, sum(1 << position for position in self.playerPositions[1]), sum(1 << position for position in self.playerPositions[2]))
+
+        #sowCycles[player] is the order stones are sown in by that player, which is every position except the opponent's goal.
+        #cycleIndex[player][position] is where that position sits in the cycle
+        self.sowCycles = (None, self._sowCycle(self.player2Goal), self._sowCycle(self.player1Goal))
+        self.cycleIndex = (None, self._cycleIndex(self.sowCycles[1]), self._cycleIndex(self.sowCycles[2]))
+
+        #each cycle twice over, so the positions after any cycle position are one slice with no wrapping
+        self.doubledCycles = (None, self.sowCycles[1] * 2, self.sowCycles[2] * 2)
+
+        #bits set by sowing: lapMasks[player] for a full lap, and for remainder stones sown into doubledCycles[player][start:end]
+        #doubledMasks[player][start] ^ doubledMasks[player][end]. A slice shorter than the cycle has no position twice, so the XOR is the OR
+        self.lapMasks = (0, sum(1 << position for position in self.sowCycles[1]), sum(1 << position for position in self.sowCycles[2]))
+        self.doubledMasks = (None, self._prefixMasks(self.doubledCycles[1]), self._prefixMasks(self.doubledCycles[2]))
+
+        #movesByMask[player] maps the occupied bits on player's side to a tuple of moves, filled in as masks are seen
+        self.movesByMask = (None, {}, {})
+
+    def _sowCycle(self, skippedGoal):
+        """
+        Builds the order of positions stones are deposited in, skipping the goal passed in.
+
+        """
+
+        return tuple(position for position in range(self.numberOfPositions) if position != skippedGoal)
+
+    def _cycleIndex(self, cycle):
+        """
+        Builds a lookup table from position to index in cycle. The skipped goal maps to -1.
+
+        """
+
+        index = [-1] * self.numberOfPositions
+        for cyclePosition, position in enumerate(cycle):
+            index[position] = cyclePosition
+        return tuple(index)
+
+    def _prefixMasks(self, positions):
+        """
+        Builds table of the XOR of the bits of the first n positions, for every n from 0 to len(positions).
+
+        """
+
+        masks = [0]
+        for position in positions:
+            masks.append(masks[-1] ^ (1 << position))
+        return tuple(masks)
+
+_boardTablesCache = {}
+
+def boardTables(rowLength):
+    """
+    Returns the BoardTables shared by every board with rowLength positions in each row.
+
+    """
+
+    tables = _boardTablesCache.get(rowLength)
+    if tables is None:
+        tables = _boardTablesCache[rowLength] = BoardTables(rowLength)
+    return tables
+
+class BoardState:
+    """
+    Compact state of a game board. Stores the number of stones in every position as a fixed-width integer
+    array and keeps precomputed sowing tables for both players so a move can be played with plain integer
+    indices (no LimitedList iteration or list membership checks). Position layout is the same as Board:
+    player 1's goal at 0, player 1's positions, player 2's goal, player 2's positions.
+
+    Parameters
+    ----------
+
+    piecesPerHole: int, optional
+        Number of starting pieces in each of the positions on the board, default 4
+
+    rowLength: int, optional
+        Number of positions in each row, default 6
+
+    """
+
+    __slots__ = ("piecesPerHole", "rowLength", "numberOfPositions", "player1Goal", "player2Goal", "pits", "tables", "owner", "sowCycles", "doubledCycles", "cycleIndex", "lastPosition", "sows", "keys", "hash", "occupied")
+
+    def __init__(self, piecesPerHole=4, rowLength=6):
+        self.piecesPerHole = piecesPerHole
+        self.rowLength = rowLength
+
+        self.player1Goal = 0
+        self.player2Goal = rowLength + 1
+        self.numberOfPositions = rowLength * 2 + 2
+
+        #stones in every position, goals start empty
+        self.pits = array("i", [piecesPerHole] * self.numberOfPositions)
+        self.pits[self.player1Goal] = 0
+        self.pits[self.player2Goal] = 0
+
+        #tables shared with every board of this size, the ones used while sowing are also kept directly on the state
+        self.tables = boardTables(rowLength)
+        self.owner = self.tables.owner
+        self.sowCycles = self.tables.sowCycles
+        self.doubledCycles = self.tables.doubledCycles
+        self.cycleIndex = self.tables.cycleIndex
+
+        #hash of the board (see ZobristKeys) and bitmask of positions with stones in them, kept up to date by self.sow()
+        self.keys = zobristKeys(self.numberOfPositions)
+        self.hash = 0
+        self.occupied = 0
+        self.rehash()
+
+        #details of the last call to self.move()
+        self.lastPosition = 0 #position the last stone landed in
+        self.sows = 0 #number of positions sown from, 1 plus the number of relay follow ups
+
+    def __repr__(self):
+        return repr(self.pits.tolist())
+
+    def copy(self):
+        """
+        Returns a new BoardState with a copy of the stones in each position. Tables are immutable and are shared.
+
+        """
+
+        new = BoardState.__new__(BoardState)
+        new.piecesPerHole = self.piecesPerHole
+        new.rowLength = self.rowLength
+        new.numberOfPositions = self.numberOfPositions
+        new.player1Goal = self.player1Goal
+        new.player2Goal = self.player2Goal
+        new.pits = array("i", self.pits)
+        new.tables = self.tables
+        new.owner = self.owner
+        new.sowCycles = self.sowCycles
+        new.doubledCycles = self.doubledCycles
+        new.cycleIndex = self.cycleIndex
+        new.lastPosition = self.lastPosition
+        new.sows = self.sows
+        new.keys = self.keys
+        new.hash = self.hash
+        new.occupied = self.occupied
+        return new
+
+    def rehash(self):
+        """
+        Recomputes self.hash and self.occupied from scratch. Needed after changing self.pits directly instead of 
+        through self.sow().
+
+        """
+
+        self.hash = self.keys.hashOf(self.pits)
+        self.occupied = sum(1 << position for position, stones in enumerate(self.pits) if stones)
+        return self.hash
+
+    def setStones(self, position, stones):
+        """
+        Puts stones in position, keeping self.hash and self.occupied up to date. Used for setting up positions
+        by hand, ie through Board.board.
+
+        """
+
+        self.hash = (self.hash + (stones - self.pits[position]) * self.keys.positionKeys[position]) & HASH_MASK
+        self.pits[position] = stones
+        if stones:
+            self.occupied |= 1 << position
+        else:
+            self.occupied &= ~(1 << position)
+
+    def hashKey(self, playerToMove):
+        """
+        Returns hash of board combined with the player to move, for use as a TranspositionTable key.
+
+        """
+
+        return self.hash ^ self.keys.sideKeys[playerToMove]
+
+    def sow(self, position, playerMoving):
+        """
+        Picks up every stone in position and deposits them one at a time into the following positions, skipping
+        the opponent's goal. Full laps of the board are added in bulk, so this is linear in the number of positions 
+        rather than the number of stones. self.hash and self.occupied are updated in a few operations for the whole sow. 
+        Does no validity checks, see Board.move.
+
+        Parameters
+        ----------
+
+        position: int
+            Position to pick stones up from
+
+        playerMoving: int, 1 or 2
+            Player sowing, decides which goal is skipped
+
+        Returns
+        -------
+
+        lastPosition: int
+            Position the last stone was deposited in (position itself if it was empty)
+
+        """
+
+        pits = self.pits
+        keys = self.keys
+        cycle = self.sowCycles[playerMoving]
+        cycleLength = len(cycle)
+        cyclePosition = self.cycleIndex[playerMoving][position]
+
+        numberFromPosition = pits[position]
+        pits[position] = 0
+
+        laps, remainder = divmod(numberFromPosition, cycleLength)
+
+        #the hash is linear in the stones, so taking them out and putting them back in is a few adds whatever the number of stones
+        doubledKeySums = keys.doubledKeySums[playerMoving]
+        boardHash = self.hash - numberFromPosition * keys.positionKeys[position] + doubledKeySums[cyclePosition + 1 + remainder] - doubledKeySums[cyclePosition + 1]
+        if laps:
+            boardHash += laps * keys.cycleKeys[playerMoving]
+
+        #every position stones are dropped in is now occupied, position moved from is only occupied if stones lapped back to it
+        doubledMasks = self.tables.doubledMasks[playerMoving]
+        occupied = self.occupied | doubledMasks[cyclePosition + 1] ^ doubledMasks[cyclePosition + 1 + remainder]
+        self.occupied = occupied | self.tables.lapMasks[playerMoving] if laps else occupied & ~(1 << position)
+
+        #full laps of the board put the same number of stones in every position of the cycle (including the one moved from)
+        if laps:
+            for lapPosition in cycle:
+                pits[lapPosition] += laps
+
+        #remaining stones go one each into the positions following the one moved from
+        lastPosition = position
+        for lastPosition in self.doubledCycles[playerMoving][cyclePosition + 1:cyclePosition + 1 + remainder]:
+            pits[lastPosition] += 1
+
+        self.hash = boardHash & HASH_MASK
+        return lastPosition
+
+    def unsow(self, position, numberFromPosition, playerMoving):
+        """
+        Undoes the stones moved by self.sow(position, playerMoving) when position held numberFromPosition stones
+        before it. Takes the stones back out of every position they were dropped in (full laps in bulk) and puts 
+        them back in position. Only self.pits is changed, self.hash and self.occupied need restoring separately
+        (self.unmake() restores them from the undo log).
+
+        """
+
+        pits = self.pits
+        cycle = self.sowCycles[playerMoving]
+        cycleLength = len(cycle)
+        cyclePosition = self.cycleIndex[playerMoving][position]
+
+        laps, remainder = divmod(numberFromPosition, cycleLength)
+        for remainderPosition in self.doubledCycles[playerMoving][cyclePosition + 1:cyclePosition + 1 + remainder]:
+            pits[remainderPosition] -= 1
+        if laps:
+            for lapPosition in cycle:
+                pits[lapPosition] -= laps
+        pits[position] = numberFromPosition
+
+    def move(self, position, playerMoving, undoLog=None):
+        """
+        Plays a full move from position: sows it and then keeps sowing from wherever the last stone lands, as long
+        as that is not a goal and already held stones (relay sowing). This is a loop rather than recursion, so long 
+        relays don't use up stack frames. Does no validity checks, see Board.move. 
+
+        A relay always ends, so boards aren't checked for repeats. Counting the sowing cycle from just after the
+        mover's goal, a sow that doesn't reach the goal ends further along the cycle than it started, so within one
+        lap a sow reaches the goal and adds a stone to it, which can only happen as many times as there are stones.
+
+        Parameters
+        ----------
+
+        position: int
+            Position move starts from
+
+        playerMoving: int, 1 or 2
+            Player moving
+
+        undoLog: list, optional
+            If given, the move is recorded on the end of this list so self.unmake(undoLog) can undo it. For every
+            position sown from the position and the number of stones it held are added, followed by the previous 
+            self.hash, self.occupied, self.lastPosition and self.sows, playerMoving and the number of positions 
+            sown from. 
+
+        Returns
+        -------
+
+        result: int
+            EXTRA_TURN if the last stone landed in a goal, MOVE_FINISHED if it landed in an empty position. 
+            self.lastPosition and self.sows are set as well. 
+
+        """
+
+        pits = self.pits
+        owner = self.owner
+        startingHash = self.hash
+        startingOccupied = self.occupied
+        numberOfPositions = self.numberOfPositions
+
+        sows = 0
+        while True:
+            if undoLog is not None:
+                undoLog.append(position)
+                undoLog.append(pits[position])
+            position = self.sow(position, playerMoving)
+            sows += 1
+
+            if owner[position] == 0: #ended in goal, can only be moving player's goal as the other is skipped
+                result = EXTRA_TURN
+                break
+            if pits[position] < 2: #landed in empty position
+                result = MOVE_FINISHED
+                break
+            assert sows < numberOfPositions or sows <= numberOfPositions * (sum(pits) + 1), "relay did not end" #the bound from the docstring, only worked out once a relay is long
+
+        if undoLog is not None:
+            undoLog += (startingHash, startingOccupied, self.lastPosition, self.sows, playerMoving, sows)
+
+        self.lastPosition = position
+        self.sows = sows
+        return result
+
+    def unmake(self, undoLog):
+        """
+        Undoes the last move recorded in undoLog by self.move() and removes it from the log. The board, hash,
+        self.lastPosition and self.sows are put back exactly as they were before that move. 
+
+        Parameters
+        ----------
+
+        undoLog: list
+            Log passed to self.move()
+
+        """
+
+        sows = undoLog.pop()
+        playerMoving = undoLog.pop()
+        self.sows = undoLog.pop()
+        self.lastPosition = undoLog.pop()
+        self.occupied = undoLog.pop()
+        self.hash = undoLog.pop()
+        for x in range(sows): #undo sows in reverse order
+            numberFromPosition = undoLog.pop()
+            self.unsow(undoLog.pop(), numberFromPosition, playerMoving)
+
+    def legalMoves(self, player):
+        """
+        Returns tuple of every position player can move from (positions on their side with stones in them).
+        Looked up from the bits of self.occupied on player's side, no positions are checked one by one.
+
+        """
+
+        sideBits = self.occupied & self.tables.sideMasks[player]
+        moves = self.tables.movesByMask[player].get(sideBits)
+        if moves is None:
+            moves = self.tables.movesByMask[player][sideBits] = tuple(position for position in self.tables.playerPositions[player] if sideBits >> position & 1)
+        return moves
+
+    def isTerminal(self):
+        """
+        Returns True if the game is over, which is when either player has no stones left on their side.
+
+        """
+
+        sideMasks = self.tables.sideMasks
+        return not (self.occupied & sideMasks[1]) or not (self.occupied & sideMasks[2])
+
+    def finalScores(self):
+        """
+        Returns (player 1 score, player 2 score) for a finished game. When the game ends each player adds the
+        stones left on their side to their goal. 
+
+        """
+
+        pits = self.pits
+        return sum(pits[:self.player2Goal]), sum(pits[self.player2Goal:])
+
+    def finalDifference(self, player):
+        """
+        Returns player's final score minus their opponent's, see self.finalScores().
+
+        """
+
+        player1Score, player2Score = self.finalScores()
+        return player1Score - player2Score if player == 1 else player2Score - player1Score
@@ -0,0 +1,324 @@
+"""
+Command line entry point. Engine modules are only imported by the command that needs them, and pygame only by
+the gui command, so starting up for a simulation or a solve doesn't pay for the GUI.
+
+    python cli.py simulate greedy random --games 1000 --workers 4
+    python cli.py simulate greedy random --variant oware
+    python cli.py solve --depth 14 --time 10
+    python cli.py bench --only board --baseline results.json
+    python cli.py book opening.book --plies 6 --depth 14
+    python cli.py states --pieces 2 --row-length 4 --workers 4
+    python cli.py gui
+    python cli.py serve --port 8765
+    python cli.py bot greedy --server 127.0.0.1:8765 --opponent search:4
+    python cli.py gui --server 127.0.0.1:8765 --game 1
+
+Strategies are given as name[:setting]: random, greedy, search[:depth], mcts[:seconds per move] or book:path (an
+opening book, searching to depth 6 once out of it).
+
+"""
+
+import argparse
+import json
+import sys
+
+def parseStrategy(specification):
+    """
+    argparse type for strategies, see strategies.strategyFromName.
+
+    """
+
+    try:
+        from strategies import strategyFromName
+        return strategyFromName(specification)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(str(error))
+
+def parseAddress(text):
+    """
+    Returns (host, port) from host:port.
+
+    """
+
+    host, separator, port = text.rpartition(":")
+    try:
+        return host or "127.0.0.1", int(port)
+    except ValueError:
+        raise argparse.ArgumentTypeError("server must be host:port, got {!r}".format(text))
+
+def parsePits(text):
+    """
+    Returns a list of ints from comma separated stone counts, one per position starting at player 1's goal.
+
+    """
+
+    try:
+        return [int(stones) for stones in text.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError("pits must be comma separated integers, got {!r}".format(text))
+
+def simulateCommand(arguments):
+    """
+    Plays a tournament between two strategies and prints the totals.
+
+    """
+
+    from tournament import runTournament
+
+    def onProgress(gamesPlayed, games, result):
+        if not arguments.quiet:
+            print("{}/{} games".format(gamesPlayed, games), file=sys.stderr)
+
+    try:
+        result = runTournament(arguments.strategyA, arguments.strategyB, arguments.games, arguments.pieces, arguments.rowLength,
+                               arguments.seed, arguments.workers, arguments.chunkSize, onProgress=onProgress, variant=arguments.variant)
+    except ValueError as error: #a strategy that can't play the variant
+        print(error, file=sys.stderr)
+        return 2
+    if arguments.json:
+        print(json.dumps(result.asDict(), indent=2))
+    else:
+        print(result)
+    return 0
+
+def solveCommand(arguments):
+    """
+    Searches a position (the opening by default) and prints the best move found at each depth.
+
+    """
+
+    from array import array
+
+    from board import Board
+    from solver import Solver
+
+    board = Board(arguments.pieces, arguments.rowLength)
+    if arguments.pits is not None:
+        if len(arguments.pits) != board.numberOfPositions:
+            print("expected {} pits for rowLength {}, got {}".format(board.numberOfPositions, arguments.rowLength, len(arguments.pits)), file=sys.stderr)
+            return 2
+        board.state.pits[:] = array("i", arguments.pits)
+        board.state.rehash()
+
+    endgame = None
+    if arguments.endgame is not None:
+        from endgameDatabase import EndgameDatabase
+        endgame = EndgameDatabase(arguments.endgame)
+
+    try:
+        solver = Solver(maxDepth=arguments.depth, timeLimit=arguments.time, endgame=endgame)
+        onIteration = None if arguments.quiet else (lambda iteration: print(iteration, file=sys.stderr))
+        result = solver.search(board, arguments.player, onIteration)
+    finally:
+        if endgame is not None:
+            endgame.close()
+
+    if arguments.json:
+        print(json.dumps({"bestMove": result.bestMove, "value": result.value, "depth": result.depth, "nodes": result.nodes,
+                          "seconds": result.seconds, "nodesPerSecond": result.nodesPerSecond}, indent=2))
+    else:
+        print(result)
+    return 0
+
+def bookCommand(arguments):
+    """
+    Builds an opening book.
+
+    """
+
+    from openingBook import buildOpeningBook
+
+    def onPosition(positionsSearched, positions):
+        if not arguments.quiet and (positionsSearched % 100 == 0 or positionsSearched == positions):
+            print("{}/{} positions".format(positionsSearched, positions), file=sys.stderr)
+
+    positions = buildOpeningBook(arguments.path, arguments.pieces, arguments.rowLength, arguments.plies, arguments.depth,
+                                 arguments.time, arguments.workers, onPosition)
+    if arguments.json:
+        print(json.dumps({"path": arguments.path, "positions": positions}))
+    else:
+        print("wrote {} positions to {}".format(positions, arguments.path))
+    return 0
+
+def statesCommand(arguments):
+    """
+    Enumerates every position reachable from the opening and prints the totals.
+
+    """
+
+    from stateSpace import enumerateStateSpace
+
+    def onLevel(level, newPositions, positions):
+        if not arguments.quiet:
+            print("level {}: {} new, {} positions".format(level, newPositions, positions), file=sys.stderr)
+
+    statistics = enumerateStateSpace(arguments.pieces, arguments.rowLength, arguments.workers, arguments.memoryLimit,
+                                     directory=arguments.directory, onLevel=onLevel)
+    if arguments.json:
+        print(json.dumps(statistics.asDict(), indent=2))
+    else:
+        print(statistics)
+        print("relay lengths: {}".format(dict(sorted(statistics.relayLengths.items()))))
+    return 0
+
+def serveCommand(arguments):
+    """
+    Runs a GameServer until interrupted.
+
+    """
+
+    import asyncio
+
+    from gameServer import GameServer
+
+    server = GameServer(arguments.host, arguments.port, arguments.botWorkers)
+
+    async def serve():
+        await server.start()
+        if not arguments.quiet:
+            print("serving on {}:{}".format(server.host, server.port), file=sys.stderr)
+        await server.serveForever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+def botCommand(arguments):
+    """
+    Plays games on a GameServer with a strategy, one after another.
+
+    """
+
+    import asyncio
+
+    from gameServer import playBot
+
+    host, port = arguments.server
+    for game in range(arguments.games):
+        score = asyncio.run(playBot(arguments.strategy, host, port, arguments.game, arguments.pieces, arguments.rowLength, arguments.opponent))
+        if arguments.json:
+            print(json.dumps({"score": score}))
+        else:
+            print("player 1: {}  player 2: {}".format(*score))
+    return 0
+
+def benchCommand(arguments):
+    """
+    Runs benchmarks.py with every argument cli.py didn't use, --help included.
+
+    """
+
+    import benchmarks
+    return benchmarks.main(arguments.benchmarkArguments)
+
+def guiCommand(arguments):
+    """
+    Opens the pygame window. This is the only command that imports pygame.
+
+    """
+
+    from main import Game
+    Game(piecesPerHole=arguments.pieces, rowLength=arguments.rowLength, server=arguments.server, gameId=arguments.game, opponent=arguments.opponent).on_execute()
+    return 0
+
+def buildParser():
+    """
+    Returns the argparse parser for every command.
+
+    """
+
+    parser = argparse.ArgumentParser(description="Mancala simulation, solving and benchmarking.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def addBoardArguments(commandParser):
+        commandParser.add_argument("--pieces", type=int, default=4, help="starting pieces in each position (default 4)")
+        commandParser.add_argument("--row-length", dest="rowLength", type=int, default=6, help="positions in each row (default 6)")
+        commandParser.add_argument("--json", action="store_true", help="print the result as JSON")
+        commandParser.add_argument("--quiet", action="store_true", help="don't print progress")
+
+    simulate = commands.add_parser("simulate", help="play a tournament between two strategies")
+    simulate.add_argument("strategyA", type=parseStrategy, help="strategy the results are reported for")
+    simulate.add_argument("strategyB", type=parseStrategy, help="opposing strategy")
+    simulate.add_argument("--games", type=int, default=100, help="number of games (default 100)")
+    simulate.add_argument("--seed", type=int, default=0, help="tournament seed (default 0)")
+    simulate.add_argument("--workers", type=int, default=None, help="worker processes, 1 plays in this process (default one per CPU)")
+    simulate.add_argument("--chunk-size", dest="chunkSize", type=int, default=50, help="games sent to a worker at a time (default 50)")
+    simulate.add_argument("--variant", choices=("relay", "oware"), default=None, help="play a rule variant, random and greedy only (default Board's rules)")
+    addBoardArguments(simulate)
+    simulate.set_defaults(function=simulateCommand)
+
+    solve = commands.add_parser("solve", help="search a position for the best move")
+    solve.add_argument("--depth", type=int, default=12, help="deepest search (default 12)")
+    solve.add_argument("--time", type=float, default=None, help="seconds to search for (default no limit)")
+    solve.add_argument("--player", type=int, choices=(1, 2), default=1, help="player to move (default 1)")
+    solve.add_argument("--pits", type=parsePits, default=None, help="comma separated stones in every position from player 1's goal (default the opening)")
+    solve.add_argument("--endgame", default=None, help="endgame database file to use")
+    addBoardArguments(solve)
+    solve.set_defaults(function=solveCommand)
+
+    book = commands.add_parser("book", help="build an opening book")
+    book.add_argument("path", help="file to write")
+    book.add_argument("--plies", type=int, default=6, help="positions up to this many moves from the opening are stored (default 6)")
+    book.add_argument("--depth", type=int, default=14, help="depth each position is searched to (default 14)")
+    book.add_argument("--time", type=float, default=None, help="most seconds per position (default no limit)")
+    book.add_argument("--workers", type=int, default=None, help="worker processes (default one per CPU)")
+    addBoardArguments(book)
+    book.set_defaults(function=bookCommand)
+
+    states = commands.add_parser("states", help="count every position reachable from the opening, for small boards")
+    states.add_argument("--pieces", type=int, default=2, help="starting pieces in each position (default 2)")
+    states.add_argument("--row-length", dest="rowLength", type=int, default=3, help="positions in each row (default 3)")
+    states.add_argument("--workers", type=int, default=1, help="worker processes positions are split between (default 1)")
+    states.add_argument("--memory-limit", dest="memoryLimit", type=int, default=1 << 22, help="seen positions each worker keeps in memory before spilling to disk (default 4194304)")
+    states.add_argument("--directory", default=None, help="where to put frontier and spill files (default a temporary directory)")
+    states.add_argument("--json", action="store_true", help="print the result as JSON")
+    states.add_argument("--quiet", action="store_true", help="don't print progress")
+    states.set_defaults(function=statesCommand)
+
+    bench = commands.add_parser("bench", add_help=False, help="run benchmarks.py, every other argument is passed on to it")
+    bench.set_defaults(function=benchCommand)
+
+    gui = commands.add_parser("gui", help="open the pygame window")
+    gui.add_argument("--pieces", type=int, default=4, help="starting pieces in each position (default 4)")
+    gui.add_argument("--row-length", dest="rowLength", type=int, default=6, help="positions in each row (default 6)")
+    gui.add_argument("--server", type=parseAddress, default=None, help="host:port of a game server to play on")
+    gui.add_argument("--game", type=int, default=None, help="game on the server to join (default starts a new one)")
+    gui.add_argument("--opponent", default="human", help="opponent when starting a game on the server, human or a strategy (default human)")
+
+    serve = commands.add_parser("serve", help="host games for gui and bot clients")
+    serve.add_argument("--host", default="127.0.0.1", help="address to listen on (default 127.0.0.1)")
+    serve.add_argument("--port", type=int, default=8765, help="port to listen on (default 8765)")
+    serve.add_argument("--bot-workers", dest="botWorkers", type=int, default=None, help="processes picking bot moves (default one per CPU)")
+    serve.add_argument("--quiet", action="store_true", help="don't print the address")
+    serve.set_defaults(function=serveCommand)
+
+    bot = commands.add_parser("bot", help="play games on a game server with a strategy")
+    bot.add_argument("strategy", type=parseStrategy, help="strategy to play with")
+    bot.add_argument("--server", type=parseAddress, default=("127.0.0.1", 8765), help="host:port of the server (default 127.0.0.1:8765)")
+    bot.add_argument("--game", type=int, default=None, help="game to join (default starts a new one)")
+    bot.add_argument("--opponent", default="human", help="opponent when starting a game, human or a strategy (default human)")
+    bot.add_argument("--games", type=int, default=1, help="number of games to play (default 1)")
+    addBoardArguments(bot)
+    bot.set_defaults(function=botCommand)
+    gui.set_defaults(function=guiCommand)
+
+    return parser
+
+def main(argv=None):
+    """
+    Runs the command given in argv (sys.argv by default) and returns its exit code.
+
+    """
+
+    parser = buildParser()
+    arguments, otherArguments = parser.parse_known_args(argv)
+    if arguments.command == "bench":
+        arguments.benchmarkArguments = otherArguments
+    elif otherArguments:
+        parser.error("unrecognized arguments: {}".format(" ".join(otherArguments)))
+    return arguments.function(arguments)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,344 @@
+"""
+Endgame database. Stores the exact value of every position with up to maxStones stones left on the board (not
+counting goals) for one rowLength. Stones already in a goal can't come back out, so what is left to win only
+depends on the stones in play and who is moving, and the value stored is (stones player to move will still get)
+minus (stones opponent will still get). The board is symmetric, so positions are always stored as if player 1
+was moving, with player 2's positions rotated round to player 1's side.
+
+Positions with k stones are the compositions of k over the 2 * rowLength positions. Each is given a perfect index
+with the combinatorial number system, so the file is just every value in index order after a small header.
+
+File layout: MAGIC, then rowLength, maxStones and the array typecode of the values, then the values for 0 stones,
+1 stone, ... maxStones stones.
+
+"""
+
+import mmap
+import struct
+from array import array
+from math import comb
+
+from boardState import BoardState, EXTRA_TURN
+
+MAGIC = b"MANCEGDB"
+HEADER = struct.Struct("<8sIIc3x")
+
+def levelSize(rowLength, stones):
+    """
+    Returns the number of positions with exactly stones stones spread over the 2 * rowLength positions.
+
+    """
+
+    parts = rowLength * 2
+    return comb(stones + parts - 1, parts - 1)
+
+def positionIndex(counts, binomials):
+    """
+    Returns the rank of counts (stones in each position, in canonical order) among every position with the same
+    number of stones. Treats the counts as stars and bars and ranks where the bars are with the combinatorial
+    number system (colex order).
+
+    Parameters
+    ----------
+
+    counts: sequence of int
+        Stones in each position, player to move's positions first
+
+    binomials: list of list of int
+        binomials[n][r] is n choose r, from _binomialTable
+
+    Returns
+    -------
+
+    index: int
+        Rank between 0 and levelSize - 1
+
+    """
+
+    index = 0
+    bar = -1
+    for barNumber in range(1, len(counts)):
+        bar += counts[barNumber - 1] + 1 #position of this bar among stars and bars
+        index += binomials[bar][barNumber]
+    return index
+
+def _binomialTable(size):
+    """
+    Returns table where table[n][r] is n choose r for n, r < size.
+
+    """
+
+    return [[comb(n, r) for r in range(size)] for n in range(size)]
+
+def _compositions(stones, parts):
+    """
+    Yields every way of splitting stones stones over parts positions as tuples.
+
+    """
+
+    if parts == 1:
+        yield (stones,)
+        return
+    for first in range(stones + 1):
+        for rest in _compositions(stones - first, parts - 1):
+            yield (first,) + rest
+
+def _canonical(pits, rowLength, playerToMove):
+    """
+    Returns the stones in each non-goal position of pits, starting with playerToMove's side.
+
+    """
+
+    side1 = tuple(pits[1:rowLength + 1])
+    side2 = tuple(pits[rowLength + 2:])
+    return side1 + side2 if playerToMove == 1 else side2 + side1
+
+def buildEndgameDatabase(path, rowLength, maxStones, onLevel=None):
+    """
+    Solves every position with up to maxStones stones in play, from fewest stones up, and writes the values to path.
+
+    A move either puts stones in the mover's goal, going to a level with fewer stones that is already solved, or
+    keeps every stone in play and stays on the same level. Moves within a level can go round in circles, so plain
+    value updates can keep flipping between values forever. Instead every position in a level gets a lower and an
+    upper bound on its value, starting at -stones and stones, and the bounds are tightened from the bounds of the
+    positions it moves to (a move that passes the turn swaps and negates them). Lower bounds only go up and upper
+    bounds only go down, so this always finishes, and positions whose bounds meet have that exact value whatever
+    endless games are worth. Positions whose bounds never meet can only be decided by playing forever, and get the
+    value they would have if the game stopped there (stones on your side minus stones on the opponent's side, the
+    Oware rule for endless games) clamped to their bounds.
+
+    Parameters
+    ----------
+
+    path: str
+        File to write
+
+    rowLength: int
+        Number of positions in each row
+
+    maxStones: int
+        Largest number of stones in play to solve for
+
+    onLevel: callable, optional
+        Called with (stones, positions, cyclingPositions) as each level is solved, where cyclingPositions is the
+        number of positions given the endless game value
+
+    Returns
+    -------
+
+    cycling: list of tuple
+        For each number of stones, the indexes of the positions given the endless game value. Every other
+        position's value is the best of its moves' values
+
+    """
+
+    typecode = "b" if maxStones <= 127 else "h"
+    binomials = _binomialTable(maxStones + rowLength * 2 + 1)
+    scratch = BoardState(0, rowLength)
+    levels = []
+    cycling = []
+
+    for stones in range(maxStones + 1):
+        size = levelSize(rowLength, stones)
+        values = array(typecode, bytes(size * array(typecode).itemsize))
+        fixedValues = [None] * size #best value over moves that leave this level (and terminal values)
+        sameLevelMoves = [None] * size #(sign, index) for moves that stay on this level
+        stopValues = {} #value if the game stopped here, for positions with moves that stay on this level
+
+        for counts in _compositions(stones, rowLength * 2):
+            index = positionIndex(counts, binomials)
+            side1 = sum(counts[:rowLength])
+            side2 = stones - side1
+            if side1 == 0 or side2 == 0: #game over, each player gets the stones on their side
+                values[index] = side1 - side2
+                fixedValues[index] = side1 - side2
+                continue
+
+            best = None
+            stayingMoves = []
+            for move in range(1, rowLength + 1):
+                if counts[move - 1] == 0:
+                    continue
+                scratch.pits[:] = array("i", (0,) + counts[:rowLength] + (0,) + counts[rowLength:])
+                result = scratch.move(move, 1)
+
+                gain = scratch.pits[0]
+                if result == EXTRA_TURN: #still player 1 to move, board stays the same way round
+                    sign = 1
+                    childCounts = _canonical(scratch.pits, rowLength, 1)
+                else:
+                    sign = -1
+                    childCounts = _canonical(scratch.pits, rowLength, 2)
+
+                childStones = stones - gain
+                childIndex = positionIndex(childCounts, binomials)
+                if childStones == stones:
+                    stayingMoves.append((sign, childIndex))
+                else:
+                    value = gain + sign * levels[childStones][childIndex]
+                    if best is None or value > best:
+                        best = value
+
+            fixedValues[index] = best
+            if stayingMoves:
+                sameLevelMoves[index] = stayingMoves
+                stopValues[index] = side1 - side2
+            else:
+                values[index] = best
+
+        #tighten bounds of positions with moves that stay on this level, rechecking a position whenever one it moves to changes
+        lower = {index: -stones for index in stopValues}
+        upper = {index: stones for index in stopValues}
+        parents = {index: [] for index in stopValues}
+        for index in stopValues:
+            for sign, childIndex in sameLevelMoves[index]:
+                if childIndex in parents:
+                    parents[childIndex].append(index)
+        pending = list(stopValues)
+        queued = set(pending)
+        while pending:
+            index = pending.pop()
+            queued.discard(index)
+            low = high = fixedValues[index]
+            for sign, childIndex in sameLevelMoves[index]:
+                if childIndex not in lower: #already exact
+                    childLow = childHigh = sign * values[childIndex]
+                elif sign == 1:
+                    childLow, childHigh = lower[childIndex], upper[childIndex]
+                else:
+                    childLow, childHigh = -upper[childIndex], -lower[childIndex]
+                low = childLow if low is None or childLow > low else low
+                high = childHigh if high is None or childHigh > high else high
+            if low > lower[index] or high < upper[index]:
+                lower[index] = max(low, lower[index])
+                upper[index] = min(high, upper[index])
+                for parent in parents[index]:
+                    if parent not in queued:
+                        queued.add(parent)
+                        pending.append(parent)
+
+        cyclingPositions = []
+        for index, stopValue in stopValues.items():
+            if lower[index] == upper[index]:
+                values[index] = lower[index]
+            else: #clamped so the positions whose bounds met stay the best of their moves
+                values[index] = min(max(stopValue, lower[index]), upper[index])
+                cyclingPositions.append(index)
+
+        levels.append(values)
+        cycling.append(tuple(sorted(cyclingPositions)))
+        if onLevel is not None:
+            onLevel(stones, size, len(cyclingPositions))
+
+    with open(path, "wb") as databaseFile:
+        databaseFile.write(HEADER.pack(MAGIC, rowLength, maxStones, typecode.encode()))
+        for values in levels:
+            values.tofile(databaseFile)
+    return cycling
+
+class EndgameDatabase:
+    """
+    Reads a file written by buildEndgameDatabase. The file is memory mapped and read as a typed memoryview, so
+    opening it doesn't load anything and a lookup reads a single value.
+
+    Parameters
+    ----------
+
+    path: str
+        Database file
+
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.rowLength, self.maxStones, typecode = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            self.close()
+            raise self.NotAnEndgameDatabase(path)
+        self._values = memoryview(self._mmap)[HEADER.size:].cast(typecode.decode())
+
+        #index of first value for each number of stones
+        self._levelOffsets = [0]
+        for stones in range(self.maxStones + 1):
+            self._levelOffsets.append(self._levelOffsets[-1] + levelSize(self.rowLength, stones))
+        self._binomials = _binomialTable(self.maxStones + self.rowLength * 2 + 1)
+
+    def __repr__(self):
+        return "EndgameDatabase({!r}, rowLength={}, maxStones={})".format(self.path, self.rowLength, self.maxStones)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exceptionInfo):
+        self.close()
+
+    def close(self):
+        """
+        Releases the memory map and closes the file.
+
+        """
+
+        if self._mmap is not None:
+            self._values = None
+            self._mmap.close()
+            self._file.close()
+            self._mmap = None
+
+    def covers(self, state):
+        """
+        Returns True if the database has the value for state (same rowLength and few enough stones in play).
+
+        """
+
+        return state.rowLength == self.rowLength and sum(state.pits) - state.pits[state.player1Goal] - state.pits[state.player2Goal] <= self.maxStones
+
+    def lookup(self, state, playerToMove):
+        """
+        Returns the stones playerToMove will still get minus the stones their opponent will still get, with both
+        playing perfectly. Only valid if self.covers(state).
+
+        Parameters
+        ----------
+
+        state: BoardState
+            Position to look up
+
+        playerToMove: int, 1 or 2
+            Player to move
+
+        Returns
+        -------
+
+        value: int
+            Value of the stones in play for playerToMove
+
+        """
+
+        counts = _canonical(state.pits, self.rowLength, playerToMove)
+        return self._values[self._levelOffsets[sum(counts)] + positionIndex(counts, self._binomials)]
+
+    def finalDifference(self, state, playerToMove):
+        """
+        Returns the final score difference for playerToMove with perfect play from state, goals included.
+
+        """
+
+        goalDifference = state.pits[state.player1Goal] - state.pits[state.player2Goal]
+        if playerToMove == 2:
+            goalDifference = -goalDifference
+        return goalDifference + self.lookup(state, playerToMove)
+
+    #Defining Exceptions
+    class NotAnEndgameDatabase(Exception):
+        """
+        Exception raised if the file opened doesn't start with the endgame database header.
+
+        """
+
+        def __init__(self, path, message="{} is not an endgame database file."):
+            self.path = path
+            self.message = message.format(self.path)
+            super().__init__(self.message)
@@ -1,3 +1,6 @@
+from array import array
+from operator import itemgetter
+
 class LimitedListIterator:
     """
     Iterator Class 
@@ -42,16 +45,106 @@ class LimitedList:
     length: int 
         Length of list. This cannot be changed once object is initialized.
 
+    typecode: str, optional
+        If given, values are stored in a contiguous array.array of this typecode (ie "i") starting at 0 instead
+        of a list of None. A typed LimitedList supports the buffer protocol and slicing it returns a memoryview
+        sharing its memory rather than a copy. Default None (list backed)
+
+    backing: array.array, optional
+        Existing array of length values to use as the typed store, shared rather than copied, ie a
+        BoardState's pits. Default None
+
+    onSet: callable, optional
+        If given, every write (indexing, setMany, current and next with setValue) calls onSet(index, value)
+        instead of storing the value itself, so the owner of a shared backing array can keep anything derived
+        from it up to date, ie BoardState.setStones. Slices and views are then read only, so they can't be
+        written around it. Default None
+
     """
 
-    def __init__(self, length):
+    _gettersByLength = {} #length to cache of itemgetters, shared as a range check only depends on length
+
+    def __init__(self, length, typecode=None, backing=None, onSet=None):
         self.length = length
-        self._lst = [None] * self.length #create list of None values with specified length 
+        self._onSet = onSet
+        if backing is not None: #share an existing typed store
+            if len(backing) != self.length:
+                raise ValueError("backing has {} values, expected {}".format(len(backing), self.length))
+            self._lst = backing
+        elif typecode is not None:
+            self._lst = array(typecode, bytes(self.length * array(typecode).itemsize)) #contiguous store of zeros
+        else:
+            self._lst = [None] * self.length #create list of None values with specified length 
+        self._setViews()
 
         self._observingIndex = 0 #when looping with self.next(), this variable used to store current location in loop (special implemantation of form of iteration)
 
+    def _setViews(self):
+        """
+        Sets up the attributes derived from the store, which can't be pickled or copied.
+
+        """
+
+        self._view = memoryview(self._lst) if isinstance(self._lst, array) else None #zero copy view used for slices of typed stores
+        if self._view is not None and self._onSet is not None: #writes have to go through onSet
+            self._view = self._view.toreadonly()
+        self._getters = LimitedList._gettersByLength.setdefault(self.length, {}) #range checked itemgetters for index tuples, see self.getMany()
+
+    def __getstate__(self):
+        """
+        Leaves out the memoryview and itemgetter cache so a LimitedList (and a Board holding one) can be pickled
+        and deep copied. A shared backing array stays shared with whatever else is copied alongside it.
+
+        """
+
+        state = self.__dict__.copy()
+        del state["_view"], state["_getters"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._setViews()
+
     def __repr__(self):
-        return repr(self._lst) #when printing class, simply do what would happen if printing internal list
+        return repr(self._lst if self._view is None else self._lst.tolist()) #when printing class, simply do what would happen if printing internal list
+
+    def __len__(self):
+        return self.length
+
+    def __buffer__(self, flags):
+        """
+        Buffer protocol (python 3.12+), lets memoryview(), numpy and struct read a typed store without copying.
+        On older versions use self.view().
+
+        """
+
+        if self._view is None:
+            raise TypeError("only a LimitedList with a typecode or backing array supports the buffer protocol")
+        return memoryview(self._view)
+
+    def view(self):
+        """
+        Returns a memoryview of the typed store, sharing its memory. Read only if the LimitedList has onSet.
+
+        Raises
+        ------
+
+        TypeError
+            If the LimitedList is list backed
+        
+        """
+
+        return self.__buffer__(0)
+
+    def asNumpy(self):
+        """
+        Returns a numpy array sharing the typed store's memory, so slices of it are views too. numpy is only
+        imported when this is called.
+
+        """
+
+        import numpy as np
+        return np.frombuffer(self.view(), dtype=self._lst.typecode)
 
     def __getitem__(self, indices):
         """ 
@@ -85,7 +178,7 @@ class LimitedList:
         
         elif isinstance(indices, (int, slice)): #if a slice is passed, return a list of all values within slice (inclusive first value, exclusive second)
             if (indices.start == None or indices.start >= 0) and (indices.stop == None or indices.stop <= self.length-1): #if slice values provided are within the range of the list
-                return self._lst[indices] #return simply the slice of the internal list object 
+                return self._lst[indices] if self._view is None else self._view[indices] #slice of the internal list object, or a zero copy view of a typed store
             else: #if the slice bounds are out of range of the list, return out of range error 
                 if not (indices.start == None or indices.start >= 0): #if it was the starting value that caused issues
                     raise self.IndexOutOfRangeError(indices.start, 0, self.length - 1)
@@ -95,13 +188,7 @@ class LimitedList:
                     raise self.IndexOutOfRangeError(indices, 0, self.length - 1) 
 
         elif isinstance(indices, tuple): #return all values at all indicies if multiple indicies are passed (signified by tuple being passed)
-            result = [] #empty list to return 
-            for index in indices:
-                if index <= (self.length - 1) and index >= 0: #make sure index is within range of list 
-                    result.append(self._lst[index])
-                else: #raise exception if one of passed indices is out of range of list
-                    raise self.IndexOutOfRangeError(index, 0, self.length - 1)
-            return result  
+            return self.getMany(indices)
         else:
             raise self.IndexObjectNotAcceptedError(type(indices), [int, tuple, slice])
         
@@ -133,27 +220,82 @@ class LimitedList:
         """
         if isinstance(key, int): #if single key is passed, set only one key to specified value
             if key <= (self.length - 1) and key >= 0: #only set value if key is within set "boundries" of list
-                self._lst[key] = value
+                if self._onSet is None:
+                    self._lst[key] = value
+                else:
+                    self._onSet(key, value)
             else:
                 raise self.IndexOutOfRangeError(key, 0, self.length-1)
 
         elif isinstance(key, tuple) and isinstance(value, tuple) and len(key) == len(value): #handle setting multiple keys all to different values
-            for index, specificValue in zip(key, value): #loop through values in key argument and value argument at the same time
-                if index <= (self.length - 1) and index >= 0: #only set value if index is within range of list 
-                    self._lst[index] = specificValue 
-                else: #if index not in range, raise exception
-                    raise self.IndexOutOfRangeError(index, 0, self.length-1)
+            self.setMany(key, value)
         
         elif isinstance(key, tuple): #handle assignment of multiple keys to same value (depended on value not being tuple, will be caught by above elif otherwise)
-            for index in key: 
-                if index <= (self.length - 1) and index >= 0: #only set value if index is within range of list 
-                    self._lst[index] = value
-                else: #if index not in range, raise exception
-                    raise self.IndexOutOfRangeError(index, 0, self.length-1)
+            self.setMany(key, (value,) * len(key))
         
         else: #if key object is niether a tuple or a integer, raise exception
             raise self.IndexObjectNotAcceptedError(type(key), [int, tuple])
 
+    def getMany(self, indices):
+        """
+        Returns the values at every index in indices as a list. Each distinct set of indices is range checked
+        once and turned into an operator.itemgetter, which is cached (shared by every LimitedList of the same
+        length), so reading the same index set again does no per index checks in python.
+
+        Raises
+        ------
+
+        IndexOutOfRangeError
+            If any index is out of range of the list
+
+        """
+
+        getter = self._getters.get(indices)
+        if getter is None:
+            getter = self._indexGetter(indices)
+        values = getter(self._lst)
+        return list(values) if len(indices) != 1 else [values]
+
+    def setMany(self, indices, values):
+        """
+        Sets self[indices[i]] to values[i] for every i. Indices are range checked once per distinct set, as in
+        self.getMany().
+
+        Raises
+        ------
+
+        IndexOutOfRangeError
+            If any index is out of range of the list
+
+        """
+
+        if indices not in self._getters:
+            self._indexGetter(indices)
+        store = self._lst.__setitem__ if self._onSet is None else self._onSet
+        for index, value in zip(indices, values):
+            store(index, value)
+
+    def _indexGetter(self, indices):
+        """
+        Range checks indices and returns (and caches) an itemgetter for them.
+
+        Raises
+        ------
+
+        IndexOutOfRangeError
+            For the first index out of range
+
+        """
+
+        for index in indices:
+            if not (index <= (self.length - 1) and index >= 0):
+                raise self.IndexOutOfRangeError(index, 0, self.length - 1)
+        if len(self._getters) >= 1024: #index sets are normally fixed (ie sides of a board), don't grow without limit if they aren't
+            self._getters.clear()
+        getter = itemgetter(*indices) if indices else (lambda lst: ())
+        self._getters[indices] = getter
+        return getter
+
     #functions for handling custom iterator that loops over list
     def iterationLocation(self):
         """
@@ -182,7 +324,7 @@ class LimitedList:
         """
 
         if setValue != None:
-            self._lst[self._observingIndex] = setValue
+            self[self._observingIndex] = setValue
 
         return(self._lst[self._observingIndex])
 
@@ -214,7 +356,7 @@ class LimitedList:
 
         #set next value if setValue specified
         if setValue != None:
-            self._lst[self._observingIndex] = setValue
+            self[self._observingIndex] = setValue
 
         return (self._lst[self._observingIndex])
 
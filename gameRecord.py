@@ -0,0 +1,353 @@
+"""
+Compact append only file format for finished games.
+
+A file starts with MAGIC and a format version, followed by records one after another. Each record is a fixed
+header (rowLength, piecesPerHole, player 1's and player 2's final scores, number of moves) then one byte per
+move and the extra turn flags packed eight to a byte. A move is stored as its place on the mover's side (0 is
+the first position of their row), which is why rowLength is limited to 255. The mover of each move isn't
+stored, it follows from the extra turn flags as player 1 always starts.
+
+Writers only ever add whole records to the end of a file, so files can be appended to by later runs and read
+while they grow.
+
+"""
+
+import struct
+
+from board import Board
+
+MAGIC = b"MANCGREC"
+VERSION = 1
+FILE_HEADER = struct.Struct("<8sB")
+RECORD_HEADER = struct.Struct("<BIIII") #rowLength, piecesPerHole, player1Score, player2Score, number of moves
+
+class GameRecord:
+    """
+    One recorded game.
+
+    Parameters
+    ----------
+
+    rowLength: int
+        Number of positions in each row
+
+    piecesPerHole: int
+        Number of starting pieces in each of the positions on the board
+
+    moves: list of int
+        Board position moved from for every move, in order
+
+    extraTurns: list of bool
+        For each move, True if it ended in the mover's goal so they moved again
+
+    player1Score: int
+        Player 1's final score
+
+    player2Score: int
+        Player 2's final score
+
+    """
+
+    __slots__ = ("rowLength", "piecesPerHole", "moves", "extraTurns", "player1Score", "player2Score")
+
+    def __init__(self, rowLength, piecesPerHole, moves, extraTurns, player1Score, player2Score):
+        self.rowLength = rowLength
+        self.piecesPerHole = piecesPerHole
+        self.moves = moves
+        self.extraTurns = extraTurns
+        self.player1Score = player1Score
+        self.player2Score = player2Score
+
+    def __repr__(self):
+        return "GameRecord(rowLength={}, piecesPerHole={}, moves={}, score={}-{})".format(self.rowLength, self.piecesPerHole, len(self.moves), self.player1Score, self.player2Score)
+
+    def __eq__(self, other):
+        return isinstance(other, GameRecord) and all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def movers(self):
+        """
+        Returns the player (1 or 2) who played each move.
+
+        """
+
+        movers = []
+        player = 1
+        for extraTurn in self.extraTurns:
+            movers.append(player)
+            if not extraTurn:
+                player = 3 - player
+        return movers
+
+    def replay(self):
+        """
+        Plays the game again through Board.move, yielding the board after every move. The same Board is yielded
+        each time, copy it to keep a position.
+
+        Yields
+        ------
+
+        moveNumber: int
+            Number of moves played so far, from 1
+
+        board: Board
+            Board after that move
+
+        """
+
+        board = Board(self.piecesPerHole, self.rowLength)
+        for moveNumber, (position, player) in enumerate(zip(self.moves, self.movers()), 1):
+            board.move(position, player)
+            yield moveNumber, board
+
+    def boardAfter(self, moveNumber):
+        """
+        Returns a new Board in the position after moveNumber moves (0 is the starting position).
+
+        """
+
+        if moveNumber == 0:
+            return Board(self.piecesPerHole, self.rowLength)
+        for playedMoves, board in self.replay():
+            if playedMoves == moveNumber:
+                return board
+        raise IndexError("game only has {} moves".format(len(self.moves)))
+
+    def toBytes(self):
+        """
+        Returns the record encoded as it is stored in a file.
+
+        """
+
+        numberOfMoves = len(self.moves)
+        firstPositions = (None, 1, self.rowLength + 2) #first position of each player's row
+        sidePlaces = bytes(position - firstPositions[player] for position, player in zip(self.moves, self.movers()))
+
+        flags = bytearray((numberOfMoves + 7) // 8)
+        for moveNumber, extraTurn in enumerate(self.extraTurns):
+            if extraTurn:
+                flags[moveNumber >> 3] |= 1 << (moveNumber & 7)
+
+        return RECORD_HEADER.pack(self.rowLength, self.piecesPerHole, self.player1Score, self.player2Score, numberOfMoves) + sidePlaces + bytes(flags)
+
+    @classmethod
+    def fromBytes(cls, data, offset=0):
+        """
+        Decodes the record starting at offset in data.
+
+        Returns
+        -------
+
+        record: GameRecord
+            Decoded game
+
+        end: int
+            Offset just past the record
+
+        """
+
+        rowLength, piecesPerHole, player1Score, player2Score, numberOfMoves = RECORD_HEADER.unpack_from(data, offset)
+        offset += RECORD_HEADER.size
+        sidePlaces = data[offset:offset + numberOfMoves]
+        offset += numberOfMoves
+        flagBytes = (numberOfMoves + 7) // 8
+        flags = data[offset:offset + flagBytes]
+        offset += flagBytes
+
+        extraTurns = [bool(flags[moveNumber >> 3] >> (moveNumber & 7) & 1) for moveNumber in range(numberOfMoves)]
+        firstPositions = (None, 1, rowLength + 2)
+        moves = []
+        player = 1
+        for sidePlace, extraTurn in zip(sidePlaces, extraTurns):
+            moves.append(firstPositions[player] + sidePlace)
+            if not extraTurn:
+                player = 3 - player
+        return cls(rowLength, piecesPerHole, moves, extraTurns, player1Score, player2Score), offset
+
+    @staticmethod
+    def recordSize(data, offset=0):
+        """
+        Returns the encoded size of the record starting at offset in data, which must hold at least its header.
+
+        """
+
+        numberOfMoves = RECORD_HEADER.unpack_from(data, offset)[4]
+        return RECORD_HEADER.size + numberOfMoves + (numberOfMoves + 7) // 8
+
+class GameRecordWriter:
+    """
+    Appends GameRecords to a file. Records are encoded into a buffer and written out in bulk once it holds
+    bufferSize bytes, and when the writer is flushed or closed. The file header is written if the file is new.
+
+    Parameters
+    ----------
+
+    path: str
+        File to append to
+
+    bufferSize: int, optional
+        Bytes collected before writing to the file, default 1 MiB
+
+    """
+
+    def __init__(self, path, bufferSize=1 << 20):
+        self.path = path
+        self.bufferSize = bufferSize
+        self.recordsWritten = 0
+        self._buffer = bytearray()
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._buffer += FILE_HEADER.pack(MAGIC, VERSION)
+
+    def __repr__(self):
+        return "GameRecordWriter({!r}, recordsWritten={})".format(self.path, self.recordsWritten)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exceptionInfo):
+        self.close()
+
+    def write(self, record):
+        """
+        Adds a GameRecord, writing the buffer out if it is full.
+
+        """
+
+        if record.rowLength > 255:
+            raise ValueError("game records only hold boards with rowLength up to 255")
+        self._buffer += record.toBytes()
+        self.recordsWritten += 1
+        if len(self._buffer) >= self.bufferSize:
+            self.flush()
+
+    def writeGame(self, rowLength, piecesPerHole, moves, extraTurns, player1Score, player2Score):
+        """
+        Same as self.write(GameRecord(...)).
+
+        """
+
+        self.write(GameRecord(rowLength, piecesPerHole, moves, extraTurns, player1Score, player2Score))
+
+    def flush(self):
+        """
+        Writes everything buffered to the file.
+
+        """
+
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._buffer.clear()
+        self._file.flush()
+
+    def close(self):
+        """
+        Flushes and closes the file.
+
+        """
+
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+class GameRecordReader:
+    """
+    Streams GameRecords from a file written by GameRecordWriter. The file is read in chunks of chunkSize bytes,
+    so only one chunk (or one record, if a record is bigger) is in memory at a time.
+
+    Parameters
+    ----------
+
+    path: str
+        File to read
+
+    chunkSize: int, optional
+        Bytes read from the file at a time, default 1 MiB
+
+    """
+
+    def __init__(self, path, chunkSize=1 << 20):
+        self.path = path
+        self.chunkSize = chunkSize
+
+    def __repr__(self):
+        return "GameRecordReader({!r})".format(self.path)
+
+    def __iter__(self):
+        return self.records()
+
+    def records(self):
+        """
+        Yields every GameRecord in the file in order.
+
+        Raises
+        ------
+
+        NotAGameRecordFile
+            If the file doesn't start with the game record header
+
+        TruncatedRecord
+            If the file ends part way through a record, ie a writer was killed while writing
+
+        """
+
+        with open(self.path, "rb") as recordFile:
+            header = recordFile.read(FILE_HEADER.size)
+            if len(header) < FILE_HEADER.size or FILE_HEADER.unpack(header) != (MAGIC, VERSION):
+                raise self.NotAGameRecordFile(self.path)
+
+            data = b""
+            offset = 0
+            endOfFile = False
+            while True:
+                #top up the buffer when the next record might not be complete in it
+                available = len(data) - offset
+                needed = RECORD_HEADER.size if available < RECORD_HEADER.size else GameRecord.recordSize(data, offset)
+                if available < needed:
+                    if endOfFile:
+                        if available:
+                            raise self.TruncatedRecord(self.path, available)
+                        return
+                    chunk = recordFile.read(max(self.chunkSize, needed - available))
+                    endOfFile = not chunk
+                    data = data[offset:] + chunk
+                    offset = 0
+                    continue
+
+                record, offset = GameRecord.fromBytes(data, offset)
+                yield record
+
+    def boardAfter(self, recordNumber, moveNumber):
+        """
+        Returns the Board after moveNumber moves of the recordNumber-th game (from 0) in the file.
+
+        """
+
+        for number, record in enumerate(self.records()):
+            if number == recordNumber:
+                return record.boardAfter(moveNumber)
+        raise IndexError("file has fewer than {} records".format(recordNumber + 1))
+
+    #Defining Exceptions
+    class NotAGameRecordFile(Exception):
+        """
+        Exception raised if the file opened doesn't start with the game record header.
+
+        """
+
+        def __init__(self, path, message="{} is not a game record file."):
+            self.path = path
+            self.message = message.format(self.path)
+            super().__init__(self.message)
+
+    class TruncatedRecord(Exception):
+        """
+        Exception raised if a game record file ends part way through a record.
+
+        """
+
+        def __init__(self, path, bytesLeft, message="{} ends part way through a record, {} bytes left over."):
+            self.path = path
+            self.bytesLeft = bytesLeft
+            self.message = message.format(self.path, self.bytesLeft)
+            super().__init__(self.message)
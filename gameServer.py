@@ -0,0 +1,467 @@
+"""
+Game server hosting many games at once on one asyncio event loop, each game backed by a Board.
+
+Clients talk to the server in lines. Commands sent to the server are words separated by spaces:
+
+    NEW [piecesPerHole] [rowLength] [opponent]   start a game as player 1 (at most MAX_PIECES_PER_HOLE pieces per hole
+                                                 and MAX_STONES stones), opponent is "human" (default, someone
+                                                 else JOINs as player 2) or a strategy (see strategies.strategyFromName)
+    JOIN gameId                                  join a game as player 2
+    MOVE position                                move from position
+    STATE                                        ask for the board
+    QUIT                                         leave
+
+Every reply is one JSON object on a line, with a "type" of:
+
+    joined   {"game", "player", "piecesPerHole", "rowLength"}
+    state    {"game", "pits", "playerToMove", "moves", "lastMove", "extraTurn", "finished", "score"}, sent to
+             both players after every move and when a player joins. moves counts the moves played, so a
+             client can tell a new position from the same one sent again
+    error    {"message"}, ie for a move rejected with Board.InvalidMove
+
+Bot opponents pick their moves in a process pool (run_in_executor), so slow strategies never block the event
+loop and the other games keep going.
+
+"""
+
+import asyncio
+import itertools
+import json
+import random
+import select
+import socket
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from board import Board
+
+MAX_PIECES_PER_HOLE = 100 #NEW is refused beyond these, so one client line can't tie up the event loop with a huge board
+MAX_STONES = 2000
+
+_workerStrategies = {} #strategy specification to strategy, kept for the life of each executor process
+
+def _botMove(strategy, pits, rowLength, player, seed):
+    """
+    Picks a bot's move in an executor process, from a plain copy of the board. strategy is a strategy or a
+    strategies.strategyFromName specification. A specification is only turned into a strategy once per process,
+    so what the strategy builds up (ie SearchStrategy's transposition table) is kept between moves instead of
+    being rebuilt from a freshly pickled strategy every move.
+
+    """
+
+    if isinstance(strategy, str):
+        specification = strategy
+        strategy = _workerStrategies.get(specification)
+        if strategy is None:
+            from strategies import strategyFromName
+            strategy = _workerStrategies[specification] = strategyFromName(specification)
+    board = Board(0, rowLength)
+    board.state.pits[:] = array("i", pits)
+    board.state.rehash()
+    return strategy(board, player, random.Random(seed))
+
+def encodeMessage(messageType, **fields):
+    """
+    Returns a protocol message as a line of bytes.
+
+    """
+
+    fields["type"] = messageType
+    return (json.dumps(fields, separators=(",", ":")) + "\n").encode()
+
+class GameSession:
+    """
+    One game on the server.
+
+    Parameters
+    ----------
+
+    gameId: int
+        Id clients JOIN the game with
+
+    piecesPerHole: int
+        Number of starting pieces in each of the positions on the board
+
+    rowLength: int
+        Number of positions in each row
+
+    bot: str, optional
+        Specification of the strategy playing player 2 (see strategies.strategyFromName), default None (player 2
+        is a client)
+
+    """
+
+    def __init__(self, gameId, piecesPerHole, rowLength, bot=None):
+        self.gameId = gameId
+        self.board = Board(piecesPerHole, rowLength)
+        self.playerToMove = 1
+        self.movesPlayed = 0
+        self.lastMove = None
+        self.extraTurn = False
+        self.bot = bot
+        self.writers = {} #player number to StreamWriter of the client playing them
+        self.lock = asyncio.Lock() #moves in one game are played one at a time
+        self.rng = random.Random(gameId)
+
+    def __repr__(self):
+        return "GameSession({}, players={}, bot={!r})".format(self.gameId, sorted(self.writers), self.bot)
+
+    def openPlayer(self):
+        """
+        Returns the player number a new client would play, or None if the game is full.
+
+        """
+
+        for player in (1, 2):
+            if player not in self.writers and not (player == 2 and self.bot is not None):
+                return player
+        return None
+
+    def play(self, position, player):
+        """
+        Plays a move for player.
+
+        Raises
+        ------
+
+        Board.InvalidMove
+            If it isn't player's turn, the game is over or position can't be moved from
+
+        """
+
+        if self.board.is_terminal():
+            raise Board.InvalidMove(position, "the game is over")
+        if player != self.playerToMove:
+            raise Board.InvalidMove(position, "it is player {}'s turn".format(self.playerToMove))
+        self.extraTurn = self.board.move(position, player)
+        self.movesPlayed += 1
+        self.lastMove = position
+        if not self.extraTurn:
+            self.playerToMove = 3 - player
+
+    def stateMessage(self):
+        """
+        Returns the state message for the game.
+
+        """
+
+        finished = self.board.is_terminal()
+        return encodeMessage("state", game=self.gameId, pits=self.board.state.pits.tolist(), playerToMove=self.playerToMove,
+                             moves=self.movesPlayed, lastMove=self.lastMove, extraTurn=self.extraTurn, finished=finished,
+                             score=list(self.board.final_score()) if finished else None)
+
+class GameServer:
+    """
+    asyncio server hosting GameSessions, see the module docstring for the protocol.
+
+    Parameters
+    ----------
+
+    host: str, optional
+        Address to listen on, default "127.0.0.1"
+
+    port: int, optional
+        Port to listen on, 0 picks a free one (see self.port once started), default 8765
+
+    botWorkers: int, optional
+        Processes picking bot moves, default is one per CPU
+
+    """
+
+    def __init__(self, host="127.0.0.1", port=8765, botWorkers=None):
+        self.host = host
+        self.port = port
+        self.botWorkers = botWorkers
+        self.sessions = {} #game id to GameSession
+        self._gameIds = itertools.count(1)
+        self._server = None
+        self._executor = None
+        self._connections = {} #handler task to StreamWriter for every connected client
+
+    def __repr__(self):
+        return "GameServer({}:{}, games={})".format(self.host, self.port, len(self.sessions))
+
+    async def start(self):
+        """
+        Starts listening.
+
+        """
+
+        self._server = await asyncio.start_server(self._handleConnection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serveForever(self):
+        """
+        Starts the server if needed and serves until cancelled.
+
+        """
+
+        if self._server is None:
+            await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        """
+        Stops listening, disconnects every client and shuts down the bot process pool.
+
+        """
+
+        if self._server is not None:
+            self._server.close()
+            for writer in self._connections.values():
+                writer.close() #handlers see the connection end and finish normally
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _handleConnection(self, reader, writer):
+        """
+        Reads commands from one client until it quits or disconnects.
+
+        """
+
+        session = None
+        player = None
+        self._connections[asyncio.current_task()] = writer
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                words = line.decode(errors="replace").split()
+                if not words:
+                    continue
+                command = words[0].upper()
+
+                try:
+                    if command == "NEW" or command == "JOIN":
+                        if session is not None:
+                            raise ValueError("already playing game {}".format(session.gameId))
+                        session, player = self._newSession(words[1:]) if command == "NEW" else self._joinSession(words[1:])
+                        session.writers[player] = writer
+                        await self._send(writer, encodeMessage("joined", game=session.gameId, player=player,
+                                                               piecesPerHole=session.board.piecesPerHole, rowLength=session.board.rowLength))
+                        await self._broadcast(session)
+                    elif command == "MOVE":
+                        if session is None:
+                            raise ValueError("not in a game, send NEW or JOIN first")
+                        await self._playMove(session, player, int(words[1]))
+                    elif command == "STATE":
+                        if session is None:
+                            raise ValueError("not in a game, send NEW or JOIN first")
+                        await self._send(writer, session.stateMessage())
+                    elif command == "QUIT":
+                        break
+                    else:
+                        raise ValueError("unknown command {!r}".format(words[0]))
+                except (Board.InvalidMove, ValueError, IndexError) as error:
+                    await self._send(writer, encodeMessage("error", message=str(error)))
+        except ConnectionError:
+            pass
+        finally:
+            if session is not None:
+                session.writers.pop(player, None)
+                if not session.writers: #nobody left to play it
+                    self.sessions.pop(session.gameId, None)
+            self._connections.pop(asyncio.current_task(), None)
+            writer.close()
+
+    def _newSession(self, arguments):
+        """
+        Creates a game from NEW's arguments, returns (session, 1).
+
+        """
+
+        piecesPerHole = int(arguments[0]) if len(arguments) > 0 else 4
+        rowLength = int(arguments[1]) if len(arguments) > 1 else 6
+        if not 1 <= piecesPerHole <= MAX_PIECES_PER_HOLE or not 1 <= rowLength <= 64:
+            raise ValueError("piecesPerHole must be between 1 and {} and rowLength between 1 and 64".format(MAX_PIECES_PER_HOLE))
+        if piecesPerHole * rowLength * 2 > MAX_STONES:
+            raise ValueError("at most {} stones on the board, piecesPerHole * rowLength * 2 is {}".format(MAX_STONES, piecesPerHole * rowLength * 2))
+        bot = None
+        if len(arguments) > 2 and arguments[2] != "human":
+            from strategies import strategyFromName
+            strategyFromName(arguments[2]) #raises ValueError for unknown strategies, the executor builds its own
+            bot = arguments[2]
+
+        session = GameSession(next(self._gameIds), piecesPerHole, rowLength, bot)
+        self.sessions[session.gameId] = session
+        return session, 1
+
+    def _joinSession(self, arguments):
+        """
+        Finds the game JOIN asks for, returns (session, player).
+
+        """
+
+        session = self.sessions.get(int(arguments[0]))
+        if session is None:
+            raise ValueError("no game {}".format(arguments[0]))
+        player = session.openPlayer()
+        if player is None:
+            raise ValueError("game {} is full".format(session.gameId))
+        return session, player
+
+    async def _playMove(self, session, player, position):
+        """
+        Plays a client's move, then the bot's moves while it is the bot's turn, sending the board after each.
+
+        """
+
+        async with session.lock:
+            session.play(position, player)
+            await self._broadcast(session)
+
+            loop = asyncio.get_running_loop()
+            while session.bot is not None and session.playerToMove == 2 and not session.board.is_terminal():
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(self.botWorkers)
+                move = await loop.run_in_executor(self._executor, _botMove, session.bot, session.board.state.pits.tolist(),
+                                                  session.board.rowLength, 2, session.rng.getrandbits(64))
+                session.play(move, 2)
+                await self._broadcast(session)
+
+    async def _broadcast(self, session):
+        """
+        Sends the board to every client in session.
+
+        """
+
+        message = session.stateMessage()
+        for writer in list(session.writers.values()):
+            await self._send(writer, message)
+
+    async def _send(self, writer, message):
+        """
+        Sends one message, ignoring clients that have gone away.
+
+        """
+
+        try:
+            writer.write(message)
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+async def playBot(strategy, host="127.0.0.1", port=8765, gameId=None, piecesPerHole=4, rowLength=6, opponent="human", executor=None):
+    """
+    Connects to a GameServer and plays one game with strategy, as player 1 of a new game or by joining gameId.
+    Moves are picked in executor (the event loop's default executor if None).
+
+    Parameters
+    ----------
+
+    strategy: callable or str
+        Strategy to play with (see strategies.py), or its strategyFromName specification so that a process pool
+        executor builds it once per process
+
+    host, port: optional
+        Server address, default 127.0.0.1:8765
+
+    gameId: int, optional
+        Game to join, default None starts a new one
+
+    piecesPerHole, rowLength, opponent: optional
+        Arguments of NEW when starting a game
+
+    executor: concurrent.futures.Executor, optional
+        Where moves are picked
+
+    Returns
+    -------
+
+    score: list
+        Final [player 1, player 2] score
+
+    """
+
+    reader, writer = await asyncio.open_connection(host, port)
+    rng = random.Random()
+    loop = asyncio.get_running_loop()
+    try:
+        writer.write((("JOIN {}".format(gameId)) if gameId is not None else "NEW {} {} {}".format(piecesPerHole, rowLength, opponent)).encode() + b"\n")
+        player = None
+        rowLength = None
+        answeredMoves = None #moves played when this bot last moved, the same position is sent again when a player joins
+        while True:
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError("server closed the connection")
+            message = json.loads(line)
+            if message["type"] == "joined":
+                player = message["player"]
+                rowLength = message["rowLength"]
+            elif message["type"] == "error":
+                raise ValueError(message["message"])
+            elif message["type"] == "state":
+                if message["finished"]:
+                    return message["score"]
+                if message["playerToMove"] == player and message["moves"] != answeredMoves:
+                    answeredMoves = message["moves"]
+                    move = await loop.run_in_executor(executor, _botMove, strategy, message["pits"], rowLength, player, rng.getrandbits(64))
+                    writer.write("MOVE {}\n".format(move).encode())
+                    await writer.drain()
+    finally:
+        writer.close()
+
+class ServerConnection:
+    """
+    Blocking client for programs with their own loop, like the pygame Game. Messages are only read when asked
+    for, without waiting.
+
+    Parameters
+    ----------
+
+    host: str
+        Server address
+
+    port: int
+        Server port
+
+    """
+
+    def __init__(self, host, port):
+        self._socket = socket.create_connection((host, port))
+        self._buffer = b""
+
+    def send(self, line):
+        """
+        Sends one command line, ie "MOVE 3".
+
+        """
+
+        self._socket.sendall(line.encode() + b"\n")
+
+    def messages(self):
+        """
+        Returns every message that has arrived so far as a list of dicts, without waiting for more.
+
+        Raises
+        ------
+
+        ConnectionError
+            If the server closed the connection
+
+        """
+
+        while select.select([self._socket], [], [], 0)[0]:
+            data = self._socket.recv(65536)
+            if not data:
+                raise ConnectionError("server closed the connection")
+            self._buffer += data
+        *lines, self._buffer = self._buffer.split(b"\n")
+        return [json.loads(line) for line in lines if line]
+
+    def close(self):
+        """
+        Closes the connection.
+
+        """
+
+        self._socket.close()
@@ -0,0 +1,210 @@
+"""
+Optional statistics for Board.move. While a MoveStatistics collector is active every move played through
+Board.move is timed and the stones sown, relay follow ups, opponent goal skips and extra turns are counted into
+histograms. When nothing is collecting Board.move only checks activeCollector, so it costs close to nothing.
+
+    with collectMoveStatistics() as statistics:
+        runTournament(...)
+    print(statistics.asJSON())
+
+The active collector is per process. runTournament collects in each of its workers and merges what they send
+back into the active collector, but other process pools (MCTS root parallel search, opening book building) only
+count the moves played in this process. onMove hooks are only called for moves in this process.
+
+"""
+
+import time
+from contextlib import contextmanager
+
+from boardState import EXTRA_TURN
+
+activeCollector = None #MoveStatistics that Board.move reports to, None when nothing is collecting
+_collectorStack = [] #every started collector in the order they were started, activeCollector is the last one
+
+RECORDED_MOVE_LENGTH = 6 #entries BoardState.move adds to an undo log after the sows of a move
+
+def opponentGoalSkips(state, position, numberOfStones, playerMoving):
+    """
+    Returns how many times sowing numberOfStones from position passes over the opponent's goal, worked out from
+    the sowing cycle rather than by walking the stones round.
+
+    Parameters
+    ----------
+
+    state: BoardState
+        Board sown on, only its position tables are used
+
+    position: int
+        Position sown from
+
+    numberOfStones: int
+        Stones sown
+
+    playerMoving: int, 1 or 2
+        Player sowing
+
+    Returns
+    -------
+
+    skips: int
+        Number of times the skipped goal was passed
+
+    """
+
+    cycle = state.sowCycles[playerMoving]
+    cycleLength = len(cycle)
+    skippedGoal = state.player2Goal if playerMoving == 1 else state.player1Goal
+    beforeGoal = state.cycleIndex[playerMoving][(skippedGoal - 1) % state.numberOfPositions] #stone after this place in the cycle jumps the goal
+
+    #stone number t (from 1) is dropped after stepping from cycle place start + t - 1, so count the t <= numberOfStones landing the step on beforeGoal
+    offset = (beforeGoal - state.cycleIndex[playerMoving][position]) % cycleLength
+    if offset >= numberOfStones:
+        return 0
+    return (numberOfStones - 1 - offset) // cycleLength + 1
+
+class MoveStatistics:
+    """
+    Histograms of what happened in each move played through Board.move while this collector is active. Every
+    histogram is a dict from value to number of moves.
+
+    Parameters
+    ----------
+
+    onMove: callable, optional
+        Hook called after every move with (position, playerMoving, sows, seconds, result), where sows is a list
+        of (position sown from, stones sown) and result is a BoardState.move result
+
+    """
+
+    def __init__(self, onMove=None):
+        self.onMove = onMove
+        self.moves = 0
+        self.extraTurns = 0
+        self.seconds = 0.0
+        self.stonesSown = {} #total stones sown in a move, relay follow ups included
+        self.relayDepth = {} #number of relay follow ups in a move
+        self.opponentGoalSkips = {} #times a move jumped the opponent's goal
+        self.moveMicroseconds = {} #time per move, keyed by the power of 2 microseconds it is under
+
+    def __repr__(self):
+        return "MoveStatistics(moves={}, extraTurns={}, seconds={:.3f})".format(self.moves, self.extraTurns, self.seconds)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exceptionInfo):
+        self.stop()
+
+    def start(self):
+        """
+        Makes this the collector Board.move reports to, until it is stopped or another collector is started.
+        Returns self.
+
+        """
+
+        global activeCollector
+        _collectorStack.append(self)
+        activeCollector = self
+        return self
+
+    def stop(self):
+        """
+        Stops collecting. The collector Board.move reports to becomes the most recently started one still
+        running, so collectors can be stopped in any order. Does nothing if self isn't running.
+
+        """
+
+        global activeCollector
+        for index in range(len(_collectorStack) - 1, -1, -1):
+            if _collectorStack[index] is self:
+                del _collectorStack[index]
+                break
+        activeCollector = _collectorStack[-1] if _collectorStack else None
+
+    def playMove(self, state, position, playerMoving, undoLog=None):
+        """
+        Plays state.move(position, playerMoving, undoLog) and records it. Called by Board.move while this collector
+        is active. The sows of the move are read back from the undo log, so a scratch log is used if none is given.
+
+        Returns
+        -------
+
+        result: int
+            Result of BoardState.move
+
+        """
+
+        log = undoLog if undoLog is not None else []
+        logStart = len(log)
+        startTime = time.perf_counter()
+        result = state.move(position, playerMoving, log)
+        seconds = time.perf_counter() - startTime
+
+        self.moves += 1
+        self.seconds += seconds
+        bucket = 1 << int(seconds * 1e6).bit_length()
+        self.moveMicroseconds[bucket] = self.moveMicroseconds.get(bucket, 0) + 1
+
+        sowEntries = log[logStart:len(log) - RECORDED_MOVE_LENGTH]
+        sows = list(zip(sowEntries[::2], sowEntries[1::2]))
+        if result == EXTRA_TURN:
+            self.extraTurns += 1
+
+        stones = sum(numberOfStones for sowPosition, numberOfStones in sows)
+        skips = sum(opponentGoalSkips(state, sowPosition, numberOfStones, playerMoving) for sowPosition, numberOfStones in sows)
+        self.stonesSown[stones] = self.stonesSown.get(stones, 0) + 1
+        self.relayDepth[len(sows) - 1] = self.relayDepth.get(len(sows) - 1, 0) + 1
+        self.opponentGoalSkips[skips] = self.opponentGoalSkips.get(skips, 0) + 1
+
+        if self.onMove is not None:
+            self.onMove(position, playerMoving, sows, seconds, result)
+        return result
+
+    def merge(self, other):
+        """
+        Adds the counts of another MoveStatistics into this one, ie from a worker process.
+
+        """
+
+        self.moves += other.moves
+        self.extraTurns += other.extraTurns
+        self.seconds += other.seconds
+        for histogram, otherHistogram in ((self.stonesSown, other.stonesSown), (self.relayDepth, other.relayDepth),
+                                          (self.opponentGoalSkips, other.opponentGoalSkips), (self.moveMicroseconds, other.moveMicroseconds)):
+            for value, count in otherHistogram.items():
+                histogram[value] = histogram.get(value, 0) + count
+
+    def asDict(self):
+        """
+        Returns a snapshot of the counts and histograms as a dict, histograms sorted by value.
+
+        """
+
+        return {"moves": self.moves, "extraTurns": self.extraTurns, "seconds": self.seconds,
+                "histograms": {name: dict(sorted(histogram.items())) for name, histogram in (
+                    ("stonesSown", self.stonesSown), ("relayDepth", self.relayDepth),
+                    ("opponentGoalSkips", self.opponentGoalSkips), ("moveMicroseconds", self.moveMicroseconds))}}
+
+    def asJSON(self, indent=2):
+        """
+        Returns self.asDict() as a JSON string. json is imported here rather than with the module, as importing
+        board pulls this module in.
+
+        """
+
+        import json
+        return json.dumps(self.asDict(), indent=indent)
+
+@contextmanager
+def collectMoveStatistics(onMove=None):
+    """
+    Context manager collecting statistics for every Board.move inside it, yields the MoveStatistics.
+
+    """
+
+    statistics = MoveStatistics(onMove)
+    statistics.start()
+    try:
+        yield statistics
+    finally:
+        statistics.stop()
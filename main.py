@@ -1,59 +1,191 @@
 import pygame, sys
 from pygame.locals import *
 
+from array import array
+
+from board import Board
+
+BOARD_CHANGED = pygame.USEREVENT + 1 #posted after every move, tells the render step to look for pits that changed
+
 class Game:
     """
-    Class to handle game logic and game loop for pygame. This will contain 
-    functions to deal with player input and displaying the game graphically. 
+    Class to handle game logic and game loop for pygame. This will contain
+    functions to deal with player input and displaying the game graphically.
+
+    Only what changed is drawn: the whole window is drawn once, then after each move only the pits whose stone
+    counts changed and the status line are redrawn and passed to pygame.display.update(). Fonts and rendered
+    text are cached, and the loop is capped at framesPerSecond so an idle window barely uses any CPU.
+
+    Parameters
+    ----------
+
+    board: Board, optional
+        Board to show and play on, default is a new Board(piecesPerHole, rowLength)
+
+    piecesPerHole: int, optional
+        Number of starting pieces in each of the positions on the board if no board is given, default 4
+
+    rowLength: int, optional
+        Number of positions in each row if no board is given, default 6
+
+    server: tuple, optional
+        (host, port) of a GameServer to play on instead of locally. The board then shows the server's game and
+        clicks are sent to it as moves. Default None
+
+    gameId: int, optional
+        Game on the server to join, default None starts a new game (with piecesPerHole and rowLength)
+
+    opponent: str, optional
+        Opponent when starting a game on the server, "human" or a strategy name, default "human"
 
     """
 
-    #define window dimensions 
-    windowHeight = 1080 
+    #define window dimensions
+    windowHeight = 1080
     windowWidth = 1920
 
-    def __init__(self):
-        self._running = True 
+    framesPerSecond = 30 #most loops per second, the loop sleeps for the rest of each frame
+
+    #colours
+    backgroundColour = (255, 255, 255)
+    boardColour = (160, 110, 60)
+    pitColour = (120, 75, 35)
+    textColour = (0, 0, 0)
+    stoneTextColour = (255, 255, 255)
+
+    def __init__(self, board=None, piecesPerHole=4, rowLength=6, server=None, gameId=None, opponent="human"):
+        self._running = True
         self._display = None
+        self._clock = None
+
+        self.board = board if board is not None else Board(piecesPerHole, rowLength)
+        self.playerToMove = 1
+
+        self.server = server
+        self.gameId = gameId
+        self.opponent = opponent
+        self.player = None #player this window plays on the server, None when playing locally
+        self._connection = None
+        self._serverError = None
+
+        self._fonts = {} #font size to pygame font, SysFont is slow to create
+        self._textSurfaces = {} #(text, size, colour) to rendered surface
+        self._pitRects = [] #screen rect of every position on the board, by index
+        self._boardRect = None
+        self._statusRect = None
+        self._drawnStones = [None] * self.board.numberOfPositions #stone counts currently on screen
+        self._drawnStatus = None
+        self._dirtyRects = [] #regions drawn since the last display update
+        self._boardChanged = True
 
     def on_init(self):
         """
-        Secondary init function specifically to initialize pygame and to create display. 
-        This is run when calling self.on_execute() (which should be done on creation of 
-        the class). 
+        Secondary init function specifically to initialize pygame and to create display.
+        This is run when calling self.on_execute() (which should be done on creation of
+        the class).
 
         """
 
         pygame.init()
         self._display = pygame.display.set_mode((self.windowWidth,self.windowHeight), pygame.HWSURFACE)
         pygame.display.set_caption("Mancala")
-    
+        self._clock = pygame.time.Clock()
+        self._layoutBoard()
+        self._drawBackground()
+
+        if self.server is not None:
+            from gameServer import ServerConnection
+            self._connection = ServerConnection(*self.server)
+            if self.gameId is None:
+                self._connection.send("NEW {} {} {}".format(self.board.piecesPerHole, self.board.rowLength, self.opponent))
+            else:
+                self._connection.send("JOIN {}".format(self.gameId))
+
     def on_event(self, event):
         """
-        Function for event handling, ie user inputs. Takes pygame "event" as parameter.  
+        Function for event handling, ie user inputs. Takes pygame "event" as parameter.
 
-        Parameters 
+        Parameters
         ----------
 
-        event: pygame event 
-            From pygame.event.get(). 
+        event: pygame event
+            From pygame.event.get().
 
         """
 
         if event.type == QUIT:
             self._running = False
+        elif event.type == MOUSEBUTTONDOWN and event.button == 1:
+            self.clickPosition(event.pos)
+        elif event.type == BOARD_CHANGED:
+            self._boardChanged = True
+
+    def clickPosition(self, point):
+        """
+        Plays a move from the pit at point (screen coordinates) for the player to move, if it is one they can
+        move from.
+
+        """
+
+        if self.board.is_terminal():
+            return
+        for position, rect in enumerate(self._pitRects):
+            if rect.collidepoint(point):
+                if self._connection is not None: #server checks and plays the move, board changes when its state arrives
+                    if self.playerToMove == self.player:
+                        self._connection.send("MOVE {}".format(position))
+                    return
+                try:
+                    extraTurn = self.board.move(position, self.playerToMove)
+                except Board.InvalidMove:
+                    return
+                if not extraTurn:
+                    self.playerToMove = 3 - self.playerToMove
+                pygame.event.post(pygame.event.Event(BOARD_CHANGED))
+                return
 
     def on_loop(self):
         """
-        Function to run logic on game loop.
+        Function to run logic on game loop. When playing on a server, applies any messages that have arrived.
 
         """
 
-        pass
+        if self._connection is None:
+            return
+        try:
+            messages = self._connection.messages()
+        except ConnectionError as error:
+            self._serverError = str(error)
+            self._connection = None
+            self._boardChanged = True
+            return
+
+        for message in messages:
+            if message["type"] == "joined":
+                self.gameId = message["game"]
+                self.player = message["player"]
+                if message["rowLength"] != self.board.rowLength or message["piecesPerHole"] != self.board.piecesPerHole: #joined a game of another size
+                    self.board = Board(message["piecesPerHole"], message["rowLength"])
+                    self._drawnStones = [None] * self.board.numberOfPositions
+                    self._drawnStatus = None
+                    self._layoutBoard()
+                    self._drawBackground()
+                    self._dirtyRects.append(self._display.get_rect())
+            elif message["type"] == "state":
+                self.board.state.pits[:] = array("i", message["pits"])
+                self.board.state.rehash()
+                self.playerToMove = message["playerToMove"]
+                self._serverError = None
+                pygame.event.post(pygame.event.Event(BOARD_CHANGED))
+            elif message["type"] == "error":
+                self._serverError = message["message"]
+                self._boardChanged = True
 
     def on_render(self):
         """
-        Function to handle rendering for each loop. 
+        Function to handle rendering for each loop. Only pits whose stone counts changed since they were last
+        drawn and the status line are redrawn, and their rects are added to self._dirtyRects. Does nothing if
+        the board hasn't changed.
 
         Citations
         ---------
@@ -62,26 +194,38 @@ class Game:
 
         """
 
-        renderFont = pygame.font.SysFont('Times New Roman', 20)
-        self._display.fill((255,255,255))
-        self._display.blit(renderFont.render("POGCHAMP", True, (0,0,0)), (20, 20))
+        if not self._boardChanged:
+            return
+        self._boardChanged = False
 
-        
-        pygame.draw.rect(self._display, (255, 0, 0), pygame.Rect(30, 30, 60, 60))
+        pits = self.board.state.pits
+        for position, rect in enumerate(self._pitRects):
+            if pits[position] != self._drawnStones[position]:
+                self._drawPit(position, rect, pits[position])
+                self._drawnStones[position] = pits[position]
+                self._dirtyRects.append(rect)
 
+        status = self._statusText()
+        if status != self._drawnStatus:
+            self._display.fill(self.backgroundColour, self._statusRect)
+            self._display.blit(self._text(status, 40, self.textColour), self._statusRect.topleft)
+            self._drawnStatus = status
+            self._dirtyRects.append(self._statusRect)
 
     def on_quit(self):
         """
-        Function to run logic upon quitting game. Also quits pygame. 
+        Function to run logic upon quitting game. Also quits pygame.
 
         """
 
+        if self._connection is not None:
+            self._connection.close()
         pygame.quit()
 
     def on_execute(self):
         """
         Should be run on creation of class (Game().on_execute()). Creates game loop
-        and runs all necessary functions in said loop. 
+        and runs all necessary functions in said loop.
 
         """
 
@@ -93,8 +237,103 @@ class Game:
                 self.on_event(event)
             self.on_loop()
             self.on_render()
-            pygame.display.update()
+            if self._dirtyRects: #only push the regions that were drawn to the screen
+                pygame.display.update(self._dirtyRects)
+                self._dirtyRects = []
+            self._clock.tick(self.framesPerSecond)
         self.on_quit()
 
+    def _layoutBoard(self):
+        """
+        Works out where every position is drawn. Player 1's pits run left to right along the bottom row into
+        player 2's goal on the right, then player 2's pits run right to left along the top row into player 1's
+        goal on the left, following the order stones are sown in.
+
+        """
+
+        rowLength = self.board.rowLength
+        columnWidth = min((self.windowWidth - 200) // (rowLength + 2), 220) #goal, pits and goal side by side, boards with short rows don't fill the window
+        margin = (self.windowWidth - columnWidth * (rowLength + 2)) // 2
+        pitSize = int(columnWidth * 0.8)
+        top = (self.windowHeight - columnWidth * 2) // 2
+        goalHeight = columnWidth + pitSize
+
+        self._boardRect = pygame.Rect(margin - columnWidth // 4, top - columnWidth // 2, columnWidth * (rowLength + 2) + columnWidth // 2, columnWidth * 3)
+        self._statusRect = pygame.Rect(self._boardRect.left, self._boardRect.bottom + 60, self._boardRect.width, 60)
+
+        def columnLeft(column):
+            return margin + column * columnWidth + (columnWidth - pitSize) // 2
+
+        self._pitRects = [None] * self.board.numberOfPositions
+        self._pitRects[self.board.player1Goal] = pygame.Rect(columnLeft(0), top, pitSize, goalHeight)
+        self._pitRects[self.board.player2Goal] = pygame.Rect(columnLeft(rowLength + 1), top, pitSize, goalHeight)
+        for column, position in enumerate(self.board.player1Positions, 1):
+            self._pitRects[position] = pygame.Rect(columnLeft(column), top + columnWidth, pitSize, pitSize)
+        for column, position in enumerate(reversed(self.board.player2Positions), 1):
+            self._pitRects[position] = pygame.Rect(columnLeft(column), top, pitSize, pitSize)
+
+    def _drawBackground(self):
+        """
+        Draws the parts of the window that never change. Pits are drawn by self.on_render().
+
+        """
+
+        self._display.fill(self.backgroundColour)
+        pygame.draw.rect(self._display, self.boardColour, self._boardRect, border_radius=40)
+        self._display.blit(self._text("Player 2", 40, self.textColour), (self._boardRect.left, self._boardRect.top - 60))
+        self._display.blit(self._text("Player 1", 40, self.textColour), (self._boardRect.left, self._boardRect.bottom + 5))
+
+    def _drawPit(self, position, rect, stones):
+        """
+        Draws one position with its stone count centred in it.
+
+        """
+
+        pygame.draw.rect(self._display, self.boardColour, rect) #clear the old count, corners included
+        pygame.draw.ellipse(self._display, self.pitColour, rect)
+        text = self._text(str(stones), 48, self.stoneTextColour)
+        self._display.blit(text, text.get_rect(center=rect.center))
+
+    def _statusText(self):
+        """
+        Returns the line shown under the board, whose move it is or the final score.
+
+        """
+
+        if self._serverError is not None:
+            return "Server: {}".format(self._serverError)
+        if self.board.is_terminal():
+            player1Score, player2Score = self.board.final_score()
+            return "Game over, player 1: {}  player 2: {}".format(player1Score, player2Score)
+        if self.server is not None:
+            if self.player is None:
+                return "Connecting to server"
+            return "Game {}, you are player {}, player {} to move".format(self.gameId, self.player, self.playerToMove)
+        return "Player {} to move".format(self.playerToMove)
+
+    def _font(self, size):
+        """
+        Returns the font for size, created once.
+
+        """
+
+        if size not in self._fonts:
+            self._fonts[size] = pygame.font.SysFont('Times New Roman', size)
+        return self._fonts[size]
+
+    def _text(self, text, size, colour):
+        """
+        Returns text rendered in size and colour, each combination is only rendered once.
+
+        """
+
+        key = (text, size, colour)
+        surface = self._textSurfaces.get(key)
+        if surface is None:
+            surface = self._font(size).render(text, True, colour)
+            self._textSurfaces[key] = surface
+        return surface
+
 
-Game().on_execute()
\ No newline at end of file
+if __name__ == "__main__":
+    Game().on_execute()
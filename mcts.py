@@ -0,0 +1,326 @@
+import math
+import multiprocessing
+import random
+import time
+from array import array
+
+from boardState import BoardState, EXTRA_TURN
+
+def rollout(state, player, rng, maxMoves=10000):
+    """
+    Plays random moves on state until the game is over. state is changed.
+
+    Parameters
+    ----------
+
+    state: BoardState
+        Position to play from
+
+    player: int, 1 or 2
+        Player to move
+
+    rng: random.Random
+        Source of randomness
+
+    maxMoves: int, optional
+        Game is scored as it stands after this many moves, default 10000
+
+    Returns
+    -------
+
+    player1Difference: int
+        Player 1's final score minus player 2's
+
+    """
+
+    for x in range(maxMoves):
+        if state.isTerminal():
+            break
+        moves = state.legalMoves(player)
+        result = state.move(moves[int(rng.random() * len(moves))], player)
+        if result != EXTRA_TURN:
+            player = 3 - player
+    return state.finalDifference(1)
+
+def _reward(player1Difference, player):
+    """
+    Converts a final score difference into 1 for a win, 0.5 for a draw and 0 for a loss from player's point of view.
+
+    """
+
+    if player1Difference == 0:
+        return 0.5
+    return 1.0 if (player1Difference > 0) == (player == 1) else 0.0
+
+class MCTSNode:
+    """
+    Node in the search tree. Rewards are from the point of view of mover, the player who made the move into this
+    node, which is what the parent compares children by. Since landing in your own goal gives another move, the
+    player to move in a node can be the same as mover.
+
+    """
+
+    __slots__ = ("mover", "playerToMove", "untriedMoves", "children", "visits", "reward")
+
+    def __init__(self, mover, playerToMove, moves):
+        self.mover = mover
+        self.playerToMove = playerToMove
+        self.untriedMoves = list(moves)
+        self.children = {}
+        self.visits = 0
+        self.reward = 0.0
+
+    def select(self, exploration):
+        """
+        Returns (move, child) with the highest UCT score.
+
+        """
+
+        logVisits = math.log(self.visits)
+        best = None
+        bestScore = -1.0
+        for move, child in self.children.items():
+            score = child.reward / child.visits + exploration * math.sqrt(logVisits / child.visits)
+            if score > bestScore:
+                bestScore = score
+                best = (move, child)
+        return best
+
+class MCTSResult:
+    """
+    Result of MCTSPlayer.search.
+
+    Parameters
+    ----------
+
+    bestMove: int or None
+        Most visited move, None if there were no moves
+
+    moveStatistics: dict
+        Maps each move searched to (visits, total reward for the player moving)
+
+    rollouts: int
+        Number of random games played
+
+    seconds: float
+        Time spent searching
+
+    """
+
+    def __init__(self, bestMove, moveStatistics, rollouts, seconds):
+        self.bestMove = bestMove
+        self.moveStatistics = moveStatistics
+        self.rollouts = rollouts
+        self.seconds = seconds
+        self.rolloutsPerSecond = rollouts / seconds if seconds > 0 else 0.0
+
+    def __repr__(self):
+        return "MCTSResult(bestMove={}, rollouts={}, seconds={:.3f}, rolloutsPerSecond={:.0f})".format(self.bestMove, self.rollouts, self.seconds, self.rolloutsPerSecond)
+
+def searchTree(state, player, timeLimit, rng, batchSize=8, exploration=1.4, maxIterations=None):
+    """
+    Runs UCT search from state until timeLimit seconds have passed. Each new node gets batchSize random rollouts
+    at once, which are averaged into a single reward.
+
+    Parameters
+    ----------
+
+    state: BoardState
+        Position to search from, not changed
+
+    player: int, 1 or 2
+        Player to move
+
+    timeLimit: float
+        Seconds to search for
+
+    rng: random.Random
+        Source of randomness
+
+    batchSize: int, optional
+        Rollouts played from each new node, default 8
+
+    exploration: float, optional
+        UCT exploration constant, default 1.4
+
+    maxIterations: int, optional
+        Stop after this many tree iterations even if there is time left, default None
+
+    Returns
+    -------
+
+    moveStatistics: dict
+        Maps each move from the root to (visits, total reward for player)
+
+    rollouts: int
+        Number of rollouts played
+
+    """
+
+    root = MCTSNode(3 - player, player, state.legalMoves(player))
+    deadline = time.perf_counter() + timeLimit
+    rollouts = 0
+    iterations = 0
+    while time.perf_counter() < deadline and (maxIterations is None or iterations < maxIterations):
+        iterations += 1
+        node = root
+        current = state.copy()
+        path = [root]
+
+        #walk down fully expanded nodes
+        while not node.untriedMoves and node.children:
+            move, node = node.select(exploration)
+            current.move(move, node.mover)
+            path.append(node)
+
+        #add one new child
+        if node.untriedMoves:
+            move = node.untriedMoves.pop(int(rng.random() * len(node.untriedMoves)))
+            mover = node.playerToMove
+            result = current.move(move, mover)
+            nextPlayer = mover if result == EXTRA_TURN else 3 - mover
+            child = MCTSNode(mover, nextPlayer, () if current.isTerminal() else current.legalMoves(nextPlayer))
+            node.children[move] = child
+            node = child
+            path.append(node)
+
+        #score the new node from player 1's point of view, finished games need no rollouts
+        if current.isTerminal():
+            player1Reward = _reward(current.finalDifference(1), 1)
+        else:
+            totalReward = 0.0
+            for x in range(batchSize):
+                totalReward += _reward(rollout(current.copy(), node.playerToMove, rng), 1)
+            rollouts += batchSize
+            player1Reward = totalReward / batchSize
+
+        for pathNode in path:
+            pathNode.visits += 1
+            pathNode.reward += player1Reward if pathNode.mover == 1 else 1.0 - player1Reward
+
+    return {move: (child.visits, child.reward) for move, child in root.children.items()}, rollouts
+
+def _searchWorker(arguments):
+    """
+    Runs searchTree in a worker process from a plain description of the board.
+
+    """
+
+    pits, rowLength, player, timeLimit, seed, batchSize, exploration = arguments
+    state = BoardState(0, rowLength)
+    state.pits[:] = array("i", pits)
+    state.rehash()
+    return searchTree(state, player, timeLimit, random.Random(seed), batchSize, exploration)
+
+class MCTSPlayer:
+    """
+    Anytime player using Monte Carlo tree search. With more than one worker each worker grows its own tree from
+    the same position (root parallelization) and the visit counts of the root moves are added together. Can be
+    used as a strategy (see strategies.py), as long as workers is 1 when it is itself running in a worker process.
+
+    Parameters
+    ----------
+
+    timeLimit: float, optional
+        Seconds to search for each move, default 1.0
+
+    workers: int, optional
+        Number of processes searching, default 1
+
+    batchSize: int, optional
+        Rollouts played from each new node, default 8
+
+    exploration: float, optional
+        UCT exploration constant, default 1.4
+
+    """
+
+    def __init__(self, timeLimit=1.0, workers=1, batchSize=8, exploration=1.4):
+        self.timeLimit = timeLimit
+        self.workers = workers
+        self.batchSize = batchSize
+        self.exploration = exploration
+        self.lastResult = None
+        self._pool = None
+
+    def __repr__(self):
+        return "MCTSPlayer(timeLimit={}, workers={}, batchSize={})".format(self.timeLimit, self.workers, self.batchSize)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_pool"] = None #pools can't be sent to other processes
+        return state
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exceptionInfo):
+        self.close()
+
+    def close(self):
+        """
+        Shuts down the worker pool, if one was started.
+
+        """
+
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __call__(self, board, player, rng):
+        return self.search(board, player, rng).bestMove
+
+    def search(self, board, player, rng=None):
+        """
+        Searches for the best move for player for self.timeLimit seconds.
+
+        Parameters
+        ----------
+
+        board: Board or BoardState
+            Position to search from, not changed
+
+        player: int, 1 or 2
+            Player to move
+
+        rng: random.Random, optional
+            Source of randomness, seeds for workers are drawn from it. Default is a new unseeded random.Random
+
+        Returns
+        -------
+
+        result: MCTSResult
+            Most visited move and statistics. Also kept in self.lastResult.
+
+        """
+
+        state = board if isinstance(board, BoardState) else board.state
+        rng = rng if rng is not None else random.Random()
+        startTime = time.perf_counter()
+
+        moves = state.legalMoves(player)
+        if len(moves) <= 1: #nothing to decide
+            self.lastResult = MCTSResult(moves[0] if moves else None, {}, 0, time.perf_counter() - startTime)
+            return self.lastResult
+
+        if self.workers == 1:
+            treeResults = [searchTree(state, player, self.timeLimit, rng, self.batchSize, self.exploration)]
+        else:
+            if self._pool is None:
+                self._pool = multiprocessing.Pool(self.workers)
+            arguments = [(state.pits.tolist(), state.rowLength, player, self.timeLimit, rng.getrandbits(64), self.batchSize, self.exploration) for x in range(self.workers)]
+            treeResults = self._pool.map(_searchWorker, arguments)
+
+        #add up root statistics from every tree
+        moveStatistics = {}
+        rollouts = 0
+        for treeStatistics, treeRollouts in treeResults:
+            rollouts += treeRollouts
+            for move, (visits, reward) in treeStatistics.items():
+                totalVisits, totalReward = moveStatistics.get(move, (0, 0.0))
+                moveStatistics[move] = (totalVisits + visits, totalReward + reward)
+
+        bestMove = max(moveStatistics, key=lambda move: moveStatistics[move][0]) if moveStatistics else moves[0]
+        self.lastResult = MCTSResult(bestMove, moveStatistics, rollouts, time.perf_counter() - startTime)
+        return self.lastResult
@@ -0,0 +1,278 @@
+"""
+Opening book. Every position reachable from the starting Board(piecesPerHole, rowLength) within maxPlies moves
+(an extra turn counts as its own move) is searched offline with Solver to searchDepth, and the best move, its
+value and the depth it was searched to are saved keyed by BoardState.hashKey (board hash and player to move).
+
+File layout: HEADER (MAGIC, FORMAT_VERSION, boardState.HASH_VERSION, rowLength, piecesPerHole, maxPlies,
+searchDepth, number of positions), then the keys as sorted unsigned 64 bit ints, then the values as 32 bit ints,
+the best moves as unsigned 16 bit ints and the depths as bytes, all in key order. The file is memory mapped and
+keys are found by binary search, so opening a book reads nothing and a lookup touches a handful of pages. A book
+whose format or hash version doesn't match this code is rejected, as every lookup in it would miss.
+
+"""
+
+import mmap
+import multiprocessing
+import struct
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+
+from boardState import BoardState, EXTRA_TURN, HASH_VERSION
+from solver import Solver
+
+MAGIC = b"MANCBOOK"
+FORMAT_VERSION = 2 #changes whenever the file layout does
+HEADER = struct.Struct("<8sIIIIIIQ") #keeps the key column 8 byte aligned
+ENTRY_BYTES = 8 + 4 + 2 + 1 #key, value, best move and depth
+
+def bookPositions(piecesPerHole, rowLength, maxPlies):
+    """
+    Returns every position reachable from the opening within maxPlies moves, once each, as a list of
+    (key, BoardState, player to move). Finished games are left out.
+
+    """
+
+    start = BoardState(piecesPerHole, rowLength)
+    seen = {start.hashKey(1)}
+    positions = [(start.hashKey(1), start, 1)]
+    frontier = [(start, 1)]
+    for ply in range(maxPlies):
+        nextFrontier = []
+        for state, player in frontier:
+            for move in state.legalMoves(player):
+                child = state.copy()
+                result = child.move(move, player)
+                if child.isTerminal():
+                    continue
+                nextPlayer = player if result == EXTRA_TURN else 3 - player
+                key = child.hashKey(nextPlayer)
+                if key not in seen:
+                    seen.add(key)
+                    positions.append((key, child, nextPlayer))
+                    nextFrontier.append((child, nextPlayer))
+        frontier = nextFrontier
+    return positions
+
+_workerSolver = None #each worker process keeps one Solver, so its transposition table carries over between positions
+
+def _searchPosition(arguments):
+    """
+    Searches one book position in a worker process, returns (key, bestMove, value, depth).
+
+    """
+
+    global _workerSolver
+    key, pits, rowLength, player, searchDepth, timeLimit = arguments
+    if _workerSolver is None or _workerSolver.maxDepth != searchDepth or _workerSolver.timeLimit != timeLimit:
+        _workerSolver = Solver(maxDepth=searchDepth, timeLimit=timeLimit)
+    state = BoardState(0, rowLength)
+    state.pits[:] = array("i", pits)
+    state.rehash()
+    result = _workerSolver.search(state, player)
+    return key, result.bestMove, result.value, result.depth
+
+def buildOpeningBook(path, piecesPerHole=4, rowLength=6, maxPlies=6, searchDepth=14, timeLimit=None, workers=None, onPosition=None):
+    """
+    Searches every position within maxPlies moves of the opening and writes the results to path.
+
+    Parameters
+    ----------
+
+    path: str
+        File to write
+
+    piecesPerHole: int, optional
+        Number of starting pieces in each of the positions on the board, default 4
+
+    rowLength: int, optional
+        Number of positions in each row, default 6
+
+    maxPlies: int, optional
+        Positions up to this many moves from the opening are in the book, default 6
+
+    searchDepth: int, optional
+        Depth each position is searched to, default 14
+
+    timeLimit: float, optional
+        Most seconds spent on each position, default None (no limit)
+
+    workers: int, optional
+        Number of worker processes, default is one per CPU. 1 searches every position in this process.
+
+    onPosition: callable, optional
+        Called with (positionsSearched, positions) as each position finishes
+
+    Returns
+    -------
+
+    positions: int
+        Number of positions in the book
+
+    """
+
+    jobs = [(key, state.pits.tolist(), rowLength, player, searchDepth, timeLimit) for key, state, player in bookPositions(piecesPerHole, rowLength, maxPlies)]
+    entries = []
+    searched = 0
+    pool = multiprocessing.Pool(workers) if workers != 1 else None
+    try:
+        results = pool.imap_unordered(_searchPosition, jobs, chunksize=4) if pool is not None else map(_searchPosition, jobs)
+        for key, bestMove, value, depth in results:
+            searched += 1
+            if bestMove is not None:
+                entries.append((key, bestMove, value, depth))
+            if onPosition is not None:
+                onPosition(searched, len(jobs))
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    entries.sort()
+    with open(path, "wb") as bookFile:
+        bookFile.write(HEADER.pack(MAGIC, FORMAT_VERSION, HASH_VERSION, rowLength, piecesPerHole, maxPlies, searchDepth, len(entries)))
+        array("Q", [entry[0] for entry in entries]).tofile(bookFile)
+        array("i", [entry[2] for entry in entries]).tofile(bookFile)
+        array("H", [entry[1] for entry in entries]).tofile(bookFile)
+        array("B", [min(entry[3], 255) for entry in entries]).tofile(bookFile)
+    return len(entries)
+
+class OpeningBook:
+    """
+    Reads a file written by buildOpeningBook. Lookups binary search the memory mapped key column and go
+    through an LRU cache, so positions seen again (every game starts the same way) cost a dict lookup.
+
+    Parameters
+    ----------
+
+    path: str
+        Book file
+
+    cacheSize: int, optional
+        Most lookups kept in the LRU cache, default 4096
+
+    """
+
+    def __init__(self, path, cacheSize=4096):
+        self.path = path
+        self._lookupKey = None
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mmap) < HEADER.size or self._mmap[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise self.NotAnOpeningBook(path)
+        magic, formatVersion, hashVersion, self.rowLength, self.piecesPerHole, self.maxPlies, self.searchDepth, self.size = HEADER.unpack_from(self._mmap)
+        if formatVersion != FORMAT_VERSION or hashVersion != HASH_VERSION or len(self._mmap) != HEADER.size + self.size * ENTRY_BYTES: #books from before versions were stored fail the size check
+            self.close()
+            raise self.IncompatibleOpeningBook(path, formatVersion, hashVersion)
+
+        #columns of the file as typed views
+        view = memoryview(self._mmap)
+        offset = HEADER.size
+        self._keys = view[offset:offset + self.size * 8].cast("Q")
+        offset += self.size * 8
+        self._values = view[offset:offset + self.size * 4].cast("i")
+        offset += self.size * 4
+        self._bestMoves = view[offset:offset + self.size * 2].cast("H")
+        offset += self.size * 2
+        self._depths = view[offset:offset + self.size]
+
+        self._lookupKey = lru_cache(maxsize=cacheSize)(self._findKey)
+
+    def __repr__(self):
+        return "OpeningBook({!r}, rowLength={}, piecesPerHole={}, maxPlies={}, positions={})".format(self.path, self.rowLength, self.piecesPerHole, self.maxPlies, self.size)
+
+    def __len__(self):
+        return self.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exceptionInfo):
+        self.close()
+
+    def close(self):
+        """
+        Releases the memory map and closes the file.
+
+        """
+
+        if self._mmap is not None:
+            if self._lookupKey is not None:
+                self._lookupKey.cache_clear()
+            self._keys = self._values = self._bestMoves = self._depths = None
+            self._mmap.close()
+            self._file.close()
+            self._mmap = None
+
+    def lookup(self, state, playerToMove):
+        """
+        Looks up a position.
+
+        Parameters
+        ----------
+
+        state: BoardState
+            Position to look up, must be the same rowLength as the book
+
+        playerToMove: int, 1 or 2
+            Player to move
+
+        Returns
+        -------
+
+        entry: tuple or None
+            (bestMove, value, depth) if the position is in the book, where value is the final score difference
+            for playerToMove found by the search, otherwise None
+
+        """
+
+        if state.rowLength != self.rowLength:
+            return None
+        return self._lookupKey(state.hashKey(playerToMove))
+
+    def cacheInfo(self):
+        """
+        Returns the LRU cache's hits, misses, maxsize and currsize.
+
+        """
+
+        return self._lookupKey.cache_info()
+
+    def _findKey(self, key):
+        """
+        Binary searches the key column for key, returns (bestMove, value, depth) or None.
+
+        """
+
+        index = bisect_left(self._keys, key)
+        if index < self.size and self._keys[index] == key:
+            return self._bestMoves[index], self._values[index], self._depths[index]
+        return None
+
+    #Defining Exceptions
+    class NotAnOpeningBook(Exception):
+        """
+        Exception raised if the file opened doesn't start with the opening book header.
+
+        """
+
+        def __init__(self, path, message="{} is not an opening book file."):
+            self.path = path
+            self.message = message.format(self.path)
+            super().__init__(self.message)
+
+    class IncompatibleOpeningBook(Exception):
+        """
+        Exception raised if an opening book was written with a different file format or board hash than this code
+        uses, ie by an older version. Rebuild the book with buildOpeningBook.
+
+        """
+
+        def __init__(self, path, formatVersion, hashVersion, message="{} has format version {} and hash version {}, expected {} and {}. Rebuild it."):
+            self.path = path
+            self.formatVersion = formatVersion
+            self.hashVersion = hashVersion
+            self.message = message.format(self.path, self.formatVersion, self.hashVersion, FORMAT_VERSION, HASH_VERSION)
+            super().__init__(self.message)
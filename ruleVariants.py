@@ -0,0 +1,376 @@
+"""
+Rule variants, played on plain arrays of stones laid out like BoardState.pits (player 1's goal at 0, their row,
+player 2's goal at rowLength + 1, then player 2's row).
+
+    relay   the rules BoardState and Board play: sowing skips the opponent's goal, a last stone landing in a
+            position that already held stones is picked up and sown again, and landing in your own goal gives
+            another move
+    oware   Oware (abapa), the rule set the README links to: goals are only stores for captures and are never
+            sown into, the position moved from is skipped when a move laps the board, and no relay or extra
+            turns. A last stone that makes 2 or 3 in an opponent's position captures it and any unbroken run of
+            2s and 3s before it on that side, unless that would take every stone the opponent has (grand slam,
+            nothing is captured). A player must give stones to an opponent who has none if they can
+
+Each (variant, rowLength, player) gets its own move function, built once as a closure with everything that
+depends on them worked out in advance: which goal is the mover's, the order stones are sown in from every
+position and which positions can be captured from. The loops that sow stones then run without any rule
+checks. ruleVariant(name, rowLength) returns the shared RuleVariant for a board size, whose moveFunctions[player]
+are the move functions.
+
+Only variant strategies (taking a RuleVariant and pits, see variantRandomStrategy) can play variants. Search,
+MCTS and book strategies are built on BoardState and Solver, which only know the relay rules.
+
+"""
+
+from abc import ABC, abstractmethod
+from array import array
+
+from boardState import boardTables, EXTRA_TURN, MOVE_FINISHED
+
+class RuleVariant(ABC):
+    """
+    Rules for one board size. Subclasses build the move functions in self._buildMove(). Use ruleVariant() to get
+    the shared instance instead of making new ones.
+
+    Parameters
+    ----------
+
+    rowLength: int
+        Number of positions in each row
+
+    """
+
+    name = None
+
+    def __init__(self, rowLength):
+        self.rowLength = rowLength
+        self.player1Goal = 0
+        self.player2Goal = rowLength + 1
+        self.numberOfPositions = rowLength * 2 + 2
+        self.goals = (None, self.player1Goal, self.player2Goal)
+        self.playerPositions = (None, tuple(range(self.player1Goal + 1, self.player2Goal)), tuple(range(self.player2Goal + 1, self.numberOfPositions)))
+
+        #moveFunctions[player](pits, position) plays a move in place and returns MOVE_FINISHED or EXTRA_TURN
+        self.moveFunctions = (None, self._buildMove(1), self._buildMove(2))
+
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__, self.rowLength)
+
+    def startingPits(self, piecesPerHole):
+        """
+        Returns the opening position as an array, piecesPerHole stones in every position and empty goals.
+
+        """
+
+        pits = array("i", [piecesPerHole] * self.numberOfPositions)
+        pits[self.player1Goal] = 0
+        pits[self.player2Goal] = 0
+        return pits
+
+    def move(self, pits, position, player):
+        """
+        Plays a move from position for player on pits, in place. Does no validity checks, see self.legalMoves().
+
+        Returns
+        -------
+
+        result: int
+            EXTRA_TURN if player moves again, MOVE_FINISHED if the turn passes
+
+        """
+
+        return self.moveFunctions[player](pits, position)
+
+    def legalMoves(self, pits, player):
+        """
+        Returns tuple of every position player can move from.
+
+        """
+
+        return tuple(position for position in self.playerPositions[player] if pits[position])
+
+    @abstractmethod
+    def isTerminal(self, pits, playerToMove):
+        """
+        Returns True if the game is over.
+
+        """
+
+    def finalScores(self, pits):
+        """
+        Returns (player 1 score, player 2 score) for a finished game, each player's goal plus the stones left on
+        their side.
+
+        """
+
+        return sum(pits[:self.player2Goal]), sum(pits[self.player2Goal:])
+
+    @abstractmethod
+    def _buildMove(self, player):
+        """
+        Returns the move function for player.
+
+        """
+
+class RelayRules(RuleVariant):
+    """
+    Relay sowing, the rules BoardState plays (see BoardState.move). Moves only change pits, there is no hash
+    or occupied mask to keep up.
+
+    """
+
+    name = "relay"
+
+    def isTerminal(self, pits, playerToMove):
+        return not any(pits[self.player1Goal + 1:self.player2Goal]) or not any(pits[self.player2Goal + 1:])
+
+    def _buildMove(self, player):
+        tables = boardTables(self.rowLength)
+        cycle = tables.sowCycles[player]
+        cycleLength = len(cycle)
+        cycleIndex = tables.cycleIndex[player]
+        doubledCycle = tables.doubledCycles[player]
+        goal = self.goals[player] #the other goal isn't in the cycle, so landing in a goal means this one
+
+        def move(pits, position): #a relay always ends, see BoardState.move
+            while True:
+                stones = pits[position]
+                pits[position] = 0
+                fullLaps, remainder = divmod(stones, cycleLength)
+                if fullLaps:
+                    for lapPosition in cycle:
+                        pits[lapPosition] += fullLaps
+                start = cycleIndex[position] + 1
+                for position in doubledCycle[start:start + remainder]: #position ends as the last one sown, or stays where it was with no remainder
+                    pits[position] += 1
+
+                if position == goal:
+                    return EXTRA_TURN
+                if pits[position] < 2:
+                    return MOVE_FINISHED
+
+        return move
+
+class OwareRules(RuleVariant):
+    """
+    Oware (abapa), see the module docstring. The game ends when a player has captured more than half the stones,
+    or the player to move has no legal move (they can't give stones to an opponent who has none). Each player
+    then scores their store plus the stones left on their side.
+
+    """
+
+    name = "oware"
+
+    def __init__(self, rowLength):
+        #stones a move from each position needs to reach the opponent's side
+        self.feedingStones = [0] * (rowLength * 2 + 2)
+        for sideEnd, positions in ((rowLength, range(1, rowLength + 1)), (rowLength * 2 + 1, range(rowLength + 2, rowLength * 2 + 2))):
+            for position in positions:
+                self.feedingStones[position] = sideEnd - position + 1
+        super().__init__(rowLength)
+
+    def legalMoves(self, pits, player):
+        moves = tuple(position for position in self.playerPositions[player] if pits[position])
+        opponentPositions = self.playerPositions[3 - player]
+        if any(pits[opponentPositions[0]:opponentPositions[-1] + 1]):
+            return moves
+        feedingStones = self.feedingStones
+        return tuple(position for position in moves if pits[position] >= feedingStones[position]) #opponent has nothing, they must be fed
+
+    def isTerminal(self, pits, playerToMove):
+        half = sum(pits) // 2
+        if pits[self.player1Goal] > half or pits[self.player2Goal] > half:
+            return True
+        return not self.legalMoves(pits, playerToMove)
+
+    def _buildMove(self, player):
+        numberOfPositions = self.numberOfPositions
+        goal = self.goals[player]
+        opponentPositions = self.playerPositions[3 - player]
+        opponentStart = opponentPositions[0]
+        opponentEnd = opponentPositions[-1] + 1
+
+        #sowOrders[position] is every other position in both rows in the order stones go into them, skipping the position moved from
+        pitCycle = self.playerPositions[1] + self.playerPositions[2]
+        sowOrders = [()] * numberOfPositions
+        for cyclePosition, position in enumerate(pitCycle):
+            sowOrders[position] = pitCycle[cyclePosition + 1:] + pitCycle[:cyclePosition]
+        orderLength = len(pitCycle) - 1
+
+        #captureRuns[position] is the opponent's positions from position back to the start of their row, empty on the mover's side
+        captureRuns = [()] * numberOfPositions
+        for position in opponentPositions:
+            captureRuns[position] = tuple(range(position, opponentStart - 1, -1))
+
+        def move(pits, position):
+            stones = pits[position]
+            pits[position] = 0
+            order = sowOrders[position]
+            laps, remainder = divmod(stones, orderLength)
+            if laps:
+                for lapPosition in order:
+                    pits[lapPosition] += laps
+            for lastPosition in order[:remainder]:
+                pits[lastPosition] += 1
+            lastPosition = order[remainder - 1] #the end of the order when stones are exact laps
+
+            run = captureRuns[lastPosition]
+            if run:
+                captured = 0
+                capturedPositions = 0
+                for capturePosition in run:
+                    stones = pits[capturePosition]
+                    if stones != 2 and stones != 3:
+                        break
+                    captured += stones
+                    capturedPositions += 1
+                if captured and captured < sum(pits[opponentStart:opponentEnd]): #taking everything is a grand slam, nothing is captured
+                    for capturePosition in run[:capturedPositions]:
+                        pits[capturePosition] = 0
+                    pits[goal] += captured
+            return MOVE_FINISHED
+
+        return move
+
+VARIANTS = {RelayRules.name: RelayRules, OwareRules.name: OwareRules}
+
+_ruleVariantCache = {}
+
+def ruleVariant(name, rowLength):
+    """
+    Returns the RuleVariant shared by every game of variant name with rowLength positions in each row.
+
+    Raises
+    ------
+
+    ValueError
+        If there is no variant called name
+
+    """
+
+    key = (name, rowLength)
+    variant = _ruleVariantCache.get(key)
+    if variant is None:
+        if name not in VARIANTS:
+            raise ValueError("unknown rule variant {!r}, expected one of {}".format(name, ", ".join(VARIANTS)))
+        variant = _ruleVariantCache[key] = VARIANTS[name](rowLength)
+    return variant
+
+def moveFunction(name, rowLength, player):
+    """
+    Returns the move function for player in variant name, see RuleVariant.move.
+
+    """
+
+    return ruleVariant(name, rowLength).moveFunctions[player]
+
+def variantRandomStrategy(variant, pits, player, rng):
+    """
+    Picks a random legal move. Variant strategies take (RuleVariant, pits, player, rng) and must not change pits.
+
+    """
+
+    return rng.choice(variant.legalMoves(pits, player))
+
+def variantGreedyStrategy(variant, pits, player, rng):
+    """
+    Picks the move that leaves player furthest ahead in goals, counting a move that gives an extra turn as
+    better than one that doesn't. Ties are broken randomly.
+
+    """
+
+    move = variant.moveFunctions[player]
+    goal = variant.goals[player]
+    opponentGoal = variant.goals[3 - player]
+    bestMoves = []
+    bestScore = None
+    for position in variant.legalMoves(pits, player):
+        after = array("i", pits)
+        result = move(after, position)
+        score = (after[goal] - after[opponentGoal], result == EXTRA_TURN)
+        if bestScore is None or score > bestScore:
+            bestScore = score
+            bestMoves = [position]
+        elif score == bestScore:
+            bestMoves.append(position)
+    return rng.choice(bestMoves)
+
+VARIANT_STRATEGIES = {"random": variantRandomStrategy, "greedy": variantGreedyStrategy}
+
+def variantStrategy(strategy):
+    """
+    Returns the variant strategy to play in place of strategy. Board's random and greedy strategies become their
+    variant versions and anything else is assumed to already be a variant strategy.
+
+    Parameters
+    ----------
+
+    strategy: callable
+        Variant strategy, or strategies.randomStrategy or strategies.greedyStrategy
+
+    Returns
+    -------
+
+    strategy: callable
+        Variant strategy, taking (RuleVariant, pits, player, rng)
+
+    Raises
+    ------
+
+    ValueError
+        If strategy is a search, MCTS or book strategy, which only play Board's rules
+
+    """
+
+    from strategies import randomStrategy, greedyStrategy, SearchStrategy, BookStrategy
+    from mcts import MCTSPlayer
+    if strategy is randomStrategy:
+        return variantRandomStrategy
+    if strategy is greedyStrategy:
+        return variantGreedyStrategy
+    if isinstance(strategy, (SearchStrategy, BookStrategy, MCTSPlayer)):
+        raise ValueError("{!r} only plays Board's rules, rule variants can be played by {}".format(strategy, " or ".join(VARIANT_STRATEGIES)))
+    return strategy
+
+def playVariantGame(variantName, player1Strategy, player2Strategy, rng, piecesPerHole=4, rowLength=6, maxMoves=10000):
+    """
+    Plays one game of a rule variant between two variant strategies, see tournament.playGame.
+
+    Parameters
+    ----------
+
+    variantName: str
+        Rule variant, a key of VARIANTS
+
+    player1Strategy, player2Strategy: callable
+        Variant strategies, taking (RuleVariant, pits, player, rng)
+
+    rng: random.Random
+        Source of randomness passed to the strategies
+
+    piecesPerHole, rowLength, maxMoves: int, optional
+        Same as tournament.playGame
+
+    Returns
+    -------
+
+    player1Score, player2Score, moves: int
+        Same as tournament.playGame
+
+    """
+
+    variant = ruleVariant(variantName, rowLength)
+    pits = variant.startingPits(piecesPerHole)
+    moveFunctions = variant.moveFunctions
+    strategies = (None, player1Strategy, player2Strategy)
+    player = 1
+    moves = 0
+    while moves < maxMoves and not variant.isTerminal(pits, player):
+        position = strategies[player](variant, pits, player, rng)
+        result = moveFunctions[player](pits, position)
+        moves += 1
+        if result != EXTRA_TURN:
+            player = 3 - player
+
+    player1Score, player2Score = variant.finalScores(pits)
+    return player1Score, player2Score, moves
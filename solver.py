@@ -0,0 +1,282 @@
+import time
+
+from boardState import BoardState, EXTRA_TURN
+from transpositionTable import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+
+def goalDifference(state, player):
+    """
+    Static evaluation used at the search horizon: stones in player's goal minus stones in opponent's goal.
+
+    """
+
+    difference = state.pits[state.player1Goal] - state.pits[state.player2Goal]
+    return difference if player == 1 else -difference
+
+class SearchResult:
+    """
+    Result of one iteration of Solver.search.
+
+    Parameters
+    ----------
+
+    bestMove: int or None
+        Best position to move from, None if there were no moves
+
+    value: int
+        Value of the position for the player searched for, in stones
+
+    depth: int
+        Depth the search completed to
+
+    nodes: int
+        Number of positions visited
+
+    seconds: float
+        Time spent searching
+
+    """
+
+    def __init__(self, bestMove, value, depth, nodes, seconds):
+        self.bestMove = bestMove
+        self.value = value
+        self.depth = depth
+        self.nodes = nodes
+        self.seconds = seconds
+        self.nodesPerSecond = nodes / seconds if seconds > 0 else 0.0
+
+    def __repr__(self):
+        return "SearchResult(bestMove={}, value={}, depth={}, nodes={}, seconds={:.3f}, nodesPerSecond={:.0f})".format(self.bestMove, self.value, self.depth, self.nodes, self.seconds, self.nodesPerSecond)
+
+class Solver:
+    """
+    Iterative deepening negamax search with alpha-beta pruning. Landing in your own goal gives another move,
+    so those children are searched for the same player without negating. Searches run on BoardState copies
+    rather than Board objects.
+
+    Parameters
+    ----------
+
+    maxDepth: int, optional
+        Deepest iteration to search to, in moves (an extra turn counts as a move), default 12
+
+    timeLimit: float, optional
+        Seconds to search for before stopping, default None (no limit)
+
+    nodeLimit: int, optional
+        Number of positions to visit before stopping, default None (no limit)
+
+    table: TranspositionTable, optional
+        Table to cache results in, a new one is made if not given. Sharing one between searches keeps results.
+
+    endgame: EndgameDatabase, optional
+        Exact values for positions with few stones left, used instead of searching them. Default None
+
+    """
+
+    checkEvery = 1024 #nodes between checks of time and node limits
+
+    def __init__(self, maxDepth=12, timeLimit=None, nodeLimit=None, table=None, endgame=None):
+        self.maxDepth = maxDepth
+        self.timeLimit = timeLimit
+        self.nodeLimit = nodeLimit
+        self.table = table if table is not None else TranspositionTable()
+        self.endgame = endgame
+
+        self.nodes = 0
+        self._deadline = None
+        self._nextCheck = 0
+
+    def search(self, board, player, onIteration=None):
+        """
+        Searches for the best move for player, deepening one move at a time until maxDepth or a limit is hit.
+
+        Parameters
+        ----------
+
+        board: Board or BoardState
+            Position to search from. Not changed by the search.
+
+        player: int, 1 or 2
+            Player to move
+
+        onIteration: callable, optional
+            Called with the SearchResult of every completed iteration, ie for printing progress
+
+        Returns
+        -------
+
+        result: SearchResult
+            Result of the deepest completed iteration. If the limits are hit before depth 1 finishes, the
+            best move is the first legal move with the static evaluation as its value.
+
+        """
+
+        state = board.state.copy() if not isinstance(board, BoardState) else board.copy()
+        startTime = time.perf_counter()
+        self.nodes = 0
+        self._deadline = startTime + self.timeLimit if self.timeLimit is not None else None
+        self._nextCheck = self.checkEvery
+
+        moves = state.legalMoves(player)
+        result = SearchResult(moves[0] if moves else None, goalDifference(state, player), 0, 0, 0.0)
+        for depth in range(1, self.maxDepth + 1):
+            try:
+                value, bestMove = self._root(state, depth, player)
+            except self._SearchStopped:
+                break
+
+            result = SearchResult(bestMove, value, depth, self.nodes, time.perf_counter() - startTime)
+            if onIteration is not None:
+                onIteration(result)
+            if bestMove is None: #game is over, deeper searches won't change anything
+                break
+
+        result.nodes = self.nodes
+        result.seconds = time.perf_counter() - startTime
+        result.nodesPerSecond = result.nodes / result.seconds if result.seconds > 0 else 0.0
+        return result
+
+    def _root(self, state, depth, player):
+        """
+        Searches every move from the root, returns (value, bestMove).
+
+        """
+
+        if state.isTerminal():
+            return state.finalDifference(player), None
+
+        key = state.hashKey(player)
+        entry = self.table.probe(key)
+        tableMove = entry[3] if entry is not None else None #best move from previous iteration is searched first
+
+        infinity = self._infinity(state)
+        alpha = -infinity
+        bestMove = None
+        for move in self._orderedMoves(state, player, tableMove):
+            child = state.copy()
+            result = child.move(move, player)
+            if result == EXTRA_TURN:
+                value = self._negamax(child, depth - 1, alpha, infinity, player)
+            else:
+                value = -self._negamax(child, depth - 1, -infinity, -alpha, 3 - player)
+
+            if bestMove is None or value > alpha:
+                alpha = value
+                bestMove = move
+
+        self.table.store(key, depth, alpha, EXACT, bestMove)
+        return alpha, bestMove
+
+    def _negamax(self, state, depth, alpha, beta, player):
+        """
+        Returns value of state for player, searched depth moves deep within the window (alpha, beta).
+
+        """
+
+        self.nodes += 1
+        if self.nodes >= self._nextCheck:
+            self._checkLimits()
+
+        if state.isTerminal():
+            return state.finalDifference(player)
+        if self.endgame is not None and self.endgame.covers(state): #exact value, nothing left to search
+            return self.endgame.finalDifference(state, player)
+        if depth <= 0:
+            return goalDifference(state, player)
+
+        #use cached result if it was searched deep enough
+        key = state.hashKey(player)
+        entry = self.table.probe(key)
+        tableMove = None
+        if entry is not None:
+            entryDepth, entryValue, entryFlag, tableMove = entry
+            if entryDepth >= depth:
+                if entryFlag == EXACT:
+                    return entryValue
+                if entryFlag == LOWER_BOUND and entryValue > alpha:
+                    alpha = entryValue
+                elif entryFlag == UPPER_BOUND and entryValue < beta:
+                    beta = entryValue
+                if alpha >= beta:
+                    return entryValue
+
+        originalAlpha = alpha
+        bestValue = None
+        bestMove = None
+        for move in self._orderedMoves(state, player, tableMove):
+            child = state.copy()
+            result = child.move(move, player)
+            if result == EXTRA_TURN: #same player moves again, so value isn't negated
+                value = self._negamax(child, depth - 1, alpha, beta, player)
+            else:
+                value = -self._negamax(child, depth - 1, -beta, -alpha, 3 - player)
+
+            if bestValue is None or value > bestValue:
+                bestValue = value
+                bestMove = move
+            if value > alpha:
+                alpha = value
+            if alpha >= beta:
+                break
+
+        if bestValue <= originalAlpha:
+            flag = UPPER_BOUND
+        elif bestValue >= beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        self.table.store(key, depth, bestValue, flag, bestMove)
+        return bestValue
+
+    def _orderedMoves(self, state, player, tableMove=None):
+        """
+        Orders moves so the ones most likely to be best are searched first: the best move stored in the table,
+        then moves whose last stone lands straight in player's goal (extra turn), then the rest from the position
+        closest to player's goal.
+
+        """
+
+        cycleLength = len(state.sowCycles[player])
+        cycleIndex = state.cycleIndex[player]
+        goalIndex = cycleIndex[state.player1Goal if player == 1 else state.player2Goal]
+        pits = state.pits
+
+        extraTurnMoves = []
+        otherMoves = []
+        for move in reversed(state.legalMoves(player)):
+            if move == tableMove:
+                continue
+            if pits[move] % cycleLength == (goalIndex - cycleIndex[move]) % cycleLength:
+                extraTurnMoves.append(move)
+            else:
+                otherMoves.append(move)
+
+        if tableMove is not None and pits[tableMove] and state.owner[tableMove] == player:
+            return [tableMove] + extraTurnMoves + otherMoves
+        return extraTurnMoves + otherMoves
+
+    def _infinity(self, state):
+        """
+        Returns a value larger than any score difference possible on state's board.
+
+        """
+
+        return sum(state.pits) + 1
+
+    def _checkLimits(self):
+        """
+        Stops the search by raising _SearchStopped if the time or node limit has been reached.
+
+        """
+
+        self._nextCheck = self.nodes + self.checkEvery
+        if self.nodeLimit is not None and self.nodes >= self.nodeLimit:
+            raise self._SearchStopped()
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            raise self._SearchStopped()
+
+    class _SearchStopped(Exception):
+        """
+        Raised inside the search to unwind it once a limit is hit. Never escapes Solver.search.
+
+        """
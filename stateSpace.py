@@ -0,0 +1,540 @@
+"""
+Exhaustive enumeration of every position reachable from the starting Board(piecesPerHole, rowLength).
+
+Stones never leave the board (goals included), so every reachable position has the same number of stones and can
+be given an exact rank among all ways of spreading them over the positions (stars and bars, see
+endgameDatabase.positionIndex). A position with the player to move is stored as the 64 bit key rank * 2 + (player
+- 1), which can be turned back into the board, so frontiers and seen positions are just arrays of keys.
+
+The search is breadth first, one level (move) at a time. Every level's frontier is a file of keys that is read
+in chunks, and positions already seen are kept in a SpillingSet, a fixed size hash table of keys that writes
+sorted runs to disk once it holds memoryLimit keys. With more than one worker, positions are split between workers
+by a hash of their key. Each worker expands its own frontier, sends the children to the workers owning them through files,
+then removes the ones it has already seen from what it was sent.
+
+"""
+
+import heapq
+import mmap
+import multiprocessing
+import os
+import shutil
+import tempfile
+from array import array
+from bisect import bisect_left
+from math import comb
+
+from boardState import BoardState, EXTRA_TURN
+from endgameDatabase import positionIndex
+
+KEY_TYPECODE = "Q"
+KEY_SIZE = array(KEY_TYPECODE).itemsize
+
+class SpillingSet:
+    """
+    Set of 64 bit keys that moves to disk as it grows. Keys are added to a fixed size open addressing table
+    (an array of unsigned 64 bit ints, linear probing, at most half full), so memory use is 16 bytes per key of
+    memoryLimit whatever is added. Once the table holds memoryLimit keys they are sorted and written out as a run
+    file, which is memory mapped and searched with bisect. A new run is merged with the run before it while that
+    one is less than twice its size, so there are only ever about log2(len / memoryLimit) runs to search and
+    each key is rewritten that many times.
+
+    Parameters
+    ----------
+
+    directory: str
+        Where run files are written
+
+    memoryLimit: int, optional
+        Keys held in memory before spilling to disk, default 2**22
+
+    """
+
+    def __init__(self, directory, memoryLimit=1 << 22):
+        self.directory = directory
+        self.memoryLimit = memoryLimit
+        tableBits = max(memoryLimit * 2 - 1, 1).bit_length()
+        self._table = array(KEY_TYPECODE, [0]) * (1 << tableBits) #key + 1 in each used slot, 0 is empty
+        self._slotShift = 64 - tableBits
+        self._slotMask = (1 << tableBits) - 1
+        self._tableSize = 0
+        self._runs = [] #(path, file, mmap, keys view) for every run on disk
+        self._runSize = 0
+        self._spills = 0
+
+    def __len__(self):
+        return self._tableSize + self._runSize
+
+    def __contains__(self, key):
+        return self._probe(key) < 0 or self._inRuns(key)
+
+    def add(self, key):
+        """
+        Adds key, spilling to disk if memory is full. Returns True if key wasn't in the set already.
+
+        """
+
+        slot = self._probe(key)
+        if slot < 0 or self._inRuns(key):
+            return False
+        self._table[slot] = key + 1
+        self._tableSize += 1
+        if self._tableSize >= self.memoryLimit:
+            self.spill()
+        return True
+
+    def _probe(self, key):
+        """
+        Returns -1 if key is in the table, otherwise the empty slot it would go in.
+
+        """
+
+        table = self._table
+        stored = key + 1
+        slot = ((key * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> self._slotShift
+        while True:
+            entry = table[slot]
+            if entry == stored:
+                return -1
+            if entry == 0:
+                return slot
+            slot = (slot + 1) & self._slotMask
+
+    def _inRuns(self, key):
+        """
+        Returns True if key is in a run on disk.
+
+        """
+
+        for path, runFile, runMap, keys in self._runs:
+            index = bisect_left(keys, key)
+            if index < len(keys) and keys[index] == key:
+                return True
+        return False
+
+    def spill(self):
+        """
+        Writes the keys in memory out as a sorted run and empties the table.
+
+        """
+
+        if not self._tableSize:
+            return
+        self._writeRun(array(KEY_TYPECODE, sorted(entry - 1 for entry in self._table if entry)))
+        self._table = array(KEY_TYPECODE, [0]) * len(self._table)
+        self._tableSize = 0
+        while len(self._runs) > 1 and len(self._runs[-2][3]) < len(self._runs[-1][3]) * 2:
+            self._mergeLastRuns()
+
+    def close(self):
+        """
+        Closes and deletes every run file.
+
+        """
+
+        for path, runFile, runMap, keys in self._runs:
+            keys.release()
+            runMap.close()
+            runFile.close()
+            os.remove(path)
+        self._runs = []
+        self._runSize = 0
+        self._tableSize = 0
+        self._table = array(KEY_TYPECODE)
+
+    def _writeRun(self, keys):
+        """
+        Writes sorted keys to a new run file and maps it.
+
+        """
+
+        self._spills += 1
+        path = os.path.join(self.directory, "run-{}.bin".format(self._spills))
+        with open(path, "wb") as runFile:
+            keys.tofile(runFile)
+        runFile = open(path, "rb")
+        runMap = mmap.mmap(runFile.fileno(), 0, access=mmap.ACCESS_READ)
+        self._runs.append((path, runFile, runMap, memoryview(runMap).cast(KEY_TYPECODE)))
+        self._runSize += len(keys)
+
+    def _mergeLastRuns(self):
+        """
+        Merges the two newest runs into one.
+
+        """
+
+        runs = self._runs[-2:]
+        del self._runs[-2:]
+        merged = array(KEY_TYPECODE, heapq.merge(*(keys for path, runFile, runMap, keys in runs))) #runs never share keys
+        for path, runFile, runMap, keys in runs:
+            self._runSize -= len(keys)
+            keys.release()
+            runMap.close()
+            runFile.close()
+            os.remove(path)
+        self._writeRun(merged)
+
+class StateSpaceStatistics:
+    """
+    Totals for an enumeration.
+
+    """
+
+    def __init__(self):
+        self.positions = 0 #positions reached, each (board, player to move) counted once
+        self.terminalPositions = 0
+        self.positionsPerLevel = [] #positions first reached after each number of moves
+        self.branching = {} #legal moves to number of non terminal positions with that many
+        self.relayLengths = {} #positions sown from in a move to number of moves
+
+    def __repr__(self):
+        return "StateSpaceStatistics(positions={}, terminalPositions={}, levels={}, averageBranching={:.3f})".format(
+            self.positions, self.terminalPositions, len(self.positionsPerLevel), self.averageBranching())
+
+    def averageBranching(self):
+        """
+        Returns the average number of legal moves over non terminal positions.
+
+        """
+
+        positions = sum(self.branching.values())
+        return sum(moves * count for moves, count in self.branching.items()) / positions if positions else 0.0
+
+    def merge(self, other):
+        """
+        Adds the expansion counts of another StateSpaceStatistics into this one (levels are not merged).
+
+        """
+
+        self.terminalPositions += other.terminalPositions
+        for histogram, otherHistogram in ((self.branching, other.branching), (self.relayLengths, other.relayLengths)):
+            for value, count in otherHistogram.items():
+                histogram[value] = histogram.get(value, 0) + count
+
+    def asDict(self):
+        """
+        Returns the totals as a dict, ie for saving as JSON.
+
+        """
+
+        return {"positions": self.positions, "terminalPositions": self.terminalPositions, "levels": len(self.positionsPerLevel),
+                "positionsPerLevel": self.positionsPerLevel, "averageBranching": self.averageBranching(),
+                "branching": dict(sorted(self.branching.items())), "relayLengths": dict(sorted(self.relayLengths.items()))}
+
+class PositionCoder:
+    """
+    Converts between boards and 64 bit keys for boards with totalStones stones on rowLength rows.
+
+    Parameters
+    ----------
+
+    rowLength: int
+        Number of positions in each row
+
+    totalStones: int
+        Stones on the board, goals included
+
+    Raises
+    ------
+
+    ValueError
+        If there are too many positions for 64 bit keys
+
+    """
+
+    def __init__(self, rowLength, totalStones):
+        self.rowLength = rowLength
+        self.totalStones = totalStones
+        self.numberOfPositions = rowLength * 2 + 2
+        size = totalStones + self.numberOfPositions
+        self.binomials = [[comb(n, r) for r in range(self.numberOfPositions)] for n in range(size)]
+        if comb(totalStones + self.numberOfPositions - 1, self.numberOfPositions - 1) * 2 >= 1 << 64:
+            raise ValueError("too many positions for 64 bit keys")
+
+    def encode(self, pits, player):
+        """
+        Returns the key for pits with player to move.
+
+        """
+
+        return positionIndex(pits, self.binomials) * 2 + player - 1
+
+    def decode(self, key):
+        """
+        Returns (pits list, player to move) for key.
+
+        """
+
+        rank, playerBit = divmod(key, 2)
+        bars = [0] * self.numberOfPositions
+        bar = self.totalStones + self.numberOfPositions - 2 #highest place a bar can be in
+        binomials = self.binomials
+        for barNumber in range(self.numberOfPositions - 1, 0, -1): #largest bar with binomial at most what is left of rank
+            while binomials[bar][barNumber] > rank:
+                bar -= 1
+            rank -= binomials[bar][barNumber]
+            bars[barNumber] = bar
+            bar -= 1
+
+        pits = [0] * self.numberOfPositions
+        previous = -1
+        for barNumber in range(1, self.numberOfPositions):
+            pits[barNumber - 1] = bars[barNumber] - previous - 1
+            previous = bars[barNumber]
+        pits[-1] = self.totalStones + self.numberOfPositions - 2 - previous
+        return pits, playerBit + 1
+
+def partitionOf(key, partitions):
+    """
+    Returns the worker owning key. Keys are mixed first so neighbouring ranks spread over workers.
+
+    """
+
+    return (((key * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> 32) % partitions
+
+def _readKeys(path, chunkKeys):
+    """
+    Yields arrays of at most chunkKeys keys from a key file, missing files are empty.
+
+    """
+
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as keyFile:
+        while True:
+            data = keyFile.read(chunkKeys * KEY_SIZE)
+            if not data:
+                return
+            keys = array(KEY_TYPECODE)
+            keys.frombytes(data)
+            yield keys
+
+class _Partition:
+    """
+    The positions owned by one worker: its seen set and its frontier files.
+
+    """
+
+    def __init__(self, index, partitions, directory, rowLength, totalStones, memoryLimit, chunkKeys):
+        self.index = index
+        self.partitions = partitions
+        self.directory = directory
+        self.rowLength = rowLength
+        self.coder = PositionCoder(rowLength, totalStones)
+        self.chunkKeys = chunkKeys
+        self.seen = SpillingSet(os.path.join(directory, "seen-{}".format(index)), memoryLimit)
+        os.makedirs(self.seen.directory, exist_ok=True)
+        self.state = BoardState(0, rowLength)
+        self.undoLog = []
+
+    def frontierPath(self, level):
+        return os.path.join(self.directory, "frontier-{}-{}.bin".format(self.index, level))
+
+    def candidatePath(self, source, target, level):
+        return os.path.join(self.directory, "candidates-{}-{}-{}.bin".format(source, target, level))
+
+    def seed(self, key):
+        """
+        Puts the starting position in this partition's first frontier.
+
+        """
+
+        self.seen.add(key)
+        with open(self.frontierPath(0), "wb") as frontierFile:
+            array(KEY_TYPECODE, [key]).tofile(frontierFile)
+
+    def expand(self, level):
+        """
+        Plays every move from every position in this partition's frontier for level, writing the children to
+        the candidate files of the partitions that own them. Returns StateSpaceStatistics for the positions
+        expanded.
+
+        """
+
+        statistics = StateSpaceStatistics()
+        outboxes = [array(KEY_TYPECODE) for partition in range(self.partitions)]
+        outFiles = [open(self.candidatePath(self.index, target, level + 1), "wb") for target in range(self.partitions)]
+        coder = self.coder
+        state = self.state
+        undoLog = self.undoLog
+        try:
+            for keys in _readKeys(self.frontierPath(level), self.chunkKeys):
+                for key in keys:
+                    pits, player = coder.decode(key)
+                    state.pits[:] = array("i", pits)
+                    state.occupied = sum(1 << position for position, stones in enumerate(pits) if stones) #the hash is never used, so it isn't rebuilt
+                    if state.isTerminal():
+                        statistics.terminalPositions += 1
+                        continue
+
+                    moves = state.legalMoves(player)
+                    statistics.branching[len(moves)] = statistics.branching.get(len(moves), 0) + 1
+                    for move in moves:
+                        result = state.move(move, player, undoLog)
+                        statistics.relayLengths[state.sows] = statistics.relayLengths.get(state.sows, 0) + 1
+                        childKey = coder.encode(state.pits, player if result == EXTRA_TURN else 3 - player)
+                        state.unmake(undoLog)
+                        target = partitionOf(childKey, self.partitions)
+                        outboxes[target].append(childKey)
+                        if len(outboxes[target]) >= self.chunkKeys:
+                            outboxes[target].tofile(outFiles[target])
+                            del outboxes[target][:]
+
+            for outbox, outFile in zip(outboxes, outFiles):
+                outbox.tofile(outFile)
+        finally:
+            for outFile in outFiles:
+                outFile.close()
+        if os.path.exists(self.frontierPath(level)):
+            os.remove(self.frontierPath(level))
+        return statistics
+
+    def absorb(self, level):
+        """
+        Reads the candidates every partition sent this one for level, keeps the ones not seen before as the
+        frontier for level and returns how many there are.
+
+        """
+
+        newPositions = 0
+        frontier = array(KEY_TYPECODE)
+        with open(self.frontierPath(level), "wb") as frontierFile:
+            for source in range(self.partitions):
+                path = self.candidatePath(source, self.index, level)
+                for keys in _readKeys(path, self.chunkKeys):
+                    for key in keys:
+                        if self.seen.add(key):
+                            frontier.append(key)
+                    if len(frontier) >= self.chunkKeys:
+                        frontier.tofile(frontierFile)
+                        newPositions += len(frontier)
+                        del frontier[:]
+                if os.path.exists(path):
+                    os.remove(path)
+            frontier.tofile(frontierFile)
+            newPositions += len(frontier)
+        return newPositions
+
+    def close(self):
+        self.seen.close()
+
+def _partitionWorker(connection, arguments):
+    """
+    Runs one _Partition in a worker process, doing what the main process asks through connection.
+
+    """
+
+    partition = _Partition(*arguments)
+    try:
+        while True:
+            command, value = connection.recv()
+            if command == "seed":
+                connection.send(partition.seed(value))
+            elif command == "expand":
+                connection.send(partition.expand(value))
+            elif command == "absorb":
+                connection.send(partition.absorb(value))
+            else:
+                break
+    finally:
+        partition.close()
+        connection.close()
+
+def enumerateStateSpace(piecesPerHole=2, rowLength=3, workers=1, memoryLimit=1 << 22, chunkKeys=1 << 16, directory=None, onLevel=None):
+    """
+    Walks every position reachable from the start of a game, breadth first.
+
+    Parameters
+    ----------
+
+    piecesPerHole: int, optional
+        Number of starting pieces in each of the positions on the board, default 2
+
+    rowLength: int, optional
+        Number of positions in each row, default 3
+
+    workers: int, optional
+        Number of worker processes positions are split between by hash, default 1 (everything in this process)
+
+    memoryLimit: int, optional
+        Seen positions each worker keeps in memory before spilling to disk, each worker's table takes 16 bytes
+        per position of this (64 MiB at the default), default 2**22
+
+    chunkKeys: int, optional
+        Keys read and written at a time, default 2**16
+
+    directory: str, optional
+        Where frontier and seen set files go, default a temporary directory that is deleted afterwards
+
+    onLevel: callable, optional
+        Called with (level, new positions, total positions) as each level is finished
+
+    Returns
+    -------
+
+    statistics: StateSpaceStatistics
+        Totals for every reachable position
+
+    """
+
+    ownDirectory = directory is None
+    directory = tempfile.mkdtemp(prefix="mancala-states-") if ownDirectory else directory
+    totalStones = piecesPerHole * rowLength * 2
+    partitionArguments = [(index, workers, directory, rowLength, totalStones, memoryLimit, chunkKeys) for index in range(workers)]
+
+    #with one worker the partition lives in this process, otherwise each partition is a process taking commands
+    processes = []
+    if workers == 1:
+        partition = _Partition(*partitionArguments[0])
+    else:
+        for arguments in partitionArguments:
+            parentConnection, childConnection = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_partitionWorker, args=(childConnection, arguments), daemon=True)
+            process.start()
+            processes.append((process, parentConnection))
+
+    def everyPartition(command, value):
+        if workers == 1:
+            return [getattr(partition, command)(value)]
+        for process, connection in processes: #send to every worker before waiting, so they run at the same time
+            connection.send((command, value))
+        return [connection.recv() for process, connection in processes]
+
+    statistics = StateSpaceStatistics()
+    try:
+        start = BoardState(piecesPerHole, rowLength)
+        startKey = PositionCoder(rowLength, totalStones).encode(start.pits, 1)
+        if workers == 1:
+            partition.seed(startKey)
+        else:
+            connection = processes[partitionOf(startKey, workers)][1]
+            connection.send(("seed", startKey))
+            connection.recv()
+        statistics.positions = 1
+        statistics.positionsPerLevel.append(1)
+        if onLevel is not None:
+            onLevel(0, 1, 1)
+
+        level = 0
+        while True:
+            for partitionStatistics in everyPartition("expand", level):
+                statistics.merge(partitionStatistics)
+            level += 1
+            newPositions = sum(everyPartition("absorb", level))
+            if newPositions == 0:
+                break
+            statistics.positions += newPositions
+            statistics.positionsPerLevel.append(newPositions)
+            if onLevel is not None:
+                onLevel(level, newPositions, statistics.positions)
+    finally:
+        if workers == 1:
+            partition.close()
+        else:
+            for process, connection in processes:
+                connection.send(("stop", None))
+            for process, connection in processes:
+                process.join()
+        if ownDirectory:
+            shutil.rmtree(directory, ignore_errors=True)
+    return statistics
@@ -0,0 +1,152 @@
+"""
+Strategies pick a move for a player. Every strategy is a callable taking (board, player, rng) and returning the
+position to move from, where board is a Board that the strategy must not change and rng is a random.Random. 
+Strategies are module level functions or classes so they can be sent to worker processes.
+
+"""
+
+from solver import Solver, goalDifference
+from boardState import EXTRA_TURN
+
+def randomStrategy(board, player, rng):
+    """
+    Picks a random position with stones on player's side.
+
+    """
+
+    return rng.choice(board.legal_moves(player))
+
+def greedyStrategy(board, player, rng):
+    """
+    Picks the move that ends with the most stones in player's goal, counting a move that gives an extra turn
+    as better than one that doesn't. Ties are broken randomly. 
+
+    """
+
+    bestMoves = []
+    bestScore = None
+    for move in board.legal_moves(player):
+        state = board.state.copy()
+        result = state.move(move, player)
+        score = (goalDifference(state, player), result == EXTRA_TURN)
+        if bestScore is None or score > bestScore:
+            bestScore = score
+            bestMoves = [move]
+        elif score == bestScore:
+            bestMoves.append(move)
+    return rng.choice(bestMoves)
+
+class SearchStrategy:
+    """
+    Picks the move found by Solver.search. 
+
+    Parameters
+    ----------
+
+    maxDepth: int, optional
+        Depth to search to, default 6
+
+    timeLimit: float, optional
+        Seconds to search for each move, default None (no limit)
+
+    """
+
+    def __init__(self, maxDepth=6, timeLimit=None):
+        self.maxDepth = maxDepth
+        self.timeLimit = timeLimit
+        self._solver = None
+
+    def __repr__(self):
+        return "SearchStrategy(maxDepth={}, timeLimit={})".format(self.maxDepth, self.timeLimit)
+
+    def __getstate__(self):
+        return {"maxDepth": self.maxDepth, "timeLimit": self.timeLimit, "_solver": None} #solver and its table are rebuilt in each process
+
+    def __call__(self, board, player, rng):
+        if self._solver is None:
+            self._solver = Solver(maxDepth=self.maxDepth, timeLimit=self.timeLimit)
+        return self._solver.search(board, player).bestMove
+
+class BookStrategy:
+    """
+    Plays the move stored in an opening book (see openingBook.py) while the game is still in it, and the
+    fallback strategy's move after that. The book is opened on first use in each process.
+
+    Parameters
+    ----------
+
+    path: str
+        Opening book file
+
+    fallback: callable, optional
+        Strategy used for positions not in the book, default SearchStrategy()
+
+    cacheSize: int, optional
+        Size of the book's LRU cache, default 4096
+
+    """
+
+    def __init__(self, path, fallback=None, cacheSize=4096):
+        self.path = path
+        self.fallback = fallback if fallback is not None else SearchStrategy()
+        self.cacheSize = cacheSize
+        self._book = None
+
+    def __repr__(self):
+        return "BookStrategy({!r}, fallback={!r})".format(self.path, self.fallback)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_book"] = None #memory maps can't be sent to other processes
+        return state
+
+    def __call__(self, board, player, rng):
+        if self._book is None:
+            from openingBook import OpeningBook
+            self._book = OpeningBook(self.path, self.cacheSize)
+        entry = self._book.lookup(board.state, player)
+        if entry is not None:
+            return entry[0]
+        return self.fallback(board, player, rng)
+
+def strategyFromName(specification):
+    """
+    Returns the strategy for a name[:setting] specification, as used on the command line and by the game server.
+
+    Parameters
+    ----------
+
+    specification: str
+        random, greedy, search[:depth], mcts[:seconds per move] or book:path (an opening book, searching to 
+        depth 6 once out of it)
+
+    Returns
+    -------
+
+    strategy: callable
+        Picklable strategy
+
+    Raises
+    ------
+
+    ValueError
+        If the name isn't a known strategy or the setting isn't a number
+
+    """
+
+    name, separator, setting = specification.partition(":")
+    try:
+        if name == "random":
+            return randomStrategy
+        if name == "greedy":
+            return greedyStrategy
+        if name == "search":
+            return SearchStrategy(int(setting)) if setting else SearchStrategy()
+        if name == "mcts":
+            from mcts import MCTSPlayer
+            return MCTSPlayer(float(setting)) if setting else MCTSPlayer()
+        if name == "book" and setting:
+            return BookStrategy(setting)
+    except ValueError:
+        raise ValueError("bad setting in strategy {!r}".format(specification))
+    raise ValueError("unknown strategy {!r}, expected random, greedy, search[:depth], mcts[:seconds] or book:path".format(specification))
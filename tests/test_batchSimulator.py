@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from batchSimulator import BatchBoard
+from board import Board
+
+BOARD_SIZES = [(4, 6), (3, 4), (1, 3), (6, 2), (2, 1)]
+
+@pytest.mark.parametrize("piecesPerHole, rowLength", BOARD_SIZES)
+def test_batchBoardMatchesBoard(piecesPerHole, rowLength):
+    numberOfGames = 40
+    batch = BatchBoard(numberOfGames, piecesPerHole, rowLength)
+    boards = [Board(piecesPerHole, rowLength) for game in range(numberOfGames)]
+    players = [1] * numberOfGames
+    rng = np.random.default_rng(rowLength)
+    for step in range(500):
+        if batch.finished.all():
+            break
+        moves = batch.randomMoves(rng)
+        extraTurn = batch.step(moves)
+        for game, board in enumerate(boards):
+            if board.is_terminal():
+                continue
+            assert board.move(int(moves[game]), players[game]) == extraTurn[game]
+            if not extraTurn[game]:
+                players[game] = 3 - players[game]
+        assert batch.pits.tolist() == [board.state.pits.tolist() for board in boards]
+        assert batch.playerToMove.tolist() == players
+        assert batch.finished.tolist() == [board.is_terminal() for board in boards]
+    assert batch.finished.all()
+
+def test_invalidMovesAreRejected():
+    batch = BatchBoard(3)
+    with pytest.raises(Board.InvalidMove):
+        batch.step([1, 8, 1]) #8 is player 2's
+    batch.pits[2, 3] = 0
+    with pytest.raises(Board.InvalidMove):
+        batch.step([1, 2, 3]) #empty
+    batch.step([1, 2, 4])
+    with pytest.raises(Board.InvalidMove):
+        batch.step([1 if player == 2 else 8 for player in batch.playerToMove])
@@ -0,0 +1,81 @@
+"""
+Checks the array engine under Board against a stone by stone copy of the original Board.move, random games have
+to agree with it exactly. referenceMove and referenceLegalMoves are also used by the tests of modules built on
+Board's rules.
+
+"""
+
+import random
+
+import pytest
+
+from board import Board
+
+BOARD_SIZES = [(4, 6), (3, 4), (1, 3), (6, 2), (2, 1)]
+
+def referenceMove(pits, position, playerMoving):
+    """
+    Plays a move on the list pits the way the original Board.move did, dropping one stone at a time and skipping
+    the opponent's goal. Returns (True if the last stone landed in a goal, last position sown).
+
+    """
+
+    numberOfPositions = len(pits)
+    player1Goal, player2Goal = 0, numberOfPositions // 2
+    skippedGoal = player2Goal if playerMoving == 1 else player1Goal
+    while True:
+        stones = pits[position]
+        pits[position] = 0
+        for stone in range(stones):
+            position = (position + 1) % numberOfPositions
+            if position == skippedGoal:
+                position = (position + 1) % numberOfPositions
+            pits[position] += 1
+        if position in (player1Goal, player2Goal):
+            return True, position
+        if pits[position] < 2:
+            return False, position
+
+def referenceLegalMoves(pits, player):
+    """
+    Returns the positions player can move from on the list pits.
+
+    """
+
+    half = len(pits) // 2
+    side = range(1, half) if player == 1 else range(half + 1, len(pits))
+    return [position for position in side if pits[position]]
+
+def playRandomGame(board, rng, record=False, maxMoves=500):
+    """
+    Plays random moves on board until the game ends, checking every move against referenceMove. Returns a
+    (pits, iterator position, hash, occupied) snapshot from before every move played.
+
+    """
+
+    pits = board.state.pits.tolist()
+    player = 1
+    snapshots = []
+    while len(snapshots) < maxMoves and referenceLegalMoves(pits, 1) and referenceLegalMoves(pits, 2):
+        assert not board.is_terminal()
+        legal = referenceLegalMoves(pits, player)
+        assert list(board.legal_moves(player)) == legal
+        position = rng.choice(legal)
+        expected = pits[:]
+        extraTurn, lastPosition = referenceMove(expected, position, player)
+        snapshots.append((pits, board.board._observingIndex, board.state.hash, board.state.occupied))
+        assert board.move(position, player, record=record) == extraTurn
+        pits = expected
+        assert board.state.pits.tolist() == pits
+        assert board.board._observingIndex == lastPosition
+        assert board.state.hash == board.state.keys.hashOf(board.state.pits)
+        if not extraTurn:
+            player = 3 - player
+    assert board.is_terminal() or len(snapshots) == maxMoves
+    return snapshots
+
+@pytest.mark.parametrize("piecesPerHole, rowLength", BOARD_SIZES)
+def test_randomGamesMatchReference(piecesPerHole, rowLength):
+    rng = random.Random(piecesPerHole * 100 + rowLength)
+    for game in range(30):
+        playRandomGame(Board(piecesPerHole, rowLength), rng)
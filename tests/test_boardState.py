@@ -0,0 +1,52 @@
+"""
+Checks the tables BoardState keeps up to date while sowing against the same values worked out from the pits.
+
+"""
+
+import random
+from array import array
+
+import pytest
+
+from boardState import BoardState
+
+ROW_LENGTHS = [1, 2, 3, 6, 13, 200]
+
+def randomState(rng, rowLength, maxStones):
+    """
+    Returns a BoardState with up to maxStones stones in each position.
+
+    """
+
+    state = BoardState(0, rowLength)
+    state.pits[:] = array("i", [rng.randint(0, maxStones) for position in range(state.numberOfPositions)])
+    state.rehash()
+    return state
+
+@pytest.mark.parametrize("rowLength", ROW_LENGTHS)
+def test_occupiedFollowsSowing(rowLength):
+    rng = random.Random(rowLength)
+    for x in range(200):
+        state = randomState(rng, rowLength, rng.choice((2, 30, 1000)))
+        player = rng.choice((1, 2))
+        moves = state.legalMoves(player)
+        if not moves:
+            continue
+        state.sow(rng.choice(moves), player)
+        assert state.occupied == sum(1 << position for position, stones in enumerate(state.pits) if stones)
+        for side in (1, 2):
+            assert list(state.legalMoves(side)) == [position for position in state.tables.playerPositions[side] if state.pits[position]]
+        assert state.isTerminal() == (not state.legalMoves(1) or not state.legalMoves(2))
+
+@pytest.mark.parametrize("rowLength", ROW_LENGTHS)
+def test_hashFollowsSowing(rowLength):
+    rng = random.Random(rowLength)
+    for x in range(200):
+        state = randomState(rng, rowLength, rng.choice((2, 30, 1000)))
+        player = rng.choice((1, 2))
+        moves = state.legalMoves(player)
+        if not moves:
+            continue
+        state.sow(rng.choice(moves), player)
+        assert state.hash == state.keys.hashOf(state.pits)
+        assert 0 <= state.hash < 1 << 64
@@ -0,0 +1,43 @@
+"""
+Checks endgame databases against their own moves: every position not given the endless game value must be
+worth exactly the best of its moves.
+
+"""
+
+from array import array
+
+import pytest
+
+from boardState import BoardState, EXTRA_TURN
+from endgameDatabase import EndgameDatabase, buildEndgameDatabase, positionIndex, _binomialTable, _compositions
+
+def bestMoveValue(database, state):
+    """
+    Returns the best value over player 1's moves from state, looked up in database, or None with no moves.
+
+    """
+
+    best = None
+    for move in state.legalMoves(1):
+        child = state.copy()
+        result = child.move(move, 1)
+        value = child.pits[child.player1Goal] + (database.lookup(child, 1) if result == EXTRA_TURN else -database.lookup(child, 2))
+        best = value if best is None or value > best else best
+    return best
+
+@pytest.mark.parametrize("rowLength, maxStones", [(2, 8), (3, 6), (3, 9), (4, 5)])
+def test_valuesAreBestOfMoves(tmp_path, rowLength, maxStones):
+    path = str(tmp_path / "endgame.db")
+    cycling = buildEndgameDatabase(path, rowLength, maxStones)
+    binomials = _binomialTable(maxStones + rowLength * 2 + 1)
+    with EndgameDatabase(path) as database:
+        for stones in range(maxStones + 1):
+            for counts in _compositions(stones, rowLength * 2):
+                state = BoardState(0, rowLength)
+                state.pits[:] = array("i", (0,) + counts[:rowLength] + (0,) + counts[rowLength:])
+                state.rehash()
+                value = database.lookup(state, 1)
+                if state.isTerminal():
+                    assert value == sum(counts[:rowLength]) - sum(counts[rowLength:])
+                elif positionIndex(counts, binomials) not in cycling[stones]:
+                    assert value == bestMoveValue(database, state), counts
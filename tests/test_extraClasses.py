@@ -0,0 +1,55 @@
+import copy
+import pickle
+
+import pytest
+
+from board import Board
+from extraClasses import LimitedList
+
+def test_boardCopiesShareTheirOwnStore():
+    board = Board()
+    board.move(3, 1, record=True)
+    for copied in (copy.deepcopy(board), pickle.loads(pickle.dumps(board))):
+        assert copied.board._lst is copied.state.pits
+        assert copied.board._lst is not board.state.pits
+        assert copied.state.pits.tolist() == board.state.pits.tolist()
+        assert copied.board.iterationLocation() == board.board.iterationLocation()
+        copied.move(9, 2, record=True)
+        assert copied.board[9] == 0 and board.board[9] != 0
+        copied.unmake()
+        copied.unmake()
+        assert copied.state.pits.tolist() == Board().state.pits.tolist()
+
+def test_limitedListPickles():
+    listBacked = LimitedList(5)
+    listBacked[1] = 3
+    assert repr(pickle.loads(pickle.dumps(listBacked))) == repr(listBacked)
+    typed = LimitedList(4, "i")
+    typed[2] = 7
+    copied = copy.deepcopy(typed)
+    assert copied[1:3].tolist() == [0, 7]
+    assert copied[0, 2] == typed[0, 2]
+
+def test_boardWritesKeepStateUpToDate():
+    board = Board()
+    for position in board.player1Positions:
+        board.board[position] = 0
+    assert board.legal_moves(1) == () and board.is_terminal()
+    board.board[1, 2] = (3, 0)
+    board.board.seek_position(4)
+    board.board.next(setValue=9)
+    fresh = Board()
+    fresh.state.pits[:] = board.state.pits
+    fresh.state.rehash()
+    assert board.positionHash() == fresh.positionHash() and board.state.occupied == fresh.state.occupied
+    assert list(board.legal_moves(1)) == [1, 5]
+
+def test_playerSidesAreListsWithSeparateViews():
+    board = Board()
+    assert board.player1Side() == [0, 4, 4, 4, 4, 4, 4] and board.player2Side() == [0, 4, 4, 4, 4, 4, 4]
+    view = board.player1SideView()
+    side = board.player1Side()
+    board.move(3, 1)
+    assert side == [0, 4, 4, 4, 4, 4, 4] and view.tolist() == board.player1Side() != side
+    with pytest.raises(TypeError):
+        view[1] = 0
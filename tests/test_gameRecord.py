@@ -0,0 +1,75 @@
+"""
+Checks games written by GameRecordWriter read back unchanged, and replay to the positions they were played through.
+
+"""
+
+import random
+
+import pytest
+
+from board import Board
+from gameRecord import GameRecord, GameRecordWriter, GameRecordReader
+from strategies import randomStrategy
+from tournament import playGame
+
+def randomRecords(rng, games):
+    """
+    Returns a GameRecord for each of games random games on random board sizes.
+
+    """
+
+    records = []
+    for game in range(games):
+        piecesPerHole, rowLength = rng.choice(((4, 6), (1, 1), (3, 4), (1, 40)))
+        moveLog = []
+        player1Score, player2Score, moves = playGame(randomStrategy, randomStrategy, rng, piecesPerHole, rowLength, moveLog=moveLog)
+        moves = [position for position, extraTurn in moveLog]
+        extraTurns = [extraTurn for position, extraTurn in moveLog]
+        records.append(GameRecord(rowLength, piecesPerHole, moves, extraTurns, player1Score, player2Score))
+    return records
+
+def test_recordsRoundTrip(tmp_path):
+    path = str(tmp_path / "games.rec")
+    records = randomRecords(random.Random(0), 20)
+    with GameRecordWriter(path, bufferSize=64) as writer:
+        for record in records[:10]:
+            writer.write(record)
+    with GameRecordWriter(path) as writer: #appending doesn't write a second header
+        for record in records[10:]:
+            writer.writeGame(record.rowLength, record.piecesPerHole, record.moves, record.extraTurns, record.player1Score, record.player2Score)
+    for chunkSize in (5, 97, 1 << 20): #records split across chunks
+        assert list(GameRecordReader(path, chunkSize)) == records
+    for record in records:
+        data = b"xx" + record.toBytes()
+        assert GameRecord.fromBytes(data, 2) == (record, len(data))
+        assert GameRecord.recordSize(data, 2) == len(data) - 2
+
+def test_replayReachesTheFinalScore():
+    for record in randomRecords(random.Random(1), 10):
+        boards = [board.copy() for moveNumber, board in record.replay()]
+        assert len(boards) == len(record.moves)
+        assert boards[-1].is_terminal() and boards[-1].final_score() == (record.player1Score, record.player2Score)
+        moveNumber = (len(boards) + 1) // 2
+        assert record.boardAfter(moveNumber).state.pits.tolist() == boards[moveNumber - 1].state.pits.tolist()
+        assert record.boardAfter(0).state.pits.tolist() == Board(record.piecesPerHole, record.rowLength).state.pits.tolist()
+        with pytest.raises(IndexError):
+            record.boardAfter(len(boards) + 1)
+
+def test_badFilesAreRejected(tmp_path):
+    path = tmp_path / "games.rec"
+    board = Board(4, 6)
+    record = GameRecord(6, 4, [3], [board.move(3, 1)], 0, 0)
+    with GameRecordWriter(str(path)) as writer:
+        writer.write(record)
+        with pytest.raises(ValueError):
+            writer.write(GameRecord(256, 1, [], [], 0, 0))
+    assert GameRecordReader(str(path)).boardAfter(0, 1).state.pits.tolist() == board.state.pits.tolist()
+    with pytest.raises(IndexError):
+        GameRecordReader(str(path)).boardAfter(1, 0)
+    contents = path.read_bytes()
+    path.write_bytes(contents[:-1])
+    with pytest.raises(GameRecordReader.TruncatedRecord):
+        list(GameRecordReader(str(path)))
+    path.write_bytes(b"MANCGREC\x02" + contents[9:])
+    with pytest.raises(GameRecordReader.NotAGameRecordFile):
+        list(GameRecordReader(str(path)))
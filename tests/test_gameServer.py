@@ -0,0 +1,127 @@
+"""
+Checks the game server's protocol over real connections: bad commands get an error reply and leave the
+connection usable, and two clients can play a game between them.
+
+"""
+
+import asyncio
+import json
+
+from gameServer import GameServer, MAX_PIECES_PER_HOLE
+
+class Client:
+    """
+    Test client sending one command at a time and reading the replies.
+
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, server):
+        return cls(*await asyncio.open_connection(server.host, server.port))
+
+    async def send(self, line, replies=1):
+        """
+        Sends line and returns the next replies messages.
+
+        """
+
+        self.writer.write(line.encode() + b"\n")
+        await self.writer.drain()
+        return [await self.receive() for reply in range(replies)]
+
+    async def receive(self):
+        return json.loads(await asyncio.wait_for(self.reader.readline(), 5))
+
+    async def error(self, line):
+        """
+        Sends line, checks the reply is an error and returns its message.
+
+        """
+
+        reply, = await self.send(line)
+        assert reply["type"] == "error", reply
+        return reply["message"]
+
+    def close(self):
+        self.writer.close()
+
+def runWithServer(test):
+    """
+    Runs the coroutine function test(server) against a server on a free port.
+
+    """
+
+    async def run():
+        server = GameServer(port=0, botWorkers=1)
+        await server.start()
+        try:
+            await test(server)
+        finally:
+            await server.close()
+
+    asyncio.run(run())
+
+def test_badCommandsAreAnsweredWithErrors():
+    async def test(server):
+        client = await Client.connect(server)
+        assert "not in a game" in await client.error("MOVE 1")
+        assert "not in a game" in await client.error("STATE")
+        assert "unknown command" in await client.error("JUMP 3")
+        assert "between 1 and" in await client.error("NEW 0 6")
+        assert "between 1 and" in await client.error("NEW {} 6".format(MAX_PIECES_PER_HOLE + 1))
+        assert "between 1 and" in await client.error("NEW 4 65")
+        assert "stones on the board" in await client.error("NEW {} 60".format(MAX_PIECES_PER_HOLE))
+        await client.error("NEW 4 6 nobody")
+        await client.error("NEW four")
+        assert "no game" in await client.error("JOIN 99")
+        await client.error("JOIN")
+        assert server.sessions == {}
+
+        joined, state = await client.send("NEW 4 6", replies=2)
+        assert joined["type"] == "joined" and joined["player"] == 1 and state["type"] == "state"
+        assert "already playing" in await client.error("NEW")
+        await client.error("MOVE")
+        await client.error("MOVE x")
+        assert "invalid" in await client.error("MOVE 0") #a goal
+        assert "invalid" in await client.error("MOVE 8") #player 2's side
+        reply, = await client.send("STATE")
+        assert reply == state
+        client.close()
+
+    runWithServer(test)
+
+def test_twoClientsPlayAGame():
+    async def test(server):
+        player1 = await Client.connect(server)
+        joined, state = await player1.send("NEW 1 2", replies=2)
+        gameId = joined["game"]
+        player2 = await Client.connect(server)
+        joined, state = await player2.send("JOIN {}".format(gameId), replies=2)
+        assert joined["player"] == 2 and state["playerToMove"] == 1
+        assert await player1.receive() == state #both players get the board when someone joins
+        third = await Client.connect(server)
+        assert "full" in await third.error("JOIN {}".format(gameId))
+        assert "player 1's turn" in await player2.error("MOVE 4")
+
+        clients = {1: player1, 2: player2}
+        while not state["finished"]:
+            mover = state["playerToMove"]
+            side = range(1, 3) if mover == 1 else range(4, 6)
+            position = next(position for position in side if state["pits"][position])
+            state, = await clients[mover].send("MOVE {}".format(position))
+            assert await clients[3 - mover].receive() == state
+            assert state["lastMove"] == position
+        assert sum(state["score"]) == 4
+        assert "game is over" in await player1.error("MOVE 1")
+
+        player1.close()
+        player2.close()
+        third.close()
+        while server.sessions: #the game is dropped once both players leave
+            await asyncio.sleep(0.01)
+
+    runWithServer(test)
@@ -0,0 +1,52 @@
+import pytest
+
+import instrumentation
+from boardState import BoardState
+from instrumentation import MoveStatistics, collectMoveStatistics, opponentGoalSkips
+from strategies import greedyStrategy, randomStrategy
+from tournament import runTournament
+
+@pytest.mark.parametrize("rowLength", [1, 2, 3, 6])
+def test_opponentGoalSkipsMatchesWalkingStones(rowLength):
+    state = BoardState(0, rowLength)
+    for player in (1, 2):
+        skippedGoal = state.player2Goal if player == 1 else state.player1Goal
+        for position in state.sowCycles[player]:
+            for stones in range(state.numberOfPositions * 3 + 2):
+                skips = 0
+                walk = position
+                for stone in range(stones):
+                    walk = (walk + 1) % state.numberOfPositions
+                    if walk == skippedGoal:
+                        walk = (walk + 1) % state.numberOfPositions
+                        skips += 1
+                assert opponentGoalSkips(state, position, stones, player) == skips
+
+def countsOf(statistics):
+    """
+    Returns statistics.asDict() without the timings.
+
+    """
+
+    counts = statistics.asDict()
+    del counts["seconds"], counts["histograms"]["moveMicroseconds"]
+    return counts
+
+def test_workerStatisticsAreMerged():
+    with collectMoveStatistics() as inProcess:
+        runTournament(greedyStrategy, randomStrategy, 12, workers=1, chunkSize=4)
+    with collectMoveStatistics() as pooled:
+        runTournament(greedyStrategy, randomStrategy, 12, workers=2, chunkSize=4)
+    assert pooled.moves > 0 and countsOf(pooled) == countsOf(inProcess)
+
+def test_collectorsStopInAnyOrder():
+    first = MoveStatistics().start()
+    second = MoveStatistics().start()
+    first.stop()
+    first.stop()
+    assert instrumentation.activeCollector is second
+    third = MoveStatistics().start()
+    second.stop()
+    assert instrumentation.activeCollector is third
+    third.stop()
+    assert instrumentation.activeCollector is None
@@ -0,0 +1,46 @@
+import pytest
+
+from boardState import BoardState
+from openingBook import OpeningBook, bookPositions, buildOpeningBook, HEADER
+from solver import Solver
+
+def test_lookupsMatchTheSearch(tmp_path):
+    path = str(tmp_path / "opening.book")
+    positions = buildOpeningBook(path, piecesPerHole=2, rowLength=3, maxPlies=3, searchDepth=4, workers=1)
+    with OpeningBook(path) as book:
+        assert len(book) == positions == len(bookPositions(2, 3, 3))
+        for key, state, player in bookPositions(2, 3, 3):
+            result = Solver(maxDepth=4).search(state, player)
+            assert book.lookup(state, player) == (result.bestMove, result.value, result.depth)
+        assert book.lookup(BoardState(5, 3), 1) is None
+        assert book.lookup(BoardState(2, 4), 1) is None #other board sizes are never in the book
+        assert book.cacheInfo().hits == 0
+        book.lookup(BoardState(2, 3), 1)
+        assert book.cacheInfo().hits == 1
+
+def test_movesPastPosition255(tmp_path):
+    path = str(tmp_path / "wide.book")
+    buildOpeningBook(path, piecesPerHole=1, rowLength=130, maxPlies=1, searchDepth=1, workers=1)
+    with OpeningBook(path) as book:
+        for key, state, player in bookPositions(1, 130, 1):
+            bestMove = book.lookup(state, player)[0]
+            assert bestMove in state.legalMoves(player)
+            if player == 2:
+                assert bestMove > 255
+
+def test_mismatchedVersionsAndOtherFilesAreRejected(tmp_path):
+    path = tmp_path / "opening.book"
+    buildOpeningBook(str(path), piecesPerHole=2, rowLength=2, maxPlies=1, searchDepth=2, workers=1)
+    contents = path.read_bytes()
+    for field in (1, 2): #format version, hash version
+        fields = list(HEADER.unpack_from(contents))
+        fields[field] += 1
+        path.write_bytes(HEADER.pack(*fields) + contents[HEADER.size:])
+        with pytest.raises(OpeningBook.IncompatibleOpeningBook):
+            OpeningBook(str(path))
+    path.write_bytes(contents[:-1])
+    with pytest.raises(OpeningBook.IncompatibleOpeningBook):
+        OpeningBook(str(path))
+    path.write_bytes(b"not a book")
+    with pytest.raises(OpeningBook.NotAnOpeningBook):
+        OpeningBook(str(path))
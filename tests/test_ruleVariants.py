@@ -0,0 +1,96 @@
+"""
+Checks the relay variant against BoardState, and the Oware rules on hand built positions.
+
+"""
+
+import random
+from array import array
+
+import pytest
+
+from boardState import BoardState, MOVE_FINISHED
+from ruleVariants import ruleVariant, variantStrategy, variantRandomStrategy, variantGreedyStrategy, playVariantGame
+from strategies import randomStrategy, greedyStrategy, SearchStrategy
+
+def owarePits(stones):
+    """
+    Returns the pits of a 6 position Oware board, empty apart from stones, a dict from position to stones.
+
+    """
+
+    pits = array("i", [0] * 14)
+    for position, count in stones.items():
+        pits[position] = count
+    return pits
+
+@pytest.mark.parametrize("rowLength", [1, 2, 3, 6])
+def test_relayVariantMatchesBoardState(rowLength):
+    rng = random.Random(rowLength)
+    variant = ruleVariant("relay", rowLength)
+    for x in range(2000):
+        state = BoardState(0, rowLength)
+        state.pits[:] = array("i", [rng.randint(0, 12) for position in range(state.numberOfPositions)])
+        state.rehash()
+        player = rng.choice((1, 2))
+        legal = state.legalMoves(player)
+        if not legal:
+            continue
+        position = rng.choice(legal)
+        variantPits = array("i", state.pits)
+        assert variant.legalMoves(variantPits, player) == tuple(legal)
+        assert variant.moveFunctions[player](variantPits, position) == state.move(position, player)
+        assert variantPits.tolist() == state.pits.tolist()
+
+def test_owareLapsSkipTheOriginAndGoals():
+    variant = ruleVariant("oware", 6)
+    pits = owarePits({1: 12})
+    assert variant.move(pits, 1, 1) == MOVE_FINISHED
+    assert pits.tolist() == [0, 0, 2, 1, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1]
+    pits = owarePits({13: 3})
+    variant.move(pits, 13, 2)
+    assert pits.tolist() == [0, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0] #player 1's goal is skipped
+
+def test_owareCapturesRunsOfTwosAndThrees():
+    variant = ruleVariant("oware", 6)
+    pits = owarePits({6: 3, 8: 1, 9: 2, 10: 1, 13: 4})
+    variant.move(pits, 6, 1)
+    assert pits.tolist() == [7, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 4]
+    pits = owarePits({6: 3, 8: 1, 9: 3, 10: 1, 13: 4})
+    variant.move(pits, 6, 1)
+    assert pits.tolist() == [2, 0, 0, 0, 0, 0, 0, 0, 2, 4, 0, 0, 0, 4] #the run stops at the 4
+    pits = owarePits({1: 1, 11: 2, 13: 1})
+    variant.move(pits, 11, 2)
+    assert pits.tolist() == [0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 2] #no capture on the mover's own side
+
+def test_owareGrandSlamCapturesNothing():
+    variant = ruleVariant("oware", 6)
+    pits = owarePits({6: 3, 8: 1, 9: 2, 10: 1})
+    variant.move(pits, 6, 1)
+    assert pits.tolist() == [0, 0, 0, 0, 0, 0, 0, 0, 2, 3, 2, 0, 0, 0]
+
+def test_owarePlayersMustFeedAnEmptyOpponent():
+    variant = ruleVariant("oware", 6)
+    pits = owarePits({1: 2, 5: 1, 6: 1})
+    assert variant.legalMoves(pits, 1) == (6,)
+    assert not variant.isTerminal(pits, 1)
+    pits = owarePits({1: 5, 4: 2})
+    assert variant.legalMoves(pits, 1) == ()
+    assert variant.isTerminal(pits, 1)
+    assert variant.finalScores(pits) == (7, 0)
+    pits = owarePits({0: 25, 3: 1, 10: 1, 7: 21})
+    assert variant.isTerminal(pits, 1) #more than half the stones captured
+
+def test_owareGamesEnd():
+    rng = random.Random(0)
+    for x in range(20):
+        player1Score, player2Score, moves = playVariantGame("oware", variantGreedyStrategy, variantRandomStrategy, rng, maxMoves=100000)
+        assert player1Score + player2Score == 48 and moves < 100000
+
+def test_variantStrategy():
+    assert variantStrategy(randomStrategy) is variantRandomStrategy
+    assert variantStrategy(greedyStrategy) is variantGreedyStrategy
+    assert variantStrategy(variantGreedyStrategy) is variantGreedyStrategy
+    with pytest.raises(ValueError):
+        variantStrategy(SearchStrategy(maxDepth=1))
+    with pytest.raises(ValueError):
+        ruleVariant("kalah", 6)
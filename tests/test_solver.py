@@ -0,0 +1,94 @@
+"""
+Checks Solver's values against plain minimax over the reference moves in test_board, with no pruning, move
+ordering or table.
+
+"""
+
+import random
+from array import array
+
+import pytest
+
+from boardState import BoardState
+from solver import Solver
+from transpositionTable import TranspositionTable
+from test_board import referenceMove, referenceLegalMoves
+
+def finalDifference(pits, player):
+    """
+    Returns player's final score minus their opponent's on the finished board pits.
+
+    """
+
+    half = len(pits) // 2
+    difference = sum(pits[:half]) - sum(pits[half:])
+    return difference if player == 1 else -difference
+
+def minimax(pits, player, depth, cache):
+    """
+    Returns the value of pits for player searched depth moves deep, counting goal difference at the horizon like
+    Solver does.
+
+    """
+
+    key = (tuple(pits), player, depth)
+    if key in cache:
+        return cache[key]
+    half = len(pits) // 2
+    if not referenceLegalMoves(pits, 1) or not referenceLegalMoves(pits, 2):
+        value = finalDifference(pits, player)
+    elif depth == 0:
+        value = (pits[0] - pits[half]) if player == 1 else (pits[half] - pits[0])
+    else:
+        value = None
+        for position in referenceLegalMoves(pits, player):
+            child = pits[:]
+            extraTurn, lastPosition = referenceMove(child, position, player)
+            childValue = minimax(child, player, depth - 1, cache) if extraTurn else -minimax(child, 3 - player, depth - 1, cache)
+            value = childValue if value is None else max(value, childValue)
+    cache[key] = value
+    return value
+
+def randomState(rng, rowLength, stones):
+    """
+    Returns a BoardState with stones stones dropped at random on the rows and goals.
+
+    """
+
+    state = BoardState(0, rowLength)
+    pits = [0] * state.numberOfPositions
+    for stone in range(stones):
+        pits[rng.randrange(state.numberOfPositions)] += 1
+    state.pits[:] = array("i", pits)
+    state.rehash()
+    return state
+
+@pytest.mark.parametrize("piecesPerHole, rowLength", [(1, 2), (2, 2), (1, 3), (3, 1), (4, 6)])
+def test_openingsMatchMinimax(piecesPerHole, rowLength):
+    state = BoardState(piecesPerHole, rowLength)
+    pits = state.pits.tolist()
+    for depth in range(1, 7):
+        result = Solver(maxDepth=depth).search(state, 1)
+        assert result.value == minimax(pits, 1, depth, {})
+        child = pits[:]
+        extraTurn, lastPosition = referenceMove(child, result.bestMove, 1)
+        assert (minimax(child, 1, depth - 1, {}) if extraTurn else -minimax(child, 2, depth - 1, {})) == result.value #best move gets the value
+
+@pytest.mark.parametrize("depth", [1, 2, 3])
+def test_depthLimitedValuesMatchMinimax(depth):
+    rng = random.Random(depth)
+    for x in range(100):
+        state = randomState(rng, rng.choice((2, 3, 4)), rng.randint(2, 16))
+        player = rng.choice((1, 2))
+        result = Solver(maxDepth=depth, table=TranspositionTable(sizeBits=12)).search(state, player)
+        assert result.value == minimax(state.pits.tolist(), player, depth, {})
+        if state.isTerminal():
+            assert result.bestMove is None
+        else:
+            assert result.bestMove in state.legalMoves(player) and result.depth == depth
+
+def test_searchStopsAtTheNodeLimit():
+    state = BoardState(4, 6)
+    result = Solver(maxDepth=50, nodeLimit=5000).search(state, 1)
+    assert result.depth < 50 and result.bestMove in state.legalMoves(1)
+    assert result.nodes < 5000 + Solver.checkEvery
@@ -0,0 +1,76 @@
+"""
+Checks state space enumeration against a breadth first search over the reference moves in test_board, and the
+disk backed key set it keeps positions in.
+
+"""
+
+import random
+
+import pytest
+
+from stateSpace import enumerateStateSpace, SpillingSet, PositionCoder
+from test_board import referenceMove, referenceLegalMoves
+
+def referenceStateSpace(piecesPerHole, rowLength):
+    """
+    Returns (positions, terminal positions, positions per level) for the reachable state space, found by a
+    breadth first search over referenceMove with every (pits, player to move) kept in a set.
+
+    """
+
+    start = [0] + [piecesPerHole] * rowLength + [0] + [piecesPerHole] * rowLength
+    seen = {(tuple(start), 1)}
+    level = [(start, 1)]
+    positionsPerLevel = []
+    terminalPositions = 0
+    while level:
+        positionsPerLevel.append(len(level))
+        nextLevel = []
+        for pits, player in level:
+            if not referenceLegalMoves(pits, 1) or not referenceLegalMoves(pits, 2):
+                terminalPositions += 1
+                continue
+            for position in referenceLegalMoves(pits, player):
+                child = pits[:]
+                extraTurn, lastPosition = referenceMove(child, position, player)
+                key = (tuple(child), player if extraTurn else 3 - player)
+                if key not in seen:
+                    seen.add(key)
+                    nextLevel.append((child, key[1]))
+        level = nextLevel
+    return len(seen), terminalPositions, positionsPerLevel
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_stateSpaceMatchesReference(workers):
+    statistics = enumerateStateSpace(2, 3, workers=workers, memoryLimit=1024, chunkKeys=256) #small limits so positions spill to disk
+    assert (statistics.positions, statistics.terminalPositions, statistics.positionsPerLevel) == referenceStateSpace(2, 3)
+
+def test_spillingSetKeepsKeysOnDisk(tmp_path):
+    rng = random.Random(0)
+    keys = [rng.getrandbits(64) for x in range(2000)]
+    keySet = set(keys)
+    spillingSet = SpillingSet(str(tmp_path), memoryLimit=100)
+    try:
+        for key in keys:
+            assert spillingSet.add(key)
+        assert not spillingSet.add(keys[0]) and not spillingSet.add(keys[-1])
+        assert len(spillingSet) == len(keys)
+        assert len(spillingSet._runs) < 10 and spillingSet._tableSize < 100 #runs were merged
+        assert all(key in spillingSet for key in keys)
+        assert not any(key + 1 in spillingSet for key in keySet if key + 1 not in keySet)
+    finally:
+        spillingSet.close()
+    assert not list(tmp_path.iterdir())
+
+def test_positionCoderRoundTrips():
+    coder = PositionCoder(2, 5)
+    keys = set()
+    for stones in range(6 ** 6):
+        pits = [stones // 6 ** position % 6 for position in range(6)]
+        if sum(pits) != 5:
+            continue
+        for player in (1, 2):
+            key = coder.encode(pits, player)
+            assert coder.decode(key) == (pits, player)
+            keys.add(key)
+    assert sorted(keys) == list(range(len(keys))) #keys are dense
@@ -0,0 +1,35 @@
+import pytest
+
+from transpositionTable import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+
+def test_storedEntriesComeBackWithTheirBounds():
+    table = TranspositionTable(sizeBits=4)
+    for key, flag in ((3, EXACT), (4, LOWER_BOUND), (5, UPPER_BOUND)):
+        assert table.store(key, 2, key * 10, flag, key + 1)
+    assert [table.probe(key) for key in (3, 4, 5)] == [(2, 30, EXACT, 4), (2, 40, LOWER_BOUND, 5), (2, 50, UPPER_BOUND, 6)]
+    assert table.probe(6) is None and table.probe(3 + table.size) is None #same slot as 3, different key
+    assert (table.hits, table.misses, table.stores, len(table)) == (3, 2, 3, 3)
+
+def test_depthReplacementKeepsDeeperEntries():
+    table = TranspositionTable(sizeBits=2, replacement="depth")
+    table.store(1, 5, 10)
+    assert not table.store(1 + table.size, 4, 20) #collides with a deeper entry
+    assert table.probe(1) == (5, 10, EXACT, None)
+    assert table.store(1 + table.size, 5, 30, LOWER_BOUND) #as deep, replaces
+    assert table.probe(1) is None and table.probe(1 + table.size) == (5, 30, LOWER_BOUND, None)
+    assert table.store(1 + table.size, 1, 40) #same key always updates
+    assert table.probe(1 + table.size) == (1, 40, EXACT, None)
+
+def test_alwaysReplacementOverwrites():
+    table = TranspositionTable(sizeBits=2, replacement="always")
+    table.store(2, 9, 10)
+    assert table.store(2 + table.size, 0, 20, UPPER_BOUND)
+    assert table.probe(2) is None and table.probe(2 + table.size) == (0, 20, UPPER_BOUND, None)
+
+def test_clearAndUnknownPolicy():
+    table = TranspositionTable(sizeBits=3)
+    table.store(1, 1, 1)
+    table.clear()
+    assert len(table) == 0 and table.probe(1) is None
+    with pytest.raises(TranspositionTable.UnknownReplacementPolicy):
+        TranspositionTable(replacement="never")
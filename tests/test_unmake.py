@@ -0,0 +1,52 @@
+"""
+Checks that unmaking moves puts BoardState and Board back exactly as they were, relay follow ups included.
+
+"""
+
+import random
+from array import array
+
+import pytest
+
+from board import Board
+from boardState import BoardState, EXTRA_TURN
+from test_board import BOARD_SIZES, playRandomGame
+
+def snapshot(state):
+    """
+    Returns everything BoardState.unmake has to put back.
+
+    """
+
+    return state.pits.tolist(), state.hash, state.occupied, state.lastPosition, state.sows
+
+@pytest.mark.parametrize("rowLength", [1, 2, 3, 6, 13])
+def test_stateUnmakeRestoresEveryField(rowLength):
+    rng = random.Random(rowLength)
+    for x in range(50):
+        state = BoardState(0, rowLength)
+        state.pits[:] = array("i", [rng.randint(0, rng.choice((3, 40))) for position in range(state.numberOfPositions)])
+        state.rehash()
+        undoLog = []
+        snapshots = []
+        player = 1
+        while len(snapshots) < 40 and not state.isTerminal():
+            snapshots.append(snapshot(state))
+            if state.move(rng.choice(state.legalMoves(player)), player, undoLog) != EXTRA_TURN:
+                player = 3 - player
+        for expected in reversed(snapshots):
+            state.unmake(undoLog)
+            assert snapshot(state) == expected
+        assert undoLog == []
+
+@pytest.mark.parametrize("piecesPerHole, rowLength", BOARD_SIZES)
+def test_unmakeRestoresEveryPosition(piecesPerHole, rowLength):
+    rng = random.Random(rowLength)
+    for game in range(10):
+        board = Board(piecesPerHole, rowLength)
+        snapshots = playRandomGame(board, rng, record=True)
+        for snapshot in reversed(snapshots):
+            board.unmake()
+            assert (board.state.pits.tolist(), board.board._observingIndex, board.state.hash, board.state.occupied) == snapshot
+        with pytest.raises(Board.NothingToUnmake):
+            board.unmake()
@@ -0,0 +1,251 @@
+import multiprocessing
+import random
+
+import instrumentation
+from board import Board
+
+def playGame(player1Strategy, player2Strategy, rng, piecesPerHole=4, rowLength=6, maxMoves=10000, moveLog=None):
+    """
+    Plays one game between two strategies (see strategies.py).
+
+    Parameters
+    ----------
+
+    player1Strategy: callable
+        Strategy for player 1
+
+    player2Strategy: callable
+        Strategy for player 2
+
+    rng: random.Random
+        Source of randomness passed to the strategies
+
+    piecesPerHole: int, optional
+        Number of starting pieces in each of the positions on the board, default 4
+
+    rowLength: int, optional
+        Number of positions in each row, default 6
+
+    maxMoves: int, optional
+        Game is stopped and scored after this many moves, default 10000
+
+    moveLog: list, optional
+        If given, (position, extraTurn) is appended for every move, ie for saving the game as a GameRecord
+
+    Returns
+    -------
+
+    player1Score: int
+        Stones in player 1's goal plus stones left on their side at the end of the game
+
+    player2Score: int
+        Same for player 2
+
+    moves: int
+        Number of moves played (an extra turn counts as its own move)
+
+    """
+
+    board = Board(piecesPerHole, rowLength)
+    strategies = (None, player1Strategy, player2Strategy)
+    player = 1
+    moves = 0
+    while moves < maxMoves and not board.is_terminal():
+        position = strategies[player](board, player, rng)
+        extraTurn = board.move(position, player)
+        moves += 1
+        if moveLog is not None:
+            moveLog.append((position, extraTurn))
+        if not extraTurn:
+            player = 3 - player
+
+    player1Score, player2Score = board.final_score()
+    return player1Score, player2Score, moves
+
+class TournamentResult:
+    """
+    Totals for a set of games between strategy A and strategy B. Wins, draws and losses are from A's point of view.
+
+    """
+
+    def __init__(self):
+        self.games = 0
+        self.wins = 0
+        self.draws = 0
+        self.losses = 0
+        self.stonesA = 0 #total final score of strategy A over every game
+        self.stonesB = 0
+        self.moves = 0
+
+    def __repr__(self):
+        return "TournamentResult(games={}, wins={}, draws={}, losses={}, averageStonesA={:.2f}, averageStonesB={:.2f}, averageGameLength={:.1f})".format(
+            self.games, self.wins, self.draws, self.losses, self.averageStonesA(), self.averageStonesB(), self.averageGameLength())
+
+    def addGame(self, scoreA, scoreB, moves):
+        """
+        Adds the result of one game.
+
+        """
+
+        self.games += 1
+        if scoreA > scoreB:
+            self.wins += 1
+        elif scoreA == scoreB:
+            self.draws += 1
+        else:
+            self.losses += 1
+        self.stonesA += scoreA
+        self.stonesB += scoreB
+        self.moves += moves
+
+    def merge(self, other):
+        """
+        Adds the totals of another TournamentResult into this one.
+
+        """
+
+        self.games += other.games
+        self.wins += other.wins
+        self.draws += other.draws
+        self.losses += other.losses
+        self.stonesA += other.stonesA
+        self.stonesB += other.stonesB
+        self.moves += other.moves
+
+    def averageStonesA(self):
+        return self.stonesA / self.games if self.games else 0.0
+
+    def averageStonesB(self):
+        return self.stonesB / self.games if self.games else 0.0
+
+    def averageGameLength(self):
+        return self.moves / self.games if self.games else 0.0
+
+    def asDict(self):
+        """
+        Returns totals and averages as a dict, ie for saving as JSON.
+
+        """
+
+        return {"games": self.games, "wins": self.wins, "draws": self.draws, "losses": self.losses,
+                "averageStonesA": self.averageStonesA(), "averageStonesB": self.averageStonesB(), "averageGameLength": self.averageGameLength()}
+
+def chunkSeed(seed, chunkIndex):
+    """
+    Returns the seed used for the games in one chunk. Only depends on the tournament seed and the chunk's index,
+    so a tournament gives the same results no matter how many workers play it.
+
+    """
+
+    return seed * 1000003 + chunkIndex
+
+def _playChunk(arguments):
+    """
+    Plays one chunk of games in a worker process, returns (chunkIndex, TournamentResult, MoveStatistics or None).
+    Move statistics are collected for the chunk if collect is set, for merging into the collector that was active
+    when the tournament was started.
+
+    """
+
+    strategyA, strategyB, chunkIndex, firstGame, numberOfGames, seed, piecesPerHole, rowLength, swapSides, variant, collect = arguments
+    statistics = instrumentation.MoveStatistics().start() if collect else None
+    rng = random.Random(chunkSeed(seed, chunkIndex))
+    result = TournamentResult()
+    if variant is None:
+        play = playGame
+    else:
+        from ruleVariants import playVariantGame
+        play = lambda player1Strategy, player2Strategy, rng, piecesPerHole, rowLength: playVariantGame(variant, player1Strategy, player2Strategy, rng, piecesPerHole, rowLength)
+    for game in range(firstGame, firstGame + numberOfGames):
+        if swapSides and game % 2 == 1: #B plays first in every other game
+            scoreB, scoreA, moves = play(strategyB, strategyA, rng, piecesPerHole, rowLength)
+        else:
+            scoreA, scoreB, moves = play(strategyA, strategyB, rng, piecesPerHole, rowLength)
+        result.addGame(scoreA, scoreB, moves)
+    if statistics is not None:
+        statistics.stop()
+    return chunkIndex, result, statistics
+
+def runTournament(strategyA, strategyB, games, piecesPerHole=4, rowLength=6, seed=0, workers=None, chunkSize=50, swapSides=True, onProgress=None, variant=None):
+    """
+    Plays games between two strategies over a pool of worker processes and totals the results. Games are split
+    into chunks of chunkSize, and every chunk gets its own seed from chunkSeed() so results can be reproduced.
+    If move statistics are being collected (see instrumentation.py), workers collect them for their chunks and
+    they are merged into the active collector.
+
+    Parameters
+    ----------
+
+    strategyA: callable
+        First strategy, results are from its point of view. Must be picklable (module level function or class).
+
+    strategyB: callable
+        Second strategy
+
+    games: int
+        Number of games to play
+
+    piecesPerHole: int, optional
+        Number of starting pieces in each of the positions on the board, default 4
+
+    rowLength: int, optional
+        Number of positions in each row, default 6
+
+    seed: int, optional
+        Tournament seed, default 0
+
+    workers: int, optional
+        Number of worker processes, default is one per CPU. 1 plays every game in this process.
+
+    chunkSize: int, optional
+        Number of games sent to a worker at a time, default 50
+
+    swapSides: bool, optional
+        If True strategies take turns going first, default True
+
+    onProgress: callable, optional
+        Called with (gamesPlayed, games, TournamentResult so far) every time a chunk finishes
+
+    variant: str, optional
+        Rule variant to play (see ruleVariants.py), in which case the strategies must be variant strategies
+        or Board's random or greedy strategy (see ruleVariants.variantStrategy). Default None plays Board's rules
+        with ordinary strategies
+
+    Returns
+    -------
+
+    result: TournamentResult
+        Totals for every game
+
+    Raises
+    ------
+
+    ValueError
+        If variant is given with a strategy that only plays Board's rules
+
+    """
+
+    if variant is not None:
+        from ruleVariants import variantStrategy
+        strategyA = variantStrategy(strategyA)
+        strategyB = variantStrategy(strategyB)
+    collector = instrumentation.activeCollector
+    pool = multiprocessing.Pool(workers) if workers != 1 else None
+    collect = collector is not None and pool is not None #games played in this process are already seen by the collector
+    chunks = [(strategyA, strategyB, chunkIndex, firstGame, min(chunkSize, games - firstGame), seed, piecesPerHole, rowLength, swapSides, variant, collect)
+              for chunkIndex, firstGame in enumerate(range(0, games, chunkSize))]
+
+    total = TournamentResult()
+    try:
+        chunkResults = pool.imap_unordered(_playChunk, chunks) if pool is not None else map(_playChunk, chunks) #results stream back as chunks finish
+        for chunkIndex, chunkResult, chunkStatistics in chunkResults:
+            total.merge(chunkResult)
+            if chunkStatistics is not None:
+                collector.merge(chunkStatistics)
+            if onProgress is not None:
+                onProgress(total.games, games, total)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return total
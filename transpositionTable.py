@@ -0,0 +1,137 @@
+#what a stored value means, see TranspositionTable.store
+EXACT = 0 #value is the exact result of the search
+LOWER_BOUND = 1 #search failed high, real value is at least value
+UPPER_BOUND = 2 #search failed low, real value is at most value
+
+class TranspositionTable:
+    """
+    Fixed size table of cached search results keyed by board hash and player to move (see BoardState.hashKey).
+    Each key maps to a single slot, so when two keys share a slot the replacement policy decides which result 
+    is kept. 
+
+    Parameters
+    ----------
+
+    sizeBits: int, optional
+        Table holds 2**sizeBits entries, default 20
+
+    replacement: str, optional
+        "depth" to only replace an entry with one searched at least as deep, or "always" to always overwrite
+        the entry already in the slot, default "depth" 
+
+    """
+
+    replacementPolicies = ("depth", "always")
+
+    def __init__(self, sizeBits=20, replacement="depth"):
+        if replacement not in self.replacementPolicies:
+            raise self.UnknownReplacementPolicy(replacement, self.replacementPolicies)
+
+        self.size = 1 << sizeBits
+        self._mask = self.size - 1
+        self.replacement = replacement
+
+        #entries are stored across parallel lists, slot is key & self._mask
+        self._keys = [None] * self.size
+        self._depths = [0] * self.size
+        self._values = [0] * self.size
+        self._flags = [EXACT] * self.size
+        self._bestMoves = [None] * self.size
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def __len__(self):
+        return self.size - self._keys.count(None) #number of filled slots
+
+    def probe(self, key):
+        """
+        Looks up the entry for key. 
+
+        Parameters
+        ----------
+
+        key: int
+            Board hash combined with player to move, from BoardState.hashKey
+
+        Returns
+        -------
+
+        entry: tuple or None
+            (depth, value, flag, bestMove) if key is in the table, otherwise None
+
+        """
+
+        slot = key & self._mask
+        if self._keys[slot] == key:
+            self.hits += 1
+            return (self._depths[slot], self._values[slot], self._flags[slot], self._bestMoves[slot])
+        self.misses += 1
+        return None
+
+    def store(self, key, depth, value, flag=EXACT, bestMove=None):
+        """
+        Stores a search result for key, unless the replacement policy keeps the entry already in its slot. 
+
+        Parameters
+        ----------
+
+        key: int
+            Board hash combined with player to move, from BoardState.hashKey
+
+        depth: int
+            Depth the position was searched to
+
+        value: int
+            Result of the search
+
+        flag: int, optional
+            EXACT, LOWER_BOUND or UPPER_BOUND, default EXACT
+
+        bestMove: int, optional
+            Best move found, if any
+
+        Returns
+        -------
+
+        stored: bool
+            True if entry was written to the table
+
+        """
+
+        slot = key & self._mask
+        if self.replacement == "depth" and self._keys[slot] is not None and self._keys[slot] != key and self._depths[slot] > depth:
+            return False
+
+        self._keys[slot] = key
+        self._depths[slot] = depth
+        self._values[slot] = value
+        self._flags[slot] = flag
+        self._bestMoves[slot] = bestMove
+        self.stores += 1
+        return True
+
+    def clear(self):
+        """
+        Empties every slot in the table.
+
+        """
+
+        self._keys = [None] * self.size
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    #Defining Exceptions
+    class UnknownReplacementPolicy(Exception):
+        """
+        Exception raised if replacement policy passed to TranspositionTable isn't one of the known policies.
+
+        """
+
+        def __init__(self, replacement, expectedPolicies, message="Replacement policy {} is unknown. Expected one of: {}"):
+            self.replacement = replacement
+            self.expectedPolicies = expectedPolicies
+            self.message = message.format(self.replacement, self.expectedPolicies)
+            super().__init__(self.message)